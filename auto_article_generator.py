@@ -9,14 +9,17 @@ import os
 import sys
 import time
 import argparse
+from dataclasses import asdict
 from datetime import datetime
+from typing import Iterable, Optional, Union
 import logging
 
 # srcディレクトリをパスに追加
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from article_generator import ArticleGenerator, ArticleConfig
-from keyword_research import KeywordResearcher
+from batch_jobs import BatchJobManager
+from keyword_research import KeywordResearcher, KeywordData
 from seo_optimizer import SEOOptimizer
 
 # ログ設定
@@ -36,7 +39,9 @@ class AutoArticleGenerator:
         # 各コンポーネント初期化
         self.article_generator = ArticleGenerator(
             openai_api_key=self.config.get('openai_api_key'),
-            anthropic_api_key=self.config.get('anthropic_api_key')
+            anthropic_api_key=self.config.get('anthropic_api_key'),
+            openai_base_url=self.config.get('openai_base_url'),
+            anthropic_base_url=self.config.get('anthropic_base_url')
         )
         
         self.keyword_researcher = KeywordResearcher()
@@ -57,14 +62,16 @@ class AutoArticleGenerator:
     
     def generate_from_keywords_file(self, keywords_file: str, 
                                   delay: int = 30,
-                                  include_affiliate: bool = True) -> list:
+                                  include_affiliate: bool = True,
+                                  concurrency: int = 4) -> list:
         """
         キーワードファイルから記事を自動生成
         
         Args:
             keywords_file: キーワードファイルパス（1行1キーワード）
-            delay: 記事生成間隔（秒）
+            delay: 記事生成間隔（秒）。concurrency=1の逐次モードでのみ使用
             include_affiliate: アフィリエイトリンクを含めるか
+            concurrency: 同時生成数
             
         Returns:
             生成された記事リスト
@@ -73,111 +80,218 @@ class AutoArticleGenerator:
             # キーワード読み込み
             with open(keywords_file, 'r', encoding='utf-8') as f:
                 keywords = [line.strip() for line in f if line.strip()]
+        except Exception as e:
+            logger.error(f"ファイル読み込みエラー: {e}")
+            return []
+        
+        logger.info(f"{len(keywords)}個のキーワードを読み込みました")
+        return self.generate_from_keywords(keywords, delay=delay, include_affiliate=include_affiliate,
+                                           concurrency=concurrency, total=len(keywords))
+    
+    def generate_from_keywords(self, keywords: Iterable[Union[KeywordData, str]],
+                               delay: int = 30,
+                               include_affiliate: bool = True,
+                               concurrency: int = 4,
+                               total: Optional[int] = None) -> list:
+        """
+        キーワードから記事を自動生成
+        
+        keywordsは遅延評価されるため、キーワードリサーチのジェネレータを渡せば
+        分析できたキーワードから順に記事生成を始める。
+        
+        Args:
+            keywords: キーワードデータ または キーワード文字列のイテラブル
+            delay: 記事生成間隔（秒）。concurrency=1の逐次モードでのみ使用
+            include_affiliate: アフィリエイトリンクを含めるか
+            concurrency: 同時生成数
+            total: キーワード数（ログ表示用、不明ならNone）
             
-            logger.info(f"{len(keywords)}個のキーワードを読み込みました")
-            
-            generated_articles = []
+        Returns:
+            生成された記事リスト
+        """
+        generated_articles = []
+        progress = f"/{total}" if total is not None else ""
+        
+        batch = self.article_generator.generate_batch(
+            keywords,
+            concurrency=concurrency,
+            config=self._article_config()
+        )
+        
+        for i, (keyword_data, article) in enumerate(batch, 1):
+            keyword = keyword_data.main_keyword if isinstance(keyword_data, KeywordData) else keyword_data
+            logger.info(f"[{i}{progress}] '{keyword}' の記事生成が完了")
             
-            for i, keyword in enumerate(keywords, 1):
-                logger.info(f"[{i}/{len(keywords)}] '{keyword}' の記事を生成中...")
-                
-                try:
-                    # 記事生成
-                    article = self._generate_single_article(
-                        keyword, 
-                        include_affiliate=include_affiliate
-                    )
+            try:
+                if article:
+                    if include_affiliate:
+                        # アフィリエイトリンク追加
+                        article.content = self._add_affiliate_links(
+                            article.content, 
+                            keyword
+                        )
                     
-                    if article:
-                        generated_articles.append({
-                            'keyword': keyword,
-                            'title': article.title,
-                            'file_path': self._save_article(article, keyword),
-                            'word_count': article.word_count,
-                            'seo_score': article.seo_score
-                        })
-                        logger.info(f"✅ 記事生成成功: {article.title}")
-                    else:
-                        logger.error(f"❌ 記事生成失敗: {keyword}")
+                    generated_articles.append({
+                        'keyword': keyword,
+                        'title': article.title,
+                        'file_path': self._save_article(article, keyword),
+                        'word_count': article.word_count,
+                        'seo_score': article.seo_score
+                    })
+                    logger.info(f"✅ 記事生成成功: {article.title}")
+                else:
+                    logger.error(f"❌ 記事生成失敗: {keyword}")
+                
+                # 逐次モードではAPI制限回避のために待機
+                if concurrency <= 1 and (total is None or i < total):
+                    logger.info(f"次の記事生成まで{delay}秒待機...")
+                    time.sleep(delay)
                     
-                    # API制限回避のための待機
-                    if i < len(keywords):
-                        logger.info(f"次の記事生成まで{delay}秒待機...")
-                        time.sleep(delay)
-                        
-                except Exception as e:
-                    logger.error(f"記事生成エラー ({keyword}): {e}")
-                    continue
+            except Exception as e:
+                logger.error(f"記事生成エラー ({keyword}): {e}")
+                continue
+        
+        # 結果サマリー保存
+        self._save_summary(generated_articles)
+        
+        return generated_articles
+    
+    def generate_bulk(self, keywords_file: str = None,
+                      include_affiliate: bool = True,
+                      job_id: str = None,
+                      wait: bool = True) -> list:
+        """
+        プロバイダーのバッチAPIで記事を一括生成
+        
+        プロンプトをリクエストファイルにまとめて投入し、完了後に結果を回収する。
+        ジョブの状態は data/batch_jobs/ に記録されるため、job_idを指定して再開できる。
+        
+        Args:
+            keywords_file: キーワードファイルパス（1行1キーワード、再開時は不要）
+            include_affiliate: アフィリエイトリンクを含めるか
+            job_id: 再開するジョブID
+            wait: 完了まで待つか（Falseなら投入・状態確認のみ）
             
-            # 結果サマリー保存
-            self._save_summary(generated_articles)
+        Returns:
+            生成された記事リスト（今回回収した分）
+        """
+        batch_config = self.config.get('batch_jobs', {})
+        manager = BatchJobManager(self.config, batch_config.get('path', 'data/batch_jobs'))
+        
+        if job_id:
+            record = manager.load(job_id)
+            config = ArticleConfig(**record.config)
+        else:
+            with open(keywords_file, 'r', encoding='utf-8') as f:
+                keywords = [line.strip() for line in f if line.strip()]
+            logger.info(f"{len(keywords)}個のキーワードを読み込みました")
+            
+            config = self._article_config()
+            record = manager.create(
+                [self.article_generator.prepare_request(keyword, config=config) for keyword in keywords],
+                config.model,
+                asdict(config)
+            )
+        
+        generated_articles = []
+        
+        def handle_result(item, result):
+            article = self.article_generator.article_from_text(
+                result['text'],
+                item.keyword,
+                config=config,
+                finish_reason=result['finish_reason'],
+                output_tokens=result['output_tokens']
+            )
+            if not article:
+                logger.error(f"❌ 記事生成失敗: {item.keyword}")
+                return None
             
-            return generated_articles
+            if include_affiliate:
+                article.content = self._add_affiliate_links(article.content, item.keyword)
             
-        except Exception as e:
-            logger.error(f"ファイル読み込みエラー: {e}")
-            return []
+            file_path = self._save_article(article, item.keyword)
+            generated_articles.append({
+                'keyword': item.keyword,
+                'title': article.title,
+                'file_path': file_path,
+                'word_count': article.word_count,
+                'seo_score': article.seo_score
+            })
+            logger.info(f"✅ 記事生成成功: {article.title}")
+            return file_path
+        
+        summary = manager.run(
+            record,
+            handle_result,
+            poll_interval=batch_config.get('poll_interval', 60),
+            timeout=None if wait else 0
+        )
+        logger.info(f"バッチジョブ {summary['job_id']}: {summary['status']} {summary['items']}")
+        
+        if generated_articles:
+            self._save_summary(generated_articles)
+        
+        return generated_articles
     
     def generate_trending_articles(self, count: int = 5, 
                                  category: str = None,
-                                 delay: int = 30) -> list:
+                                 delay: int = 30,
+                                 concurrency: int = 4) -> list:
         """
         トレンドキーワードから記事を自動生成
         
         Args:
             count: 生成する記事数
             category: カテゴリ指定
-            delay: 記事生成間隔（秒）
+            delay: 記事生成間隔（秒）。concurrency=1の逐次モードでのみ使用
+            concurrency: 同時生成数
             
         Returns:
             生成された記事リスト
         """
         logger.info("トレンドキーワードを取得中...")
         
-        # トレンドキーワード取得
-        trending_keywords = self.keyword_researcher.get_trending_keywords(
-            limit=count,
-            category=category
-        )
-        
-        if not trending_keywords:
-            logger.error("トレンドキーワードが取得できませんでした")
-            return []
-        
-        # キーワードリスト作成
-        keywords = [kw.main_keyword for kw in trending_keywords[:count]]
+        researched = []
         
-        # 一時ファイルに保存
-        temp_file = 'temp_trending_keywords.txt'
-        with open(temp_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(keywords))
+        def trending_keywords():
+            # 分析できたキーワードから順に記事生成へ渡す（関連キーワードもプロンプトに使われる）
+            try:
+                for keyword_data in self.keyword_researcher.iter_trending_keywords(
+                    limit=count,
+                    category=category
+                ):
+                    researched.append(keyword_data.main_keyword)
+                    yield keyword_data
+            except Exception as e:
+                logger.error(f"トレンドキーワード取得エラー: {e}")
         
-        # 記事生成
-        result = self.generate_from_keywords_file(temp_file, delay=delay)
+        result = self.generate_from_keywords(trending_keywords(), delay=delay, concurrency=concurrency)
         
-        # 一時ファイル削除
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+        if not researched:
+            logger.error("トレンドキーワードが取得できませんでした")
         
         return result
     
+    def _article_config(self) -> ArticleConfig:
+        """自動生成用の記事設定"""
+        return ArticleConfig(
+            min_length=1500,
+            max_length=2000,
+            temperature=0.7,
+            model="gpt-4",
+            include_faq=True
+        )
+    
     def _generate_single_article(self, keyword: str, 
                                include_affiliate: bool = True) -> object:
         """単一記事生成"""
         try:
-            # 記事設定
-            config = ArticleConfig(
-                min_length=1500,
-                max_length=2000,
-                temperature=0.7,
-                model="gpt-4",
-                include_faq=True
-            )
-            
-            self.article_generator.config = config
-            
             # 記事生成
-            article = self.article_generator.generate_article(keyword)
+            article = self.article_generator.generate_article(
+                keyword,
+                config=self._article_config()
+            )
             
             if article and include_affiliate:
                 # アフィリエイトリンク追加
@@ -296,14 +410,14 @@ def main():
     
     parser.add_argument(
         '--mode', 
-        choices=['file', 'trending'], 
+        choices=['file', 'trending', 'bulk'], 
         default='trending',
-        help='生成モード: file=キーワードファイルから, trending=トレンドから'
+        help='生成モード: file=キーワードファイルから, trending=トレンドから, bulk=バッチAPIで一括生成'
     )
     
     parser.add_argument(
         '--keywords-file',
-        help='キーワードファイルパス（fileモード時）'
+        help='キーワードファイルパス（file・bulkモード時）'
     )
     
     parser.add_argument(
@@ -322,7 +436,25 @@ def main():
         '--delay',
         type=int,
         default=30,
-        help='記事生成間隔（秒）'
+        help='記事生成間隔（秒、--concurrency 1 の場合のみ）'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        default=4,
+        help='同時生成数'
+    )
+    
+    parser.add_argument(
+        '--resume-job',
+        help='再開するバッチジョブID（bulkモード時）'
+    )
+    
+    parser.add_argument(
+        '--no-wait',
+        action='store_true',
+        help='バッチジョブの完了を待たない（bulkモード時）'
     )
     
     parser.add_argument(
@@ -344,14 +476,28 @@ def main():
         generator.generate_from_keywords_file(
             args.keywords_file,
             delay=args.delay,
-            include_affiliate=not args.no_affiliate
+            include_affiliate=not args.no_affiliate,
+            concurrency=args.concurrency
+        )
+    
+    elif args.mode == 'bulk':
+        if not args.keywords_file and not args.resume_job:
+            print("エラー: --keywords-file または --resume-job を指定してください")
+            return
+        
+        generator.generate_bulk(
+            args.keywords_file,
+            include_affiliate=not args.no_affiliate,
+            job_id=args.resume_job,
+            wait=not args.no_wait
         )
     
     else:  # trending mode
         generator.generate_trending_articles(
             count=args.count,
             category=args.category,
-            delay=args.delay
+            delay=args.delay,
+            concurrency=args.concurrency
         )
 
 if __name__ == "__main__":
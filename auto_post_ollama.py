@@ -14,6 +14,12 @@ import base64
 import schedule
 import logging
 import subprocess
+import sys
+
+# srcディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from structured_output import ARTICLE_SCHEMA, JSONRepairParser, normalize_article, ollama_format
 
 # ログ設定
 logging.basicConfig(
@@ -229,50 +235,62 @@ class OllamaAutoPostSystem:
 - SEOを意識したキーワードを自然に含める
 """
         
+        parser = JSONRepairParser()
+        done_reason = None
         try:
-            # Ollama APIを呼び出し
+            # Ollama APIを呼び出し（JSONスキーマで構造化出力、ストリーミングで受信）
             response = requests.post(
                 "http://localhost:11434/api/generate",
                 json={
                     "model": "llama3.2",
                     "prompt": prompt,
-                    "stream": False,
-                    "format": "json"
-                }
+                    "stream": True,
+                    "format": ollama_format(ARTICLE_SCHEMA)
+                },
+                stream=True,
+                timeout=(10, 600)
             )
             
-            if response.status_code == 200:
-                result = response.json()
-                content = result.get('response', '{}')
-                
-                # JSONをパース
-                try:
-                    article_data = json.loads(content)
-                except json.JSONDecodeError:
-                    # JSONパースエラーの場合、手動で構造を作成
-                    logging.warning("JSON解析エラー。デフォルト構造を使用します。")
-                    article_data = self.create_default_article(topic, persona)
-                
-                # メタデータを追加
-                article_data.update({
-                    "author": persona['name'],
-                    "author_role": persona['role'],
-                    "author_avatar": persona['avatar'],
-                    "publish_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                    "id": f"auto_{int(time.time())}",
-                    "views": 0,
-                    "likes": 0,
-                    "comments": 0
-                })
-                
-                return article_data
-            else:
+            if response.status_code != 200:
                 logging.error(f"Ollama APIエラー: {response.status_code}")
                 return self.create_default_article(topic, persona)
+            
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                parser.feed(chunk.get('response', ''))
+                if chunk.get('done'):
+                    done_reason = chunk.get('done_reason')
+                    break
                 
         except Exception as e:
-            logging.error(f"記事生成エラー: {e}")
+            # 途中まで受信していれば、その分から復元する
+            logging.error(f"記事生成エラー: {e} ({parser.received}文字受信済み)")
+        
+        if not parser.complete and parser.received:
+            logging.warning(f"JSONが途中で終わっています（{done_reason or '中断'}）。受信済みの分から復元します")
+        
+        article_data, filled = normalize_article(parser.value(), topic)
+        if article_data is None:
+            logging.warning("記事を復元できませんでした。デフォルト構造を使用します。")
             return self.create_default_article(topic, persona)
+        if filled:
+            logging.info(f"欠けていた項目を補完: {', '.join(filled)}")
+        
+        # メタデータを追加
+        article_data.update({
+            "author": persona['name'],
+            "author_role": persona['role'],
+            "author_avatar": persona['avatar'],
+            "publish_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "id": f"auto_{int(time.time())}",
+            "views": 0,
+            "likes": 0,
+            "comments": 0
+        })
+        
+        return article_data
     
     def create_default_article(self, topic: str, persona: dict) -> dict:
         """デフォルトの記事構造を作成"""
@@ -12,11 +12,19 @@ from datetime import datetime, timedelta
 import pytrends
 from pytrends.request import TrendReq
 import openai
-from typing import Dict, List, Optional
+import anthropic
+from typing import Dict, List, Optional, Tuple
 import requests
 import base64
 import schedule
 import logging
+import sys
+
+# srcディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from structured_output import (ARTICLE_SCHEMA, JSONRepairParser, anthropic_tool_params, feed_anthropic_stream,
+                               normalize_article, openai_response_format, parse_json_tolerant)
 
 # ログ設定
 logging.basicConfig(
@@ -39,6 +47,13 @@ class GitHubAutoPostSystem:
         # OpenAI設定
         openai.api_key = self.openai_api_key
         
+        # Anthropic設定（APIキーがあればClaudeで生成する）
+        anthropic_config = self.config.get('anthropic', {})
+        if anthropic_config.get('api_key'):
+            self.anthropic_client = anthropic.Anthropic(api_key=anthropic_config['api_key'])
+        else:
+            self.anthropic_client = None
+        
         # トレンドAPI初期化
         self.pytrends = TrendReq(hl='ja-JP', tz=360)
         
@@ -107,6 +122,12 @@ class GitHubAutoPostSystem:
                     "model": "gpt-4o-mini",
                     "temperature": 0.8
                 },
+                "anthropic": {
+                    "api_key": os.environ.get('ANTHROPIC_API_KEY', ''),
+                    "model": "claude-3-5-sonnet-20241022",
+                    "temperature": 0.8,
+                    "max_tokens": 4096
+                },
                 "posting": {
                     "daily_posts": 3,
                     "post_times": ["09:00", "14:00", "19:00"],
@@ -190,35 +211,92 @@ JSON形式で返してください：
 """
         
         try:
-            response = openai.ChatCompletion.create(
-                model=self.config['openai']['model'],
-                messages=[
-                    {"role": "system", "content": "あなたは専門的な記事を書くライターです。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.config['openai']['temperature']
-            )
-            
-            content = response.choices[0].message.content
-            article_data = json.loads(content)
-            
-            # メタデータを追加
-            article_data.update({
-                "author": persona['name'],
-                "author_role": persona['role'],
-                "author_avatar": persona['avatar'],
-                "publish_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                "id": f"auto_{int(time.time())}",
-                "views": 0,
-                "likes": 0,
-                "comments": 0
-            })
-            
-            return article_data
-            
+            if self.anthropic_client:
+                data, truncated = self._generate_with_claude(prompt)
+            else:
+                data, truncated = self._generate_with_openai(prompt)
         except Exception as e:
             logging.error(f"記事生成エラー: {e}")
             return None
+        
+        if truncated:
+            logging.warning("出力上限でJSONが途中で終わっています。受信済みの分から復元します")
+        
+        # 崩れたJSON・途中で切れたJSONも復元して使う
+        article_data, filled = normalize_article(data, topic)
+        if article_data is None:
+            logging.error("記事生成エラー: 応答から記事を復元できませんでした")
+            return None
+        if filled:
+            logging.info(f"欠けていた項目を補完: {', '.join(filled)}")
+        
+        # メタデータを追加
+        article_data.update({
+            "author": persona['name'],
+            "author_role": persona['role'],
+            "author_avatar": persona['avatar'],
+            "publish_date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "id": f"auto_{int(time.time())}",
+            "views": 0,
+            "likes": 0,
+            "comments": 0
+        })
+        
+        return article_data
+    
+    def _generate_with_openai(self, prompt: str) -> Tuple[Optional[Dict], bool]:
+        """OpenAIで記事のJSONを生成（解析結果と、出力上限で途切れたか）"""
+        model = self.config['openai']['model']
+        request = {}
+        response_format = openai_response_format(model, ARTICLE_SCHEMA)
+        if response_format:
+            # 対応モデルではスキーマに沿ったJSONを返させる
+            request['response_format'] = response_format
+        
+        response = openai.ChatCompletion.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": "あなたは専門的な記事を書くライターです。"},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.config['openai']['temperature'],
+            **request
+        )
+        
+        choice = response.choices[0]
+        return parse_json_tolerant(choice.message.content), choice.get('finish_reason') == "length"
+    
+    def _generate_with_claude(self, prompt: str) -> Tuple[Optional[Dict], bool]:
+        """
+        Claudeで記事のJSONを生成（ツール呼び出しを強制してスキーマに沿った入力として受け取る）
+        
+        ツールの入力はストリーミングで受信して解析器に流し込み、max_tokensや通信エラーで
+        途切れた場合も受信済みの分から復元する。
+        """
+        anthropic_config = self.config['anthropic']
+        tool_parser = JSONRepairParser()
+        text_parser = JSONRepairParser()
+        stop_reason = None
+        try:
+            stream = self.anthropic_client.messages.create(
+                model=anthropic_config.get('model', 'claude-3-5-sonnet-20241022'),
+                max_tokens=anthropic_config.get('max_tokens', 4096),
+                temperature=anthropic_config.get('temperature', 0.8),
+                system="あなたは専門的な記事を書くライターです。",
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **anthropic_tool_params(ARTICLE_SCHEMA)
+            )
+            stop_reason = feed_anthropic_stream(stream, tool_parser, text_parser)
+        except Exception as e:
+            if not (tool_parser.received or text_parser.received):
+                raise
+            # 途中まで受信していれば、その分から復元する
+            logging.error(f"記事生成エラー: {e} ({tool_parser.received + text_parser.received}文字受信済み)")
+        
+        # ツールを使わずに本文でJSONを返した場合は本文から復元する
+        parser = tool_parser if tool_parser.received else text_parser
+        return parser.value(), stop_reason == "max_tokens" or not parser.complete
     
     def update_articles_json(self, new_article: Dict):
         """articles.jsonファイルを更新"""
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+記事パーサーのベンチマーク
+従来の正規表現チェーン（_parse_article_structure + SEOOptimizerの見出し・リンク・画像抽出）と
+parse_article の1回走査を、大きな記事で比較する
+
+実行: python benchmarks/bench_article_parser.py [--sections 200] [--repeat 20]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from article_parser import parse_article
+
+def build_article(sections: int) -> str:
+    """ベンチマーク用の大きな記事を作成"""
+    parts = ["# ベンチマーク用の記事タイトル\n", "導入文です。この記事ではテストについて解説します。\n"]
+    for i in range(sections):
+        parts.append(f"\n## 見出し{i}\n")
+        parts.append("本文の段落です。" * 20 + "\n")
+        parts.append(f"- 箇条書き{i}-1\n- 箇条書き{i}-2\n")
+        parts.append(f"詳しくは[関連記事{i}](https://example.com/{i})をご覧ください。\n")
+        if i % 5 == 0:
+            parts.append(f"### 小見出し{i}\n![図{i}](https://example.com/{i}.png)\n")
+    parts.append("\n## まとめ\nまとめの文章です。\n\n---\nMETA_DESCRIPTION: ベンチマーク用のメタディスクリプションです。\n")
+    return "".join(parts)
+
+def legacy_pipeline(raw_content: str):
+    """従来の正規表現による解析（生成→SEO分析の各段で再走査していた処理）"""
+    meta_description = ""
+    meta_match = re.search(r'META_DESCRIPTION:\s*(.+)', raw_content)
+    if meta_match:
+        meta_description = meta_match.group(1).strip()
+        raw_content = re.sub(r'---\s*META_DESCRIPTION:.*', '', raw_content, flags=re.DOTALL)
+    title_match = re.search(r'^#\s+(.+)', raw_content, re.MULTILINE)
+    title = title_match.group(1).strip() if title_match else ""
+    headings = re.findall(r'^##\s+(.+)', raw_content, re.MULTILINE)
+    content = re.sub(r'^#\s+.+', '', raw_content, flags=re.MULTILINE).strip()
+    content = re.sub(r'---.*$', '', content, flags=re.DOTALL).strip()
+
+    # SEOOptimizer.analyze_article / optimize_article での再走査
+    h1 = re.findall(r'^# (.+)', content, re.MULTILINE)
+    h2 = re.findall(r'^## (.+)', content, re.MULTILINE)
+    h3 = re.findall(r'^### (.+)', content, re.MULTILINE)
+    links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
+    images = re.findall(r'!\[([^\]]*)\]\(([^)]+)\)', content)
+    h2_again = re.findall(r'^## (.+)', content, re.MULTILINE)
+    return title, content, meta_description, headings, h1, h2, h3, links, images, h2_again
+
+def main():
+    parser = argparse.ArgumentParser(description='記事パーサーのベンチマーク')
+    parser.add_argument('--sections', type=int, default=200, help='記事のセクション数')
+    parser.add_argument('--repeat', type=int, default=20, help='計測回数')
+    args = parser.parse_args()
+
+    raw = build_article(args.sections)
+
+    legacy = legacy_pipeline(raw)
+    parsed = parse_article(raw, strip_footer=True)
+    assert parsed.title == legacy[0]
+    assert parsed.content == legacy[1]
+    assert parsed.meta_description == legacy[2]
+    assert parsed.headings_at(2) == legacy[3]
+
+    legacy_time = min(timeit.repeat(lambda: legacy_pipeline(raw), number=1, repeat=args.repeat))
+    single_time = min(timeit.repeat(lambda: parse_article(raw, strip_footer=True), number=1, repeat=args.repeat))
+
+    print(f"記事サイズ: {len(raw):,}文字 / {args.sections}セクション")
+    print(f"正規表現チェーン: {legacy_time * 1000:.2f} ms")
+    print(f"1回走査パーサー: {single_time * 1000:.2f} ms")
+    print(f"速度比: {legacy_time / single_time:.2f}x")
+
+if __name__ == "__main__":
+    main()
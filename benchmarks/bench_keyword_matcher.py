@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+キーワード照合のベンチマーク
+キーワードごとの str.count（従来の TextStats.keyword_count）と、KeywordMatcher の
+str.find による走査・Aho-Corasickオートマトンを、キーワード数を変えて比較する
+
+実行: python benchmarks/bench_keyword_matcher.py [--sections 200] [--repeat 10]
+（結果から keyword_matcher.AUTOMATON_MIN_KEYWORDS の目安を決める）
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import keyword_matcher
+from keyword_matcher import KeywordMatcher
+
+def build_article(sections: int) -> str:
+    """ベンチマーク用の日本語・英語混在の記事を作成"""
+    parts = ["# Pythonプログラミング入門\n\n"]
+    for i in range(sections):
+        parts.append(f"## 見出し{i}: Pythonの使い方\n\n")
+        parts.append("Pythonプログラミングは初心者にも学びやすく、ライブラリも豊富です。" * 3 + "\n\n")
+        parts.append(f"WordPress blog and SEO tools help you grow traffic {i} times faster.\n\n")
+    return "".join(parts)
+
+def build_keywords(count: int):
+    """照合するキーワード（実在する語と出現しない語を半分ずつ）"""
+    base = ["python", "プログラミング", "ライブラリ", "wordpress", "seo", "見出し", "初心者", "traffic"]
+    keywords = [base[i % len(base)] + (f"{i}" if i % 2 else "") for i in range(count)]
+    return list(dict.fromkeys(keywords))
+
+def matcher(keywords, automaton: bool) -> KeywordMatcher:
+    """オートマトンの使用を強制したKeywordMatcher"""
+    original = keyword_matcher.AUTOMATON_MIN_KEYWORDS
+    keyword_matcher.AUTOMATON_MIN_KEYWORDS = 0 if automaton else len(keywords) + 1
+    try:
+        return KeywordMatcher(keywords)
+    finally:
+        keyword_matcher.AUTOMATON_MIN_KEYWORDS = original
+
+def main():
+    parser = argparse.ArgumentParser(description='キーワード照合のベンチマーク')
+    parser.add_argument('--sections', type=int, default=200, help='記事のセクション数')
+    parser.add_argument('--repeat', type=int, default=10, help='計測回数')
+    args = parser.parse_args()
+
+    text = build_article(args.sections).lower()
+    print(f"記事サイズ: {len(text):,}文字 / {args.sections}セクション")
+    print(f"AUTOMATON_MIN_KEYWORDS = {keyword_matcher.AUTOMATON_MIN_KEYWORDS}\n")
+
+    for count in (2, 8, 32, 128, 256, 512, 1024):
+        keywords = build_keywords(count)
+        find_matcher = matcher(keywords, automaton=False)
+        automaton = matcher(keywords, automaton=True)
+        assert find_matcher.find_all(text) == automaton.find_all(text)
+
+        counting = min(timeit.repeat(lambda: {k: text.count(k) for k in keywords}, number=1, repeat=args.repeat))
+        finding = min(timeit.repeat(lambda: find_matcher.find_all(text), number=1, repeat=args.repeat))
+        scanning = min(timeit.repeat(lambda: automaton.find_all(text), number=1, repeat=args.repeat))
+        print(f"{len(keywords):>5}語: str.count {counting * 1000:7.2f} ms / "
+              f"str.find {finding * 1000:7.2f} ms / Aho-Corasick {scanning * 1000:7.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+文分割のベンチマーク
+text_segmenter.split_sentences と、従来の NLTK sent_tokenize（SEOOptimizer._analyze_readability）・
+。！？ の正規表現分割（TextStats.sentences）を、日本語・英語混在の大きな記事で比較する
+
+実行: python benchmarks/bench_text_segmenter.py [--sections 200] [--repeat 20]
+（punktデータが無い場合は学習済みパラメータ無しのPunktで計測し、NLTKが無ければ省略する）
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from text_segmenter import split_sentences, tokenize_words
+
+def build_article(sections: int) -> str:
+    """ベンチマーク用の日本語・英語混在の記事を作成"""
+    parts = ["# ベンチマーク用の記事タイトル\n\n"]
+    for i in range(sections):
+        parts.append(f"## 見出し{i}\n\n")
+        parts.append("本文の段落です。ChatGPTを使うと作業が速くなります！本当でしょうか？" * 5 + "\n\n")
+        parts.append(f"Mr. Smith uses GPT-4o daily. It costs $3.14 per day, e.g. about {i} yen. "
+                     "See example.com for details.\n\n")
+        parts.append(f"- 箇条書き{i}-1\n- 箇条書き{i}-2\n\n")
+    return "".join(parts)
+
+def legacy_split(text: str):
+    """従来の TextStats.sentences（。！？で分割）"""
+    return [s for s in re.split(r'[。！？]', text) if s.strip()]
+
+def load_nltk():
+    """
+    NLTKの文分割（使えなければNone）
+
+    Returns:
+        (名前, 分割関数) or None
+    """
+    try:
+        import nltk
+        from nltk.tokenize import sent_tokenize
+        from nltk.tokenize.punkt import PunktSentenceTokenizer
+    except ImportError:
+        return None
+    try:
+        nltk.data.find('tokenizers/punkt')
+        return "NLTK sent_tokenize", sent_tokenize
+    except LookupError:
+        # オフラインでpunktを取得できない場合も、同じアルゴリズムの速度は測れる
+        return "NLTK Punkt（未学習）", PunktSentenceTokenizer().tokenize
+
+def main():
+    parser = argparse.ArgumentParser(description='文分割のベンチマーク')
+    parser.add_argument('--sections', type=int, default=200, help='記事のセクション数')
+    parser.add_argument('--repeat', type=int, default=20, help='計測回数')
+    args = parser.parse_args()
+
+    text = build_article(args.sections)
+    print(f"記事サイズ: {len(text):,}文字 / {args.sections}セクション")
+
+    results = [
+        ("text_segmenter", split_sentences),
+        ("正規表現（。！？）", legacy_split),
+    ]
+    nltk_split = load_nltk()
+    if nltk_split:
+        results.append(nltk_split)
+    else:
+        print("NLTKが無いためNLTKの計測を省略します")
+
+    baseline = None
+    for name, split in results:
+        elapsed = min(timeit.repeat(lambda: split(text), number=1, repeat=args.repeat))
+        baseline = baseline or elapsed
+        print(f"{name}: {elapsed * 1000:.2f} ms / {len(split(text)):,}文 (text_segmenter比 {elapsed / baseline:.2f}x)")
+
+    words = min(timeit.repeat(lambda: tokenize_words(text), number=1, repeat=args.repeat))
+    print(f"tokenize_words: {words * 1000:.2f} ms / {len(tokenize_words(text)):,}語")
+
+    # 1セクション分の分割結果（NLTKは 。！？ で区切れず、英語の略語・小数は正規表現で区切れない）
+    sample = build_article(1).split("\n\n", 2)[2]
+    print("\n1セクション分の分割例:")
+    for name, split in results:
+        print(f"- {name}: {len(split(sample))}文")
+
+if __name__ == "__main__":
+    main()
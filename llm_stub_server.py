@@ -0,0 +1,857 @@
+#!/usr/bin/env python3
+"""
+負荷試験用のLLMスタブサーバー
+OpenAI Chat Completions・Anthropic Messages・Ollama /api/generate と同じ形式で応答し、
+実際のAPIを使わずに web_app.py や一括生成の負荷試験を行う
+OpenAI Batch API（/v1/files・/v1/batches）とAnthropic Message Batches APIにも対応し、
+バッチは --batch-delay 秒後に完了する
+構造化出力（OpenAI response_format・Anthropic tools・Ollama format）が指定された場合はJSONで記事を返す
+
+最初のトークンまでの時間・トークン/秒・エラー率・429の発生率を指定でき、
+_parse_article_structure が想定するMarkdown形式（# タイトル / ## 見出し / META_DESCRIPTION:）の記事を返す。
+
+使い方:
+    python llm_stub_server.py --port 8765 --ttft 0.8 --tokens-per-sec 60 --error-rate 0.02 --rate-limit-rate 0.05
+
+    # 各クライアントの接続先をスタブに向ける
+    export OPENAI_API_BASE=http://localhost:8765/v1
+    export ANTHROPIC_BASE_URL=http://localhost:8765
+    python ollama_article_generator.py --base-url http://localhost:8765
+"""
+
+import argparse
+import email.policy
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# srcディレクトリをパスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from rate_limit import TokenBucket
+from structured_output import parse_json_tolerant
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEYWORD = "AI記事作成"
+
+# 見出しと本文のテンプレート（{kw}をキーワードに置換）
+HEADING_TEMPLATES = [
+    "{kw}とは？基本をわかりやすく解説",
+    "{kw}のメリットとデメリット",
+    "{kw}の始め方【初心者向け3ステップ】",
+    "{kw}で失敗しないための注意点",
+    "{kw}の活用事例",
+    "{kw}をもっと活用するコツ",
+    "{kw}に必要な費用と時間",
+]
+
+SENTENCE_TEMPLATES = [
+    "{kw}は、ここ数年で多くの人が注目しているテーマです。",
+    "まずは基本的な考え方を押さえておくことが大切です。",
+    "実際に{kw}を取り入れた人の多くが、効果を実感しています。",
+    "一方で、やみくもに始めると思うような成果が出ないこともあります。",
+    "ポイントは、小さく始めて少しずつ改善していくことです。",
+    "具体的な数字で目標を決めておくと、進み具合を確認しやすくなります。",
+    "初心者の方は、無料で使えるツールから試してみるのがおすすめです。",
+    "慣れてきたら、{kw}の応用的な使い方にも挑戦してみましょう。",
+    "よくある失敗は、最初から完璧を目指してしまうことです。",
+    "継続するためには、毎日の習慣に組み込む工夫が欠かせません。",
+]
+
+LIST_TEMPLATES = [
+    "目的をはっきりさせる",
+    "必要な道具や環境を準備する",
+    "小さな目標から始める",
+    "結果を記録して振り返る",
+    "うまくいった方法を続ける",
+]
+
+class StubSettings:
+    """スタブサーバーの挙動設定"""
+
+    def __init__(self,
+                 ttft: float = 0.5,
+                 tokens_per_sec: float = 50.0,
+                 error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0,
+                 max_rps: Optional[float] = None,
+                 chars_per_token: float = 1.0,
+                 chunk_tokens: int = 4,
+                 batch_delay: float = 2.0,
+                 seed: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            ttft: 最初のトークンを返すまでの秒数
+            tokens_per_sec: 生成速度（トークン/秒、0以下で待機なし）
+            error_rate: 500エラーを返す確率
+            rate_limit_rate: 429を返す確率
+            max_rps: 1秒あたりのリクエスト上限（超えた分は429、Noneで無制限）
+            chars_per_token: 1トークンあたりの文字数（max_tokensの打ち切り・usageの計算に使用）
+            chunk_tokens: ストリーミング時に1チャンクにまとめるトークン数
+            batch_delay: バッチが完了するまでの秒数
+            seed: 乱数シード
+        """
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.bucket = TokenBucket(rate=max_rps, capacity=max(1.0, max_rps)) if max_rps else None
+        self.chars_per_token = chars_per_token
+        self.chunk_tokens = max(1, chunk_tokens)
+        self.batch_delay = batch_delay
+        self.random = random.Random(seed)
+        self.seed = seed
+
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            'requests': 0, 'completed': 0, 'errors': 0, 'rate_limited': 0, 'truncated': 0,
+            'batches': 0
+        }
+
+        # バッチAPI用（アップロードされたファイルとバッチ）
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict] = {}
+
+    def count(self, name: str):
+        """カウンターを加算"""
+        with self._lock:
+            self.counters[name] += 1
+
+    def roll(self, probability: float) -> bool:
+        """確率probabilityでTrue"""
+        if probability <= 0:
+            return False
+        with self._lock:
+            return self.random.random() < probability
+
+    def token_delay(self, tokens: int) -> float:
+        """tokensトークン分の生成時間"""
+        if self.tokens_per_sec <= 0:
+            return 0.0
+        return tokens / self.tokens_per_sec
+
+# ---------------------------------------------------------------------------
+# 応答テキストの生成
+# ---------------------------------------------------------------------------
+
+def _extract(pattern: str, text: str, default: str = "") -> str:
+    match = re.search(pattern, text)
+    return match.group(1).strip() if match else default
+
+def _rng_for(key: str, seed: Optional[int]) -> random.Random:
+    """同じキーワードには同じ記事を返すための乱数"""
+    digest = hashlib.sha256(f"{seed}:{key}".encode('utf-8')).hexdigest()
+    return random.Random(int(digest[:16], 16))
+
+def _paragraph(rng: random.Random, keyword: str, target_chars: int) -> str:
+    """目標文字数程度の段落"""
+    sentences = []
+    length = 0
+    previous = None
+    while length < target_chars:
+        template = rng.choice(SENTENCE_TEMPLATES)
+        if template == previous:
+            continue
+        previous = template
+        sentence = template.format(kw=keyword)
+        sentences.append(sentence)
+        length += len(sentence)
+    return "".join(sentences)
+
+def _section_body(rng: random.Random, keyword: str, target_chars: int) -> str:
+    """段落・H3・箇条書きを含むセクション本文"""
+    parts = [_paragraph(rng, keyword, target_chars // 2)]
+    if target_chars >= 300:
+        parts.append(f"### {keyword}のポイント")
+        items = rng.sample(LIST_TEMPLATES, k=3)
+        parts.append("\n".join(f"- {item}" for item in items))
+    parts.append(_paragraph(rng, keyword, target_chars // 2))
+    return "\n\n".join(parts)
+
+def build_article(keyword: str, target_chars: int, include_faq: bool, seed: Optional[int]) -> str:
+    """記事全体（# タイトル / 導入 / ## 見出し / まとめ / META_DESCRIPTION）"""
+    rng = _rng_for(keyword, seed)
+    headings = rng.sample(HEADING_TEMPLATES, k=4)
+    body_chars = max(200, (target_chars - 500) // len(headings))
+
+    parts = [f"# 【{time.strftime('%Y年')}最新】{keyword}の完全ガイド｜初心者にもわかりやすく解説"]
+    parts.append(_paragraph(rng, keyword, 250))
+    for heading in headings:
+        parts.append(f"## {heading.format(kw=keyword)}\n\n{_section_body(rng, keyword, body_chars)}")
+    if include_faq:
+        faq = "\n\n".join(
+            f"### Q. {question.format(kw=keyword)}\n{_paragraph(rng, keyword, 80)}"
+            for question in ("{kw}は初心者でもできますか？", "{kw}にかかる費用は？", "{kw}の効果はいつ出ますか？")
+        )
+        parts.append(f"## よくある質問\n\n{faq}")
+    parts.append(f"## まとめ\n\n{_paragraph(rng, keyword, 175)}")
+
+    meta = f"{keyword}の基本からメリット・始め方・注意点までを初心者向けにわかりやすく解説します。" \
+           f"この記事を読めば{keyword}を今日から始められます。"
+    return "\n\n".join(parts) + f"\n\n---\nMETA_DESCRIPTION: {meta}\n"
+
+def build_outline(keyword: str, seed: Optional[int]) -> str:
+    """アウトライン（タイトル・H2見出し・META_DESCRIPTION）"""
+    rng = _rng_for(keyword, seed)
+    headings = rng.sample(HEADING_TEMPLATES, k=4)
+    lines = [f"# {keyword}の完全ガイド｜初心者にもわかりやすく解説", ""]
+    lines += [f"## {heading.format(kw=keyword)}" for heading in headings]
+    meta = f"{keyword}の基本から始め方・注意点までを初心者向けにわかりやすく解説します。"
+    return "\n".join(lines) + f"\n\n---\nMETA_DESCRIPTION: {meta}\n"
+
+def build_response_text(prompt: str, seed: Optional[int]) -> str:
+    """
+    プロンプトの種類に応じた応答テキスト
+
+    記事生成・アウトライン・セクション・続きの生成の各プロンプトを判別する。
+    """
+    keyword = _extract(r"メインキーワード\**:\s*「([^」]+)」", prompt) \
+        or _extract(r"「([^」]+)」について", prompt, DEFAULT_KEYWORD)
+    target_chars = int(_extract(r"(\d+)〜\d+文字", prompt, "1800"))
+
+    if "## ここまでの出力" in prompt:
+        # 続きの生成: 元のプロンプトに対する応答のうち、まだ出力していない部分を返す
+        original, rest = prompt.split("## ここまでの出力", 1)
+        partial = rest.split("<<<\n", 1)[-1].split("\n>>>", 1)[0]
+        return build_response_text(original, seed)[len(partial):]
+
+    if "構成案を作成" in prompt:
+        return build_outline(keyword, seed)
+
+    if "### 執筆するセクション" in prompt:
+        heading = _extract(r"### 執筆するセクション\n「([^」]+)」", prompt, keyword)
+        chars = int(_extract(r"（約(\d+)文字）", prompt, "400"))
+        rng = _rng_for(f"{keyword}:{heading}", seed)
+        return _section_body(rng, keyword, chars)
+
+    return build_article(keyword, target_chars, "FAQ" in prompt or "よくある質問" in prompt, seed)
+
+def build_json_article(prompt: str, seed: Optional[int]) -> str:
+    """構造化出力用の記事JSON（title・summary・content・tags・category）"""
+    keyword = _extract(r"メインキーワード\**:\s*「([^」]+)」", prompt) \
+        or _extract(r"「([^」]+)」について", prompt, DEFAULT_KEYWORD)
+    article = build_response_text(prompt, seed)
+    title = _extract(r"^# ([^\n]+)", article, keyword) if article.startswith("# ") else keyword
+    body = article.split("\n---\nMETA_DESCRIPTION:", 1)[0]
+    if body.startswith("# "):
+        body = body.split("\n", 1)[-1]
+    return json.dumps({
+        'title': title,
+        'summary': _extract(r"META_DESCRIPTION:\s*(.+)", article, f"{keyword}について解説します。"),
+        'content': body.strip(),
+        'tags': [keyword, "初心者向け", "解説"],
+        'category': keyword
+    }, ensure_ascii=False, indent=2)
+
+def split_tokens(text: str, chars_per_token: float) -> List[str]:
+    """テキストをトークン相当の断片に分割"""
+    size = max(1, int(round(chars_per_token)))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+# ---------------------------------------------------------------------------
+# HTTPハンドラー
+# ---------------------------------------------------------------------------
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """OpenAI・Anthropic・Ollama互換のリクエストハンドラー"""
+
+    server_version = "LLMStub/1.0"
+    protocol_version = "HTTP/1.1"
+    settings: StubSettings = StubSettings()
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    # --- 入出力 ---
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b""
+        return json.loads(body or b"{}")
+
+    def _send_json(self, status: int, payload: Dict, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _start_stream(self, content_type: str):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+    def _write(self, data: str):
+        self.wfile.write(data.encode('utf-8'))
+        self.wfile.flush()
+
+    # --- ルーティング ---
+
+    def do_GET(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if path == '/api/tags':
+            self._send_json(200, {'models': [{'name': 'llama3.2:latest'}, {'name': 'stub:latest'}]})
+        elif path in ('', '/health', '/stats'):
+            self._send_json(200, {'status': 'ok', 'counters': dict(self.settings.counters)})
+        elif not self._route_batch_get(path):
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        path = self.path.split('?', 1)[0].rstrip('/')
+        if self._route_batch_post(path):
+            return
+
+        handlers = {
+            '/v1/chat/completions': ('openai', self._handle_openai),
+            '/chat/completions': ('openai', self._handle_openai),
+            '/v1/messages': ('anthropic', self._handle_anthropic),
+            '/api/generate': ('ollama', self._handle_ollama),
+        }
+        if path not in handlers:
+            self._send_json(404, {'error': f'unknown endpoint: {path}'})
+            return
+
+        api, handler = handlers[path]
+        try:
+            body = self._read_json()
+        except ValueError:
+            self._send_json(400, {'error': 'invalid JSON'})
+            return
+
+        self.settings.count('requests')
+        if self._inject_failure(api):
+            return
+        handler(body)
+        self.settings.count('completed')
+
+    def _inject_failure(self, api: str) -> bool:
+        """設定に応じて429/500を返す"""
+        settings = self.settings
+        throttled = settings.roll(settings.rate_limit_rate) or \
+            (settings.bucket is not None and not settings.bucket.try_acquire())
+        if throttled:
+            settings.count('rate_limited')
+            self._send_error(api, 429, "Rate limit exceeded (stub)", {'Retry-After': '1'})
+            return True
+        if settings.roll(settings.error_rate):
+            settings.count('errors')
+            self._send_error(api, 500, "Internal server error (stub)")
+            return True
+        return False
+
+    def _send_error(self, api: str, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        if api == 'anthropic':
+            error_type = 'rate_limit_error' if status == 429 else 'api_error'
+            payload = {'type': 'error', 'error': {'type': error_type, 'message': message}}
+        elif api == 'openai':
+            error_type = 'rate_limit_exceeded' if status == 429 else 'server_error'
+            payload = {'error': {'message': message, 'type': error_type, 'code': error_type}}
+        else:
+            payload = {'error': message}
+        self._send_json(status, payload, headers)
+
+    # --- 生成 ---
+
+    def _generate(self, prompt: str, max_tokens: Optional[int],
+                  structured: bool = False) -> Tuple[List[str], bool]:
+        """トークン列と、max_tokensで打ち切ったかどうか（structuredならJSONで返す）"""
+        if structured:
+            text = build_json_article(prompt, self.settings.seed)
+        else:
+            text = build_response_text(prompt, self.settings.seed)
+        tokens = split_tokens(text, self.settings.chars_per_token)
+        if max_tokens and len(tokens) > max_tokens:
+            self.settings.count('truncated')
+            return tokens[:max_tokens], True
+        return tokens, False
+
+    def _stream_chunks(self, tokens: List[str]) -> Iterator[str]:
+        """TTFT・生成速度に合わせてチャンクを返す"""
+        time.sleep(self.settings.ttft)
+        size = self.settings.chunk_tokens
+        for i in range(0, len(tokens), size):
+            chunk = tokens[i:i + size]
+            if i:
+                time.sleep(self.settings.token_delay(len(chunk)))
+            yield "".join(chunk)
+
+    def _wait_full(self, tokens: List[str]):
+        """非ストリーミング時の生成時間"""
+        time.sleep(self.settings.ttft + self.settings.token_delay(len(tokens)))
+
+    def _prompt_tokens(self, prompt: str) -> int:
+        return max(1, int(len(prompt) / self.settings.chars_per_token))
+
+    def _handle_openai(self, body: Dict):
+        messages = body.get('messages', [])
+        prompt = "\n".join(m.get('content', '') if isinstance(m.get('content'), str) else
+                           "".join(part.get('text', '') for part in m.get('content', []))
+                           for m in messages if m.get('role') == 'user')
+        model = body.get('model', 'gpt-4')
+        structured = (body.get('response_format') or {}).get('type') in ('json_object', 'json_schema')
+        tokens, truncated = self._generate(prompt, body.get('max_tokens'), structured)
+        finish_reason = 'length' if truncated else 'stop'
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        if not body.get('stream'):
+            self._wait_full(tokens)
+            self._send_json(200, {
+                'id': completion_id,
+                'object': 'chat.completion',
+                'created': created,
+                'model': model,
+                'choices': [{
+                    'index': 0,
+                    'message': {'role': 'assistant', 'content': "".join(tokens)},
+                    'finish_reason': finish_reason
+                }],
+                'usage': {
+                    'prompt_tokens': self._prompt_tokens(prompt),
+                    'completion_tokens': len(tokens),
+                    'total_tokens': self._prompt_tokens(prompt) + len(tokens)
+                }
+            })
+            return
+
+        self._start_stream('text/event-stream')
+
+        def event(delta: Dict, reason: Optional[str] = None) -> str:
+            payload = {
+                'id': completion_id,
+                'object': 'chat.completion.chunk',
+                'created': created,
+                'model': model,
+                'choices': [{'index': 0, 'delta': delta, 'finish_reason': reason}]
+            }
+            return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        self._write(event({'role': 'assistant', 'content': ''}))
+        for chunk in self._stream_chunks(tokens):
+            self._write(event({'content': chunk}))
+        self._write(event({}, finish_reason))
+        self._write("data: [DONE]\n\n")
+
+    def _handle_anthropic(self, body: Dict):
+        parts = []
+        for message in body.get('messages', []):
+            if message.get('role') != 'user':
+                continue
+            content = message.get('content', '')
+            if isinstance(content, str):
+                parts.append(content)
+            else:
+                parts.extend(block.get('text', '') for block in content if block.get('type') == 'text')
+        prompt = "".join(parts)
+        model = body.get('model', 'claude-3-sonnet-20240229')
+        tool = (body.get('tools') or [None])[0]
+        tokens, truncated = self._generate(prompt, body.get('max_tokens'), tool is not None)
+        stop_reason = 'max_tokens' if truncated else ('tool_use' if tool else 'end_turn')
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        usage = {'input_tokens': self._prompt_tokens(prompt), 'output_tokens': len(tokens)}
+        if tool:
+            block = {'type': 'tool_use', 'id': f"toolu_{uuid.uuid4().hex[:24]}", 'name': tool.get('name')}
+
+        if not body.get('stream'):
+            self._wait_full(tokens)
+            self._send_json(200, {
+                'id': message_id,
+                'type': 'message',
+                'role': 'assistant',
+                'model': model,
+                'content': [dict(block, input=parse_json_tolerant("".join(tokens)) or {}) if tool else
+                            {'type': 'text', 'text': "".join(tokens)}],
+                'stop_reason': stop_reason,
+                'stop_sequence': None,
+                'usage': usage
+            })
+            return
+
+        self._start_stream('text/event-stream')
+
+        def event(name: str, payload: Dict) -> str:
+            payload = dict(payload, type=name)
+            return f"event: {name}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+        self._write(event('message_start', {'message': {
+            'id': message_id, 'type': 'message', 'role': 'assistant', 'model': model, 'content': [],
+            'stop_reason': None, 'stop_sequence': None,
+            'usage': {'input_tokens': usage['input_tokens'], 'output_tokens': 0}
+        }}))
+        self._write(event('content_block_start', {'index': 0, 'content_block':
+                                                  dict(block, input={}) if tool else {'type': 'text', 'text': ''}}))
+        for chunk in self._stream_chunks(tokens):
+            delta = {'type': 'input_json_delta', 'partial_json': chunk} if tool else \
+                {'type': 'text_delta', 'text': chunk}
+            self._write(event('content_block_delta', {'index': 0, 'delta': delta}))
+        self._write(event('content_block_stop', {'index': 0}))
+        self._write(event('message_delta', {'delta': {'stop_reason': stop_reason, 'stop_sequence': None},
+                                            'usage': {'output_tokens': len(tokens)}}))
+        self._write(event('message_stop', {}))
+
+    def _handle_ollama(self, body: Dict):
+        prompt = body.get('prompt', '')
+        model = body.get('model', 'llama3.2')
+        options = body.get('options', {})
+        max_tokens = options.get('num_predict')
+        tokens, truncated = self._generate(prompt, max_tokens if max_tokens and max_tokens > 0 else None,
+                                           bool(body.get('format')))
+        done_reason = 'length' if truncated else 'stop'
+        created_at = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+        if not body.get('stream', True):
+            self._wait_full(tokens)
+            self._send_json(200, {
+                'model': model,
+                'created_at': created_at,
+                'response': "".join(tokens),
+                'done': True,
+                'done_reason': done_reason,
+                'prompt_eval_count': self._prompt_tokens(prompt),
+                'eval_count': len(tokens)
+            })
+            return
+
+        self._start_stream('application/x-ndjson')
+        for chunk in self._stream_chunks(tokens):
+            self._write(json.dumps({'model': model, 'created_at': created_at,
+                                    'response': chunk, 'done': False}, ensure_ascii=False) + "\n")
+        self._write(json.dumps({'model': model, 'created_at': created_at, 'response': '',
+                                'done': True, 'done_reason': done_reason,
+                                'prompt_eval_count': self._prompt_tokens(prompt),
+                                'eval_count': len(tokens)}, ensure_ascii=False) + "\n")
+
+    # --- バッチAPI ---
+
+    def _route_batch_get(self, path: str) -> bool:
+        """バッチAPIのGET（該当しなければFalse）"""
+        if path in ('/v1/batches', '/batches'):
+            self._list_openai_batches()
+            return True
+        if path == '/v1/messages/batches':
+            self._list_anthropic_batches()
+            return True
+        match = re.fullmatch(r'(?:/v1)?/batches/([\w-]+)', path)
+        if match:
+            self._openai_batch_status(match.group(1))
+            return True
+        match = re.fullmatch(r'(?:/v1)?/files/([\w-]+)/content', path)
+        if match:
+            self._send_file(match.group(1))
+            return True
+        match = re.fullmatch(r'/v1/messages/batches/([\w-]+)(/results)?', path)
+        if match:
+            if match.group(2):
+                self._anthropic_batch_results(match.group(1))
+            else:
+                self._anthropic_batch_status(match.group(1))
+            return True
+        return False
+
+    def _route_batch_post(self, path: str) -> bool:
+        """バッチAPIのPOST（該当しなければFalse）"""
+        if path in ('/v1/files', '/files'):
+            self._upload_file()
+        elif path in ('/v1/batches', '/batches'):
+            self._create_openai_batch(self._read_json())
+        elif path == '/v1/messages/batches':
+            self._create_anthropic_batch(self._read_json())
+        else:
+            return False
+        return True
+
+    def _upload_file(self):
+        """multipart/form-dataのファイルアップロード"""
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b""
+        header = f"Content-Type: {self.headers.get('Content-Type', '')}\r\n\r\n".encode('utf-8')
+        message = BytesParser(policy=email.policy.HTTP).parsebytes(header + body)
+
+        fields: Dict[str, Tuple[Optional[str], bytes]] = {}
+        if message.is_multipart():
+            for part in message.iter_parts():
+                name = part.get_param('name', header='content-disposition')
+                fields[name] = (part.get_filename(), part.get_payload(decode=True) or b"")
+        if 'file' not in fields:
+            self._send_json(400, {'error': {'message': 'file is required', 'type': 'invalid_request_error'}})
+            return
+
+        filename, data = fields['file']
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        with self.settings._lock:
+            self.settings.files[file_id] = data
+        self._send_json(200, {
+            'id': file_id,
+            'object': 'file',
+            'bytes': len(data),
+            'created_at': int(time.time()),
+            'filename': filename or 'batch.jsonl',
+            'purpose': fields.get('purpose', (None, b'batch'))[1].decode('utf-8')
+        })
+
+    def _send_file(self, file_id: str):
+        data = self.settings.files.get(file_id)
+        if data is None:
+            self._send_json(404, {'error': {'message': f'No such file: {file_id}', 'type': 'invalid_request_error'}})
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/jsonl')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _batch_ready(self, batch: Dict) -> bool:
+        return time.time() - batch['_submitted'] >= self.settings.batch_delay
+
+    def _batch_completion(self, body: Dict) -> Tuple[str, bool, int]:
+        """バッチ内の1リクエスト分を生成（待機なし）: (テキスト, 打ち切り, トークン数)"""
+        parts = []
+        for message in body.get('messages', []):
+            if message.get('role') != 'user':
+                continue
+            content = message.get('content', '')
+            if isinstance(content, str):
+                parts.append(content)
+            else:
+                parts.extend(block.get('text', '') for block in content if block.get('type') == 'text')
+        tokens, truncated = self._generate("".join(parts), body.get('max_tokens'))
+        return "".join(tokens), truncated, len(tokens)
+
+    def _create_openai_batch(self, body: Dict):
+        data = self.settings.files.get(body.get('input_file_id', ''))
+        if data is None:
+            self._send_json(400, {'error': {'message': 'input_file_id not found', 'type': 'invalid_request_error'}})
+            return
+
+        batch_id = f"batch_{uuid.uuid4().hex[:24]}"
+        lines = [json.loads(line) for line in data.decode('utf-8').splitlines() if line.strip()]
+        batch = {
+            'id': batch_id,
+            'object': 'batch',
+            'endpoint': body.get('endpoint', '/v1/chat/completions'),
+            'input_file_id': body['input_file_id'],
+            'completion_window': body.get('completion_window', '24h'),
+            'status': 'in_progress',
+            'output_file_id': None,
+            'error_file_id': None,
+            'created_at': int(time.time()),
+            'request_counts': {'total': len(lines), 'completed': 0, 'failed': 0},
+            'metadata': body.get('metadata'),
+            '_submitted': time.time(),
+            '_lines': lines,
+        }
+        with self.settings._lock:
+            self.settings.batches[batch_id] = batch
+        self.settings.count('batches')
+        self._send_json(200, self._public_batch(batch))
+
+    def _list_openai_batches(self):
+        # 新しい順にすべて返す（ページングはしない）
+        batches = [self._public_batch(batch) for batch in self.settings.batches.values()
+                   if batch.get('object') == 'batch']
+        batches.sort(key=lambda batch: batch['created_at'], reverse=True)
+        self._send_json(200, {'object': 'list', 'data': batches, 'has_more': False})
+
+    def _list_anthropic_batches(self):
+        # 新しい順にすべて返す（ページングはしない）
+        batches = [self._public_batch(batch) for batch in self.settings.batches.values()
+                   if batch.get('type') == 'message_batch']
+        batches.sort(key=lambda batch: batch['created_at'], reverse=True)
+        self._send_json(200, {'data': batches, 'has_more': False,
+                              'first_id': batches[0]['id'] if batches else None,
+                              'last_id': batches[-1]['id'] if batches else None})
+
+    def _openai_batch_status(self, batch_id: str):
+        batch = self.settings.batches.get(batch_id)
+        if batch is None:
+            self._send_json(404, {'error': {'message': f'No such batch: {batch_id}', 'type': 'invalid_request_error'}})
+            return
+
+        if batch['status'] == 'in_progress' and self._batch_ready(batch):
+            results = []
+            for line in batch['_lines']:
+                failed = self.settings.roll(self.settings.error_rate)
+                result = {'id': f"batch_req_{uuid.uuid4().hex[:24]}", 'custom_id': line.get('custom_id'),
+                          'response': None, 'error': None}
+                if failed:
+                    result['response'] = {'status_code': 500, 'request_id': uuid.uuid4().hex,
+                                          'body': {'error': {'message': 'Internal server error (stub)',
+                                                             'type': 'server_error'}}}
+                    batch['request_counts']['failed'] += 1
+                else:
+                    text, truncated, count = self._batch_completion(line.get('body', {}))
+                    result['response'] = {'status_code': 200, 'request_id': uuid.uuid4().hex, 'body': {
+                        'id': f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                        'object': 'chat.completion',
+                        'model': line.get('body', {}).get('model', 'gpt-4'),
+                        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': text},
+                                     'finish_reason': 'length' if truncated else 'stop'}],
+                        'usage': {'completion_tokens': count}
+                    }}
+                    batch['request_counts']['completed'] += 1
+                results.append(json.dumps(result, ensure_ascii=False))
+
+            file_id = f"file-{uuid.uuid4().hex[:24]}"
+            with self.settings._lock:
+                self.settings.files[file_id] = ("\n".join(results) + "\n").encode('utf-8')
+            batch.update(status='completed', output_file_id=file_id, completed_at=int(time.time()))
+
+        self._send_json(200, self._public_batch(batch))
+
+    def _create_anthropic_batch(self, body: Dict):
+        batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+        requests_ = body.get('requests', [])
+        batch = {
+            'id': batch_id,
+            'type': 'message_batch',
+            'processing_status': 'in_progress',
+            'request_counts': {'processing': len(requests_), 'succeeded': 0, 'errored': 0,
+                               'canceled': 0, 'expired': 0},
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+            'results_url': None,
+            '_submitted': time.time(),
+            '_requests': requests_,
+        }
+        with self.settings._lock:
+            self.settings.batches[batch_id] = batch
+        self.settings.count('batches')
+        self._send_json(200, self._public_batch(batch))
+
+    def _anthropic_batch_status(self, batch_id: str):
+        batch = self.settings.batches.get(batch_id)
+        if batch is None:
+            self._send_json(404, {'type': 'error', 'error': {'type': 'not_found_error', 'message': batch_id}})
+            return
+
+        if batch['processing_status'] == 'in_progress' and self._batch_ready(batch):
+            results = []
+            counts = batch['request_counts']
+            for request in batch['_requests']:
+                params = request.get('params', {})
+                if self.settings.roll(self.settings.error_rate):
+                    result = {'type': 'errored', 'error': {'type': 'api_error',
+                                                           'message': 'Internal server error (stub)'}}
+                    counts['errored'] += 1
+                else:
+                    text, truncated, count = self._batch_completion(params)
+                    result = {'type': 'succeeded', 'message': {
+                        'id': f"msg_{uuid.uuid4().hex[:24]}",
+                        'type': 'message',
+                        'role': 'assistant',
+                        'model': params.get('model', 'claude-3-sonnet-20240229'),
+                        'content': [{'type': 'text', 'text': text}],
+                        'stop_reason': 'max_tokens' if truncated else 'end_turn',
+                        'usage': {'output_tokens': count}
+                    }}
+                    counts['succeeded'] += 1
+                counts['processing'] -= 1
+                results.append(json.dumps({'custom_id': request.get('custom_id'), 'result': result},
+                                          ensure_ascii=False))
+
+            batch['_results'] = ("\n".join(results) + "\n").encode('utf-8')
+            batch.update(processing_status='ended',
+                         ended_at=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                         results_url=f"http://{self.headers.get('Host')}/v1/messages/batches/{batch_id}/results")
+
+        self._send_json(200, self._public_batch(batch))
+
+    def _anthropic_batch_results(self, batch_id: str):
+        batch = self.settings.batches.get(batch_id)
+        if batch is None or '_results' not in batch:
+            self._send_json(404, {'type': 'error', 'error': {'type': 'not_found_error',
+                                                             'message': f'results not ready: {batch_id}'}})
+            return
+        data = batch['_results']
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-jsonl')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    @staticmethod
+    def _public_batch(batch: Dict) -> Dict:
+        return {key: value for key, value in batch.items() if not key.startswith('_')}
+
+def create_server(host: str = "127.0.0.1", port: int = 8765,
+                  settings: Optional[StubSettings] = None) -> ThreadingHTTPServer:
+    """
+    スタブサーバーを作成（serve_forever()で起動）
+
+    Args:
+        host: バインドするホスト
+        port: ポート番号（0で空きポート）
+        settings: 挙動設定
+
+    Returns:
+        ThreadingHTTPServer
+    """
+    handler = type('ConfiguredStubRequestHandler', (StubRequestHandler,),
+                   {'settings': settings or StubSettings()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description='負荷試験用LLMスタブサーバー')
+    parser.add_argument('--host', default='127.0.0.1', help='バインドするホスト')
+    parser.add_argument('--port', type=int, default=8765, help='ポート番号')
+    parser.add_argument('--ttft', type=float, default=0.5, help='最初のトークンまでの秒数')
+    parser.add_argument('--tokens-per-sec', type=float, default=50.0, help='生成速度（0で待機なし）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='500エラーを返す確率')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='429を返す確率')
+    parser.add_argument('--max-rps', type=float, help='1秒あたりのリクエスト上限（超過分は429）')
+    parser.add_argument('--chars-per-token', type=float, default=1.0, help='1トークンあたりの文字数')
+    parser.add_argument('--batch-delay', type=float, default=2.0, help='バッチが完了するまでの秒数')
+    parser.add_argument('--seed', type=int, help='乱数シード')
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=getattr(logging, args.log_level),
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    settings = StubSettings(
+        ttft=args.ttft,
+        tokens_per_sec=args.tokens_per_sec,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_rps=args.max_rps,
+        chars_per_token=args.chars_per_token,
+        batch_delay=args.batch_delay,
+        seed=args.seed
+    )
+    server = create_server(args.host, args.port, settings)
+
+    print(f"🧪 LLMスタブサーバー起動: http://{args.host}:{args.port}")
+    print(f"   OpenAI:    OPENAI_API_BASE=http://{args.host}:{args.port}/v1")
+    print(f"   Anthropic: ANTHROPIC_BASE_URL=http://{args.host}:{args.port}")
+    print(f"   Ollama:    --base-url http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"統計: {settings.counters}")
+
+if __name__ == "__main__":
+    main()
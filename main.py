@@ -5,19 +5,29 @@ AI記事自動生成システム - メインエントリーポイント
 """
 
 import argparse
+import glob
 import json
 import logging
 import os
 import sys
+from dataclasses import asdict
 from datetime import datetime
 from typing import Dict, List, Optional
 
 # srcディレクトリをパスに追加
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from keyword_research import KeywordResearcher
+from keyword_research import KeywordResearcher, TrendsCache, HISTORY_MAX_AGE, TRENDS_MIN_RATE, TRENDS_MAX_RATE
+from keyword_backlog import KeywordBacklog
+from trend_history import TrendHistoryStore
+from rate_limit import AdaptiveRateLimiter, CircuitBreaker
 from article_generator import ArticleGenerator, ArticleConfig
-from seo_optimizer import SEOOptimizer
+from batch_jobs import BatchJobManager
+from llm_cache import LLMResponseCache
+from llm_router import build_router
+from retry_policy import HedgedCaller, RetryPolicy
+from seo_optimizer import SEOAuditReport, SEOOptimizer
+from token_budget import TokenBudgetEstimator
 from publisher import WordPressPublisher, PublishConfig, MultiPlatformPublisher
 
 # ログ設定
@@ -39,19 +49,104 @@ logger = logging.getLogger(__name__)
 class AIArticleSystem:
     """AI記事自動生成システムメインクラス"""
     
-    def __init__(self, config_path: str = "config/api_keys.json"):
+    def __init__(self, config_path: str = "config/api_keys.json", use_cache: bool = True):
         """初期化"""
         self.config = self._load_config(config_path)
-        self.keyword_researcher = KeywordResearcher()
+        
+        # Google Trendsの応答キャッシュ（他のスクリプトとも data/trends_cache.db を共有）
+        trends_config = dict(self.config.get('trends_cache', {}))
+        trends_cache = None
+        if trends_config.pop('enabled', True):
+            trends_cache = TrendsCache(
+                db_path=trends_config.get('path', 'data/trends_cache.db'),
+                ttls=trends_config.get('ttl_seconds'),
+                stale_factor=trends_config.get('stale_factor', 4.0)
+            )
+        # Google Trendsのレート制御（429で減速）とサーキットブレーカー（連続失敗で停止）
+        limit_config = self.config.get('trends_rate_limit', {})
+        request_interval = limit_config.get('initial_interval', 2.0)
+        trends_limiter = AdaptiveRateLimiter(
+            rate=1.0 / request_interval,
+            min_rate=limit_config.get('min_rate', TRENDS_MIN_RATE),
+            max_rate=limit_config.get('max_rate', TRENDS_MAX_RATE)
+        )
+        trends_breaker = CircuitBreaker(
+            failure_threshold=limit_config.get('failure_threshold', 5),
+            reset_timeout=limit_config.get('reset_timeout', 300),
+            name="Google Trends"
+        )
+        # 検索推移・リサーチ結果の履歴（日付パーティションのParquet）
+        history_config = dict(self.config.get('trend_history', {}))
+        self.trend_history = None
+        if history_config.pop('enabled', True):
+            self.trend_history = TrendHistoryStore(
+                root=history_config.get('path', 'data/trend_history'),
+                daily_after_days=history_config.get('daily_after_days', 14),
+                weekly_after_days=history_config.get('weekly_after_days', 180)
+            )
+        self.keyword_researcher = KeywordResearcher(
+            cache=trends_cache,
+            use_cache=trends_cache is not None,
+            rate_limiter=trends_limiter,
+            circuit_breaker=trends_breaker,
+            max_attempts=limit_config.get('max_attempts', 3),
+            history=self.trend_history,
+            history_max_age=history_config.get('max_age_hours', HISTORY_MAX_AGE / 3600) * 3600
+        )
+        
+        # リサーチ結果を蓄積し、優先度順に記事生成へ渡すバックログ
+        backlog_config = self.config.get('keyword_backlog', {})
+        self.keyword_backlog = KeywordBacklog(
+            db_path=backlog_config.get('path', 'data/keyword_backlog.db'),
+            half_life_hours=backlog_config.get('half_life_hours', 72),
+            max_attempts=backlog_config.get('max_attempts', 3),
+            claim_timeout=backlog_config.get('claim_timeout_minutes', 60) * 60
+        )
+        
+        # LLMレスポンスキャッシュ
+        cache_config = self.config.get('llm_cache', {})
+        self.llm_cache = None
+        if cache_config.get('enabled', True):
+            self.llm_cache = LLMResponseCache(
+                db_path=cache_config.get('path', 'data/llm_cache.db'),
+                ttl_seconds=cache_config.get('ttl_hours', 168) * 3600,
+                max_entries=cache_config.get('max_entries', 5000),
+                bypass=not use_cache
+            )
+        
+        # モデルごとの文字数/トークン比（max_tokensの見積もりに使用）
+        budget_config = self.config.get('token_budget', {})
+        self.token_budget = TokenBudgetEstimator(
+            state_path=budget_config.get('path', 'data/token_budget.json'),
+            headroom=budget_config.get('headroom', 1.3)
+        )
+        
+        # 一時エラーの再試行と、遅い呼び出しへのヘッジ（llm_hedging.enabled の場合のみ）
+        self.retry_policy = RetryPolicy(**self.config.get('llm_retry', {}))
+        hedging_config = dict(self.config.get('llm_hedging', {}))
+        self.hedging = HedgedCaller(**hedging_config) if hedging_config.pop('enabled', False) else None
+        
+        # 複数プロバイダーのルーター（llm_router.enabled の場合のみ）
+        self.llm_router = build_router(self.config)
         
         # ArticleGenerator初期化
         self.article_generator = ArticleGenerator(
             openai_api_key=self.config.get('openai_api_key'),
-            anthropic_api_key=self.config.get('anthropic_api_key')
+            anthropic_api_key=self.config.get('anthropic_api_key'),
+            openai_base_url=self.config.get('openai_base_url'),
+            anthropic_base_url=self.config.get('anthropic_base_url'),
+            cache=self.llm_cache,
+            router=self.llm_router,
+            token_budget=self.token_budget,
+            retry_policy=self.retry_policy,
+            hedging=self.hedging
         )
         
         self.seo_optimizer = SEOOptimizer()
         
+        # プロバイダーのバッチAPIによる一括生成（ジョブ記録の保存先）
+        self.batch_config = self.config.get('batch_jobs', {})
+        
         # WordPress Publisher（設定がある場合）
         self.publisher = None
         wp_config = self.config.get('wordpress', {})
@@ -96,14 +191,108 @@ class AIArticleSystem:
         self.keyword_researcher.save_keyword_data(keywords, json_file)
         
         logger.info(f"{len(keywords)}個のキーワードを取得し、{csv_file}, {json_file}に保存しました")
+        trends_metrics = self.keyword_researcher.metrics()
+        if trends_metrics['cache']:
+            logger.info(f"トレンドキャッシュ統計: {trends_metrics['cache']}")
+        logger.info(f"Google Trendsリクエスト統計: {trends_metrics['rate_limiter']}, "
+                    f"サーキットブレーカー: {trends_metrics['circuit_breaker']}, "
+                    f"履歴から読んだ検索推移: {trends_metrics['history_hits']}")
+        
+        # 履歴に追加し、古い検索推移を間引く
+        if self.trend_history:
+            self.trend_history.append_snapshots(keywords)
+            self.trend_history.downsample()
         
-        # 上位キーワード表示
-        for i, keyword_data in enumerate(keywords[:5], 1):
-            print(f"{i}. {keyword_data.main_keyword} (トレンドスコア: {keyword_data.trend_score:.1f})")
+        # バックログに追加・再スコアリング
+        self.keyword_backlog.merge(keywords)
+        
+        # 上位キーワード表示（過去のリサーチ結果を含むバックログの上位）
+        self.show_backlog(5)
         
         return keywords
     
-    def generate_article(self, keyword: str, length: int = 1500) -> Optional:
+    def research_candidates(self, candidates_file: str, limit: int = 10) -> List:
+        """候補キーワードのファイル（1行1キーワード、#以降はコメント）をまとめてスコアリングする"""
+        with open(candidates_file, 'r', encoding='utf-8') as f:
+            candidates = [line.split('#', 1)[0].strip() for line in f]
+        candidates = [keyword for keyword in candidates if keyword]
+        logger.info(f"候補キーワードのスコアリング開始: {len(candidates)}個 ({candidates_file})")
+        
+        keywords = self.keyword_researcher.research_candidates(candidates)
+        if not keywords:
+            logger.warning("候補キーワードをスコアリングできませんでした")
+            return []
+        
+        # 結果保存
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        csv_file = f"output/candidates_{timestamp}.csv"
+        json_file = f"output/candidates_{timestamp}.json"
+        
+        self.keyword_researcher.export_to_csv(keywords, csv_file)
+        self.keyword_researcher.save_keyword_data(keywords, json_file)
+        logger.info(f"{len(keywords)}個の候補キーワードをスコアリングし、{csv_file}, {json_file}に保存しました")
+        
+        # 履歴の間引き・バックログに追加
+        if self.trend_history:
+            self.trend_history.append_snapshots(keywords)
+            self.trend_history.downsample()
+        self.keyword_backlog.merge(keywords)
+        
+        print(f"\\n=== 候補キーワード上位{min(limit, len(keywords))}個 ===")
+        for i, keyword_data in enumerate(keywords[:limit], 1):
+            print(f"{i}. {keyword_data.main_keyword} "
+                  f"(トレンドスコア: {keyword_data.trend_score:.1f}, ボリューム: {keyword_data.search_volume})")
+        
+        self.show_backlog(5)
+        return keywords
+    
+    def show_backlog(self, limit: int = 10) -> None:
+        """バックログの上位キーワードを表示"""
+        for i, (keyword_data, score) in enumerate(self.keyword_backlog.peek(limit), 1):
+            print(f"{i}. {keyword_data.main_keyword} (スコア: {score:.1f}, トレンドスコア: {keyword_data.trend_score:.1f}, "
+                  f"検索ボリューム: {keyword_data.search_volume}, 競合性: {keyword_data.competition})")
+        print(f"バックログ: {self.keyword_backlog.stats()}")
+    
+    def generate_from_backlog(self, count: int, status: str = "draft", concurrency: int = 4) -> None:
+        """
+        バックログから優先度の高い順にキーワードを取り出して記事生成・投稿
+        
+        生成できたキーワードは生成済みに、失敗したキーワードは試行回数の上限まで待ち状態に戻す。
+        """
+        logger.info(f"バックログから最大{count}記事を生成 (並列数: {concurrency})")
+        
+        success_count = 0
+        batch = self.article_generator.generate_batch(
+            self.keyword_backlog.iter_pop(count),
+            concurrency=concurrency
+        )
+        for i, (keyword_data, article) in enumerate(batch, 1):
+            keyword = keyword_data.main_keyword
+            print(f"\n[{i}/{count}] 完了: {keyword}")
+            
+            try:
+                if article is None:
+                    self.keyword_backlog.mark_failed(keyword, "記事生成に失敗しました")
+                    logger.error(f"記事生成に失敗しました: {keyword}")
+                    continue
+                
+                self._finalize_article(article, keyword)
+                if self.publisher and not self._publish(article, status):
+                    self.keyword_backlog.mark_failed(keyword, "投稿に失敗しました")
+                    continue
+                
+                self.keyword_backlog.mark_generated(keyword)
+                success_count += 1
+                
+            except Exception as e:
+                logger.error(f"処理エラー {keyword}: {e}")
+                self.keyword_backlog.mark_failed(keyword, str(e))
+        
+        print(f"\nバックログからの生成完了: {success_count}件成功")
+        print(f"バックログ: {self.keyword_backlog.stats()}")
+    
+    def generate_article(self, keyword: str, length: int = 1500, stream: bool = False,
+                         mode: str = "single") -> Optional:
         """記事生成を実行"""
         logger.info(f"記事生成開始: {keyword}")
         
@@ -112,30 +301,57 @@ class AIArticleSystem:
             min_length=length,
             max_length=length + 500,
             model="gpt-4",
-            temperature=0.7
+            temperature=0.7,
+            generation_mode=mode
         )
         
         # 記事生成
-        article = self.article_generator.generate_article(keyword)
+        if stream:
+            article = self._generate_article_streaming(keyword, config)
+        else:
+            article = self.article_generator.generate_article(keyword, config=config)
         
         if not article:
             logger.error("記事生成に失敗しました")
             return None
         
+        return self._finalize_article(article, keyword)
+    
+    def _generate_article_streaming(self, keyword: str, config: Optional[ArticleConfig] = None):
+        """ストリーミング生成し、確定したセクションから順に表示"""
+        article = None
+        for event in self.article_generator.generate_article_stream(keyword, config=config):
+            if event['type'] == 'title':
+                print(f"\n# {event['title']}")
+            elif event['type'] == 'intro':
+                print(f"\n{event['content']}")
+            elif event['type'] == 'section':
+                print(f"\n## {event['heading']}\n{event['content']}")
+            elif event['type'] == 'meta_description':
+                print(f"\nMETA_DESCRIPTION: {event['meta_description']}")
+            elif event['type'] == 'article':
+                article = event['article']
+        return article
+    
+    def _finalize_article(self, article, keyword: str):
+        """生成済み記事のSEO最適化・保存・結果表示"""
         # SEO最適化
         logger.info("SEO最適化実行")
+        # 生成時に計算したテキスト統計を分析・最適化でも使い回す
         analysis = self.seo_optimizer.analyze_article(
             article.title,
             article.content,
             article.meta_description,
-            keyword
+            keyword,
+            stats=article.text_stats
         )
         
         optimized = self.seo_optimizer.optimize_article(
             article.title,
             article.content,
             article.meta_description,
-            keyword
+            keyword,
+            stats=article.text_stats
         )
         
         # 最適化結果を記事に反映
@@ -170,6 +386,10 @@ class AIArticleSystem:
         if not article:
             return False
         
+        return self._publish(article, status)
+    
+    def _publish(self, article, status: str = "draft") -> bool:
+        """生成済み記事をWordPressに投稿"""
         # 投稿設定
         config = PublishConfig(
             status=status,
@@ -192,21 +412,24 @@ class AIArticleSystem:
             print(f"投稿失敗: {result.message}")
             return False
     
-    def batch_generate(self, keywords: List[str], status: str = "draft") -> None:
-        """複数記事の一括生成・投稿"""
-        logger.info(f"{len(keywords)}記事の一括処理開始")
+    def batch_generate(self, keywords: List[str], status: str = "draft",
+                       concurrency: int = 4) -> None:
+        """複数記事の一括生成・投稿（concurrency件まで並列に生成）"""
+        logger.info(f"{len(keywords)}記事の一括処理開始 (並列数: {concurrency})")
         
         results = []
         
-        for i, keyword in enumerate(keywords, 1):
-            print(f"\\n[{i}/{len(keywords)}] 処理中: {keyword}")
+        batch = self.article_generator.generate_batch(keywords, concurrency=concurrency)
+        for i, (keyword, article) in enumerate(batch, 1):
+            print(f"\\n[{i}/{len(keywords)}] 完了: {keyword}")
             
             try:
-                if self.publisher:
-                    success = self.publish_article(keyword, status)
+                if article is None:
+                    logger.error(f"記事生成に失敗しました: {keyword}")
+                    success = False
                 else:
-                    article = self.generate_article(keyword)
-                    success = article is not None
+                    self._finalize_article(article, keyword)
+                    success = self._publish(article, status) if self.publisher else True
                 
                 results.append({
                     'keyword': keyword,
@@ -214,10 +437,6 @@ class AIArticleSystem:
                     'timestamp': datetime.now().isoformat()
                 })
                 
-                # API制限対策
-                import time
-                time.sleep(30)
-                
             except Exception as e:
                 logger.error(f"処理エラー {keyword}: {e}")
                 results.append({
@@ -239,6 +458,70 @@ class AIArticleSystem:
             json.dump(results, f, ensure_ascii=False, indent=2)
         
         logger.info(f"一括処理ログ保存: {log_file}")
+        
+        if self.llm_cache:
+            logger.info(f"LLMキャッシュ統計: {self.llm_cache.stats()}")
+        if self.llm_router:
+            logger.info(f"LLMルーター統計: {self.llm_router.stats()}")
+        logger.info(f"プロンプトテンプレート統計: {self.article_generator.prompt_templates.stats()}")
+        logger.info(f"トークン予算統計: {self.token_budget.stats()}")
+        logger.info(f"LLM再試行統計: {self.retry_policy.stats()}")
+        if self.hedging:
+            logger.info(f"ヘッジリクエスト統計: {self.hedging.stats()}")
+    
+    def bulk_generate(self, keywords: List[str], length: int = 1500, model: str = "gpt-4",
+                      job_id: Optional[str] = None, wait: bool = True) -> Optional[Dict]:
+        """
+        プロバイダーのバッチAPIで一括生成（夜間など急がない大量生成用）
+        
+        job_idを指定すると、記録済みのジョブを中断した段階から再開する。
+        回収した結果は通常の生成と同じ解析→SEO最適化→保存を通す。
+        """
+        manager = BatchJobManager(self.config, self.batch_config.get('path', 'data/batch_jobs'))
+        
+        if job_id:
+            record = manager.load(job_id)
+            config = ArticleConfig(**record.config)
+            logger.info(f"バッチジョブ再開: {record.summary()}")
+        else:
+            config = ArticleConfig(
+                min_length=length,
+                max_length=length + 500,
+                model=model,
+                temperature=0.7
+            )
+            requests_by_keyword = [
+                self.article_generator.prepare_request(keyword, config=config)
+                for keyword in keywords
+            ]
+            record = manager.create(requests_by_keyword, config.model, asdict(config))
+            print(f"バッチジョブID: {record.job_id}")
+        
+        def handle_result(item, result) -> Optional[str]:
+            article = self.article_generator.article_from_text(
+                result['text'],
+                item.keyword,
+                config=config,
+                finish_reason=result['finish_reason'],
+                output_tokens=result['output_tokens']
+            )
+            if article is None:
+                return None
+            self._finalize_article(article, item.keyword)
+            return article.title
+        
+        summary = manager.run(
+            record,
+            handle_result,
+            poll_interval=self.batch_config.get('poll_interval', 60),
+            timeout=None if wait else 0
+        )
+        
+        print(f"\nバッチジョブ {summary['job_id']}: {summary['status']} {summary['items']}")
+        if summary['status'] not in ('collected', 'failed'):
+            print(f"再開: python main.py bulk --resume {summary['job_id']}")
+        logger.info(f"トークン予算統計: {self.token_budget.stats()}")
+        return summary
     
     def analyze_seo(self, title: str, content_file: str, keyword: str) -> None:
         """SEO分析のみ実行"""
@@ -277,6 +560,48 @@ class AIArticleSystem:
         self.seo_optimizer.save_analysis_report(analysis, report_file)
         
         print(f"\\n詳細レポート: {report_file}")
+    
+    def audit_articles(self, pattern: str = "output/articles/*.json", workers: Optional[int] = None,
+                       chunksize: int = 32, per_article: bool = False) -> None:
+        """保存済み記事をまとめて再監査（プロセスプールで並列にSEO分析）"""
+        paths = sorted(glob.glob(pattern))
+        if not paths:
+            logger.warning(f"監査対象の記事がありません: {pattern}")
+            return
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_file = f"output/seo_audit_{timestamp}.json"
+        jsonl_file = f"output/seo_audit_{timestamp}.jsonl" if per_article else None
+        report = SEOAuditReport(jsonl_file)
+        
+        logger.info(f"SEO監査開始: {len(paths)}記事")
+        start = datetime.now()
+        try:
+            for done, _ in enumerate(
+                self.seo_optimizer.analyze_articles(paths, workers, chunksize, ordered=False, report=report), 1
+            ):
+                if done % 1000 == 0:
+                    logger.info(f"SEO監査: {done}/{len(paths)}記事完了")
+        finally:
+            report.save(report_file)
+        elapsed = (datetime.now() - start).total_seconds()
+        
+        summary = report.to_dict()
+        print(f"\n=== SEO監査結果 ({summary['article_count']}記事, {elapsed:.1f}秒) ===")
+        for field, score in summary['average_scores'].items():
+            print(f"{field}: {score:.1f}")
+        
+        print("\n=== 多い警告 ===")
+        for warning, count in summary['common_warnings'][:5]:
+            print(f"- {warning} ({count}記事)")
+        
+        print("\n=== スコアの低い記事 ===")
+        for article in summary['lowest_scoring_articles'][:5]:
+            print(f"- {article['overall_seo_score']:.1f}: {article['id']}")
+        
+        print(f"\n詳細レポート: {report_file}")
+        if jsonl_file:
+            print(f"記事ごとの結果: {jsonl_file}")
 
 def main():
     """メイン実行"""
@@ -287,11 +612,16 @@ def main():
     research_parser = subparsers.add_parser('research', help='キーワードリサーチ実行')
     research_parser.add_argument('--limit', type=int, default=10, help='取得キーワード数')
     research_parser.add_argument('--category', type=str, help='カテゴリ指定')
+    research_parser.add_argument('--candidates', metavar='FILE',
+                                 help='候補キーワードのファイル（1行1キーワード）をまとめてスコアリングしてバックログに追加')
     
     # 記事生成コマンド
     generate_parser = subparsers.add_parser('generate', help='記事生成実行')
     generate_parser.add_argument('keyword', type=str, help='ターゲットキーワード')
     generate_parser.add_argument('--length', type=int, default=1500, help='記事の長さ')
+    generate_parser.add_argument('--stream', action='store_true', help='生成中のセクションを逐次表示')
+    generate_parser.add_argument('--mode', default='single', choices=['single', 'outline'],
+                                 help='single: 一括生成 / outline: 見出しごとに並列生成')
     
     # 投稿コマンド  
     publish_parser = subparsers.add_parser('publish', help='記事生成・投稿実行')
@@ -302,6 +632,24 @@ def main():
     batch_parser = subparsers.add_parser('batch', help='一括記事生成')
     batch_parser.add_argument('keywords', nargs='+', help='キーワードリスト')
     batch_parser.add_argument('--status', default='draft', choices=['draft', 'publish'], help='投稿ステータス')
+    batch_parser.add_argument('--concurrency', type=int, default=4, help='同時生成数')
+    
+    # バッチAPIによる一括生成コマンド
+    bulk_parser = subparsers.add_parser('bulk', help='プロバイダーのバッチAPIで一括記事生成')
+    bulk_parser.add_argument('keywords', nargs='*', help='キーワードリスト')
+    bulk_parser.add_argument('--length', type=int, default=1500, help='記事の長さ')
+    bulk_parser.add_argument('--model', default='gpt-4', help='モデル（claude-* はAnthropic、それ以外はOpenAI）')
+    bulk_parser.add_argument('--resume', metavar='JOB_ID', help='記録済みのジョブを再開')
+    bulk_parser.add_argument('--no-wait', action='store_true', help='投入・状態確認のみ行い、完了を待たない')
+    
+    # キーワードバックログコマンド
+    backlog_parser = subparsers.add_parser('backlog', help='キーワードバックログの表示・生成')
+    backlog_parser.add_argument('--limit', type=int, default=10, help='表示するキーワード数')
+    backlog_parser.add_argument('--generate', type=int, metavar='COUNT', help='上位COUNT個のキーワードで記事生成')
+    backlog_parser.add_argument('--status', default='draft', choices=['draft', 'publish'], help='投稿ステータス')
+    backlog_parser.add_argument('--concurrency', type=int, default=4, help='同時生成数')
+    backlog_parser.add_argument('--purge-days', type=float, metavar='DAYS',
+                                help='DAYS日以上リサーチで見つかっていない未生成キーワードを削除')
     
     # SEO分析コマンド
     seo_parser = subparsers.add_parser('analyze', help='SEO分析実行')
@@ -309,11 +657,19 @@ def main():
     seo_parser.add_argument('content_file', type=str, help='コンテンツファイルパス')
     seo_parser.add_argument('keyword', type=str, help='ターゲットキーワード')
     
+    # SEO一括監査コマンド
+    audit_parser = subparsers.add_parser('audit', help='保存済み記事のSEO一括監査')
+    audit_parser.add_argument('--pattern', default='output/articles/*.json', help='記事JSONファイルのパターン')
+    audit_parser.add_argument('--workers', type=int, help='ワーカープロセス数（省略時はCPU数）')
+    audit_parser.add_argument('--chunksize', type=int, default=32, help='1回にワーカーへ送る記事数')
+    audit_parser.add_argument('--per-article', action='store_true', help='記事ごとの結果もJSON Linesで出力')
+    
     # テストコマンド
     test_parser = subparsers.add_parser('test', help='システムテスト実行')
     
     # 共通オプション
     parser.add_argument('--config', default='config/api_keys.json', help='設定ファイルパス')
+    parser.add_argument('--no-cache', action='store_true', help='LLMレスポンスキャッシュを参照しない')
     parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help='ログレベル')
     
     args = parser.parse_args()
@@ -325,24 +681,44 @@ def main():
     os.makedirs('output', exist_ok=True)
     
     # システム初期化
-    system = AIArticleSystem(args.config)
+    system = AIArticleSystem(args.config, use_cache=not args.no_cache)
     
     try:
         if args.command == 'research':
-            system.research_keywords(args.limit, args.category)
+            if args.candidates:
+                system.research_candidates(args.candidates, args.limit)
+            else:
+                system.research_keywords(args.limit, args.category)
         
         elif args.command == 'generate':
-            system.generate_article(args.keyword, args.length)
+            system.generate_article(args.keyword, args.length, args.stream, args.mode)
         
         elif args.command == 'publish':
             system.publish_article(args.keyword, args.status)
         
         elif args.command == 'batch':
-            system.batch_generate(args.keywords, args.status)
+            system.batch_generate(args.keywords, args.status, args.concurrency)
+        
+        elif args.command == 'bulk':
+            if not args.keywords and not args.resume:
+                bulk_parser.error("キーワードまたは --resume を指定してください")
+            system.bulk_generate(args.keywords, args.length, args.model, args.resume, not args.no_wait)
+        
+        elif args.command == 'backlog':
+            if args.purge_days is not None:
+                removed = system.keyword_backlog.purge(args.purge_days)
+                print(f"{removed}個のキーワードを削除しました")
+            if args.generate:
+                system.generate_from_backlog(args.generate, args.status, args.concurrency)
+            else:
+                system.show_backlog(args.limit)
         
         elif args.command == 'analyze':
             system.analyze_seo(args.title, args.content_file, args.keyword)
         
+        elif args.command == 'audit':
+            system.audit_articles(args.pattern, args.workers, args.chunksize, args.per_article)
+        
         elif args.command == 'test':
             from test_system import SystemTester
             tester = SystemTester(args.config)
@@ -16,18 +16,59 @@ import subprocess
 # srcディレクトリをパスに追加
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
+OLLAMA_DEFAULT_PORT = 11434
+
+def ollama_base_url(host: str) -> str:
+    """
+    OLLAMA_HOST形式の値をクライアント用のURLにする
+
+    OLLAMA_HOSTはサーバーの待ち受けアドレス（0.0.0.0、127.0.0.1:11434 など、スキーム無し）のため、
+    スキームとポートを補い、全アドレス待ち受け（0.0.0.0 / ::）はlocalhostに読み替える。
+
+    Args:
+        host: URLまたはホスト[:ポート]
+
+    Returns:
+        http(s)://ホスト:ポート 形式のURL（末尾の/は除く）
+    """
+    url = host.strip().rstrip('/')
+    if '://' not in url:
+        url = f"http://{url}"
+    scheme, _, address = url.partition('://')
+    address, slash, path = address.partition('/')
+
+    if address.startswith('['):
+        hostname, _, port = address[1:].partition(']')
+        port = port.lstrip(':')
+    elif address.count(':') > 1:
+        hostname, port = address, ''
+    else:
+        hostname, _, port = address.partition(':')
+
+    if hostname in ('', '0.0.0.0', '::'):
+        hostname = 'localhost'
+    elif ':' in hostname:
+        hostname = f"[{hostname}]"
+    if not port and scheme == 'http':
+        port = str(OLLAMA_DEFAULT_PORT)
+
+    return f"{scheme}://{hostname}{':' + port if port else ''}{slash}{path}"
+
+DEFAULT_BASE_URL = ollama_base_url(os.environ.get("OLLAMA_HOST", "http://localhost:11434"))
+
 class OllamaArticleGenerator:
     """Ollamaを使用した記事生成クラス"""
     
-    def __init__(self, model: str = "llama3.2"):
+    def __init__(self, model: str = "llama3.2", base_url: str = DEFAULT_BASE_URL):
         """
         初期化
         
         Args:
             model: 使用するモデル（llama3.2, mistral, gemma2等）
+            base_url: OllamaのURL（負荷試験ではllm_stub_server.pyのURLを指定）
         """
         self.model = model
-        self.base_url = "http://localhost:11434"
+        self.base_url = ollama_base_url(base_url)
         self.check_ollama_status()
     
     def check_ollama_status(self):
@@ -260,15 +301,17 @@ def main():
     parser.add_argument('--length', type=int, default=1500, help='文字数目安')
     parser.add_argument('--count', type=int, default=1, help='生成する記事数')
     parser.add_argument('--no-affiliate', action='store_true', help='アフィリエイトリンクを含めない')
+    parser.add_argument('--base-url', type=str, default=DEFAULT_BASE_URL, help='OllamaのURL')
     
     args = parser.parse_args()
+    args.base_url = ollama_base_url(args.base_url)
     
     print("🤖 Ollama AI記事生成システム")
     print("=" * 50)
     
     # Ollama状態確認
     try:
-        response = requests.get("http://localhost:11434/api/tags")
+        response = requests.get(f"{args.base_url}/api/tags")
         if response.status_code != 200:
             raise Exception("Ollama not running")
     except:
@@ -277,7 +320,7 @@ def main():
         return
     
     # 生成器初期化
-    generator = OllamaArticleGenerator(model=args.model)
+    generator = OllamaArticleGenerator(model=args.model, base_url=args.base_url)
     
     # キーワード取得
     if args.keyword:
@@ -8,15 +8,28 @@ import json
 import logging
 import re
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Union
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
 import openai
 import anthropic
 from keyword_research import KeywordData
+from article_parser import IncrementalArticleParser, normalize_section_body, parse_article
+from llm_cache import LLMResponseCache
+from llm_router import LLMCompletion, LLMRouter
+from prompt_templates import ArticlePrompt, PromptTemplateCache, TONE_DESCRIPTIONS, anthropic_content
+from retry_policy import HedgedCaller, RetryPolicy
+from text_stats import TextStats
+from token_budget import TokenBudgetEstimator, join_continuation
 
 logger = logging.getLogger(__name__)
 
+# 本文以外（タイトル・見出し記号・メタディスクリプション）の出力分の文字数
+ARTICLE_MARKUP_CHARS = 400
+SECTION_MARKUP_CHARS = 200
+OUTLINE_TARGET_CHARS = 600
+
 @dataclass
 class ArticleConfig:
     """記事生成設定"""
@@ -25,11 +38,15 @@ class ArticleConfig:
     target_keyword_density: float = 0.025  # 2.5%
     temperature: float = 0.7
     model: str = "gpt-4"  # gpt-4, gpt-3.5-turbo, claude-3-sonnet
-    max_tokens: int = 3000
+    max_tokens: int = 3000  # トークン予算を見積もれない場合のmax_tokens
     language: str = "ja"
     tone: str = "friendly"  # friendly, professional, casual
     include_faq: bool = True
     include_summary: bool = True
+    generation_mode: str = "single"  # single, outline（見出しごとに並列生成）
+    section_concurrency: int = 4
+    section_retries: int = 2
+    max_continuations: int = 2  # 出力上限で途切れた場合に続きを生成する最大回数
 
 @dataclass
 class SEOSettings:
@@ -57,6 +74,7 @@ class GeneratedArticle:
     generated_at: str
     model_used: str
     generation_time: float
+    text_stats: Optional[TextStats] = field(default=None, repr=False, compare=False)
 
 class ArticleGenerator:
     """AI記事生成クラス"""
@@ -65,7 +83,15 @@ class ArticleGenerator:
                  openai_api_key: Optional[str] = None,
                  anthropic_api_key: Optional[str] = None,
                  config: ArticleConfig = ArticleConfig(),
-                 seo_settings: SEOSettings = SEOSettings()):
+                 seo_settings: SEOSettings = SEOSettings(),
+                 cache: Optional[LLMResponseCache] = None,
+                 router: Optional[LLMRouter] = None,
+                 prompt_templates: Optional[PromptTemplateCache] = None,
+                 token_budget: Optional[TokenBudgetEstimator] = None,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 hedging: Optional[HedgedCaller] = None,
+                 openai_base_url: Optional[str] = None,
+                 anthropic_base_url: Optional[str] = None):
         """
         初期化
         
@@ -74,264 +100,823 @@ class ArticleGenerator:
             anthropic_api_key: Anthropic APIキー  
             config: 記事生成設定
             seo_settings: SEO設定
+            cache: LLMレスポンスキャッシュ（Noneでキャッシュしない）
+            router: マルチプロバイダールーター（Noneの場合はモデル名で直接呼び出す）
+            prompt_templates: プロンプトテンプレートキャッシュ（Noneで新規作成）
+            token_budget: max_tokens見積もり（Noneで新規作成・保存しない）
+            retry_policy: 一時エラー時の再試行ポリシー（Noneで既定値）
+            hedging: 遅い呼び出しへのヘッジリクエスト（Noneでヘッジしない）
+            openai_base_url: OpenAI APIのURL（負荷試験用スタブ等。Noneで既定）
+            anthropic_base_url: Anthropic APIのURL（Noneで既定）
         """
         self.config = config
         self.seo_settings = seo_settings
+        self.cache = cache
+        self.router = router
+        self.prompt_templates = prompt_templates or PromptTemplateCache()
+        self.token_budget = token_budget or TokenBudgetEstimator()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedging = hedging
         
         # API設定
         if openai_api_key:
             openai.api_key = openai_api_key
+        self.openai_base_url = openai_base_url
             
         if anthropic_api_key:
-            self.anthropic_client = anthropic.Anthropic(api_key=anthropic_api_key)
+            self.anthropic_client = anthropic.Anthropic(api_key=anthropic_api_key, base_url=anthropic_base_url)
         else:
             self.anthropic_client = None
     
     def generate_article(self, 
                         keyword_data: Union[KeywordData, str], 
                         additional_context: str = "",
-                        custom_outline: Optional[List[str]] = None) -> Optional[GeneratedArticle]:
+                        custom_outline: Optional[List[str]] = None,
+                        config: Optional[ArticleConfig] = None) -> Optional[GeneratedArticle]:
         """
         記事を生成
         
+        設定は呼び出しごとに渡せる（ジェネレータ自体は変更しない）ため、
+        1つのインスタンスを複数スレッド・リクエストから同時に使用できる。
+        
         Args:
             keyword_data: キーワードデータ または キーワード文字列
             additional_context: 追加のコンテキスト情報
             custom_outline: カスタム見出し構成
+            config: この呼び出しの記事生成設定（Noneで初期化時の設定）
             
         Returns:
             GeneratedArticle or None
         """
         start_time = time.time()
+        config = config or self.config
         
         try:
             # キーワード情報の準備
-            if isinstance(keyword_data, str):
-                main_keyword = keyword_data
-                related_keywords = []
-            else:
-                main_keyword = keyword_data.main_keyword
-                related_keywords = keyword_data.related_keywords + keyword_data.rising_keywords
+            main_keyword, related_keywords = self._resolve_keywords(keyword_data)
                 
             logger.info(f"記事生成開始: {main_keyword}")
             
-            # プロンプト生成
+            if config.generation_mode == "outline":
+                # アウトライン→セクション並列生成
+                raw_content = self._generate_outline_first(
+                    config,
+                    main_keyword,
+                    related_keywords,
+                    additional_context,
+                    custom_outline
+                )
+            else:
+                # プロンプト生成
+                prompt = self._create_article_prompt(
+                    main_keyword, 
+                    related_keywords, 
+                    additional_context,
+                    custom_outline,
+                    config
+                )
+                
+                # AI APIで記事生成
+                raw_content = self._call_ai_api(prompt, config, self._article_target_chars(config))
+            if not raw_content:
+                return None
+            
+            article = self._build_article(raw_content, main_keyword, related_keywords, start_time, config)
+            
+            logger.info(f"記事生成完了: {main_keyword} ({article.generation_time:.2f}s)")
+            return article
+            
+        except Exception as e:
+            logger.error(f"記事生成エラー: {e}")
+            return None
+    
+    def generate_article_stream(self,
+                                keyword_data: Union[KeywordData, str],
+                                additional_context: str = "",
+                                custom_outline: Optional[List[str]] = None,
+                                max_chars: Optional[int] = None,
+                                config: Optional[ArticleConfig] = None) -> Iterator[Dict]:
+        """
+        記事をストリーミング生成
+        
+        プロバイダーからのチャンクをIncrementalArticleParserに流し込み、
+        タイトル・各セクション・メタディスクリプションが確定した時点でイベントを返す。
+        最後に {'type': 'article', 'article': GeneratedArticle or None} を返す。
+        途中でジェネレータをclose()すると、プロバイダーのストリームも中断される。
+        
+        Args:
+            keyword_data: キーワードデータ または キーワード文字列
+            additional_context: 追加のコンテキスト情報
+            custom_outline: カスタム見出し構成
+            max_chars: この文字数を超えたら生成を打ち切る（Noneで無制限）
+            config: この呼び出しの記事生成設定（Noneで初期化時の設定）
+            
+        Yields:
+            解析イベントの辞書
+        """
+        start_time = time.time()
+        config = config or self.config
+        main_keyword, related_keywords = self._resolve_keywords(keyword_data)
+        
+        logger.info(f"ストリーミング記事生成開始: {main_keyword}")
+        
+        prompt = self._create_article_prompt(
+            main_keyword,
+            related_keywords,
+            additional_context,
+            custom_outline,
+            config
+        )
+        
+        parser = IncrementalArticleParser()
+        stream = None
+        received = 0
+        try:
+            stream = self._stream_ai_api(prompt, config)
+            for chunk in stream:
+                received += len(chunk)
+                for event in parser.feed(chunk):
+                    yield event
+                
+                if max_chars and received > max_chars:
+                    logger.warning(f"生成文字数が上限を超えたため打ち切り: {main_keyword} ({received}文字)")
+                    break
+        except Exception as e:
+            logger.error(f"ストリーミング生成エラー: {e}")
+            yield {'type': 'article', 'article': None}
+            return
+        finally:
+            if stream is not None:
+                stream.close()
+        
+        for event in parser.close():
+            yield event
+        
+        article = None
+        if parser.raw_content:
+            try:
+                article = self._build_article(parser.raw_content, main_keyword, related_keywords,
+                                              start_time, config)
+                logger.info(f"ストリーミング記事生成完了: {main_keyword} ({article.generation_time:.2f}s)")
+            except Exception as e:
+                logger.error(f"記事生成エラー: {e}")
+        
+        yield {'type': 'article', 'article': article}
+    
+    def prepare_request(self,
+                        keyword_data: Union[KeywordData, str],
+                        additional_context: str = "",
+                        custom_outline: Optional[List[str]] = None,
+                        config: Optional[ArticleConfig] = None) -> Dict:
+        """
+        記事1本分のリクエスト内容を作成（APIは呼び出さない）
+        
+        プロバイダーのバッチAPIなど、同期呼び出し以外で生成する場合に使用する。
+        結果は article_from_text() で記事にする。
+        
+        Args:
+            keyword_data: キーワードデータ または キーワード文字列
+            additional_context: 追加のコンテキスト情報
+            custom_outline: カスタム見出し構成
+            config: 記事生成設定（Noneで初期化時の設定）
+            
+        Returns:
+            main_keyword, related_keywords, prompt, prompt_prefix, model, temperature, max_tokens の辞書
+        """
+        config = config or self.config
+        main_keyword, related_keywords = self._resolve_keywords(keyword_data)
+        prompt = self._create_article_prompt(
+            main_keyword,
+            related_keywords,
+            additional_context,
+            custom_outline,
+            config
+        )
+        return {
+            'main_keyword': main_keyword,
+            'related_keywords': related_keywords,
+            'prompt': str(prompt),
+            'prompt_prefix': prompt.prefix,
+            'model': config.model,
+            'temperature': config.temperature,
+            'max_tokens': self._max_tokens_for(self._article_target_chars(config), config)
+        }
+    
+    def article_from_text(self,
+                          raw_content: str,
+                          keyword_data: Union[KeywordData, str],
+                          config: Optional[ArticleConfig] = None,
+                          finish_reason: str = "stop",
+                          output_tokens: Optional[int] = None,
+                          additional_context: str = "",
+                          custom_outline: Optional[List[str]] = None) -> Optional[GeneratedArticle]:
+        """
+        別途生成されたテキストから記事を作成（解析・SEO最適化・品質評価）
+        
+        出力上限で途切れていた場合（finish_reason="length"）は、
+        同期APIで続きだけを生成してから記事にする。
+        
+        Args:
+            raw_content: 生成されたテキスト
+            keyword_data: キーワードデータ または キーワード文字列
+            config: 記事生成設定（Noneで初期化時の設定）
+            finish_reason: 生成の終了理由（stop, length）
+            output_tokens: 出力トークン数（分かる場合）
+            additional_context: 生成時の追加コンテキスト（続きの生成に使用）
+            custom_outline: 生成時のカスタム見出し（続きの生成に使用）
+            
+        Returns:
+            GeneratedArticle or None
+        """
+        start_time = time.time()
+        config = config or self.config
+        main_keyword, related_keywords = self._resolve_keywords(keyword_data)
+        
+        try:
             prompt = self._create_article_prompt(
-                main_keyword, 
-                related_keywords, 
+                main_keyword,
+                related_keywords,
                 additional_context,
-                custom_outline
+                custom_outline,
+                config
+            )
+            completion = LLMCompletion(
+                text=raw_content,
+                provider="batch",
+                model=config.model,
+                finish_reason=finish_reason,
+                output_tokens=output_tokens
+            )
+            raw_content = self._complete_with_continuation(
+                prompt, config, self._article_target_chars(config), completion
             )
-            
-            # AI APIで記事生成
-            raw_content = self._call_ai_api(prompt)
             if not raw_content:
                 return None
             
-            # 記事構造解析
-            structured_content = self._parse_article_structure(raw_content)
+            return self._build_article(raw_content, main_keyword, related_keywords, start_time, config)
+        except Exception as e:
+            logger.error(f"記事作成エラー: {e}")
+            return None
+    
+    def _resolve_keywords(self, keyword_data: Union[KeywordData, str]) -> Tuple[str, List[str]]:
+        """キーワードデータからメインキーワードと関連キーワードを取り出す"""
+        if isinstance(keyword_data, str):
+            return keyword_data, []
+        return (keyword_data.main_keyword,
+                keyword_data.related_keywords + keyword_data.rising_keywords)
+    
+    def _build_article(self,
+                       raw_content: str,
+                       main_keyword: str,
+                       related_keywords: List[str],
+                       start_time: float,
+                       config: ArticleConfig) -> GeneratedArticle:
+        """
+        生成テキストを解析・SEO最適化・品質評価してGeneratedArticleを作成
+        
+        Args:
+            raw_content: AIが生成した記事テキスト
+            main_keyword: メインキーワード
+            related_keywords: 関連キーワード
+            start_time: 生成開始時刻（time.time()）
+            config: 記事生成設定
             
-            # SEO最適化
-            optimized_article = self._optimize_for_seo(
-                structured_content, 
-                main_keyword, 
-                related_keywords
-            )
+        Returns:
+            GeneratedArticle
+        """
+        # 記事構造解析
+        structured_content = self._parse_article_structure(raw_content)
+        
+        # SEO最適化
+        optimized_article = self._optimize_for_seo(
+            structured_content, 
+            main_keyword, 
+            related_keywords
+        )
+        
+        # 品質評価
+        quality_metrics = self._evaluate_article_quality(
+            optimized_article, 
+            main_keyword,
+            config
+        )
+        
+        # GeneratedArticleオブジェクト作成
+        return GeneratedArticle(
+            title=optimized_article.get('title', ''),
+            content=optimized_article.get('content', ''),
+            meta_description=optimized_article.get('meta_description', ''),
+            keywords=[main_keyword] + related_keywords[:4],
+            headings=optimized_article.get('headings', []),
+            word_count=quality_metrics['word_count'],
+            keyword_density=quality_metrics['keyword_density'],
+            readability_score=quality_metrics['readability_score'],
+            seo_score=quality_metrics['seo_score'],
+            generated_at=datetime.now().isoformat(),
+            model_used=config.model,
+            generation_time=time.time() - start_time,
+            text_stats=quality_metrics['text_stats']
+        )
+    
+    def generate_batch(self,
+                       keywords: Iterable[Union[KeywordData, str]],
+                       concurrency: int = 4,
+                       additional_context: str = "",
+                       config: Optional[ArticleConfig] = None) -> Iterator[Tuple[Union[KeywordData, str], Optional[GeneratedArticle]]]:
+        """
+        複数キーワードの記事を並列生成
+        
+        同時実行数をconcurrency個に制限したスレッドプールでgenerate_articleを実行し、
+        完了した順に結果を返す。keywordsは遅延評価されるため、ジェネレータも渡せる。
+        次のキーワードは結果を受け取った呼び出し側が再開してから投入する。
+        
+        Args:
+            keywords: キーワードデータ または キーワード文字列のイテラブル
+            concurrency: 同時に実行するAPI呼び出し数の上限
+            additional_context: 全記事共通の追加コンテキスト
+            config: 全記事共通の記事生成設定（Noneで初期化時の設定）
             
-            # 品質評価
-            quality_metrics = self._evaluate_article_quality(
-                optimized_article, 
-                main_keyword
-            )
+        Returns:
+            (キーワード, GeneratedArticle or None) のイテレータ（完了順）
+        """
+        concurrency = max(1, concurrency)
+        keyword_iter = iter(keywords)
+        
+        with ThreadPoolExecutor(max_workers=concurrency,
+                                thread_name_prefix="article-gen") as executor:
+            in_flight = {}
             
-            generation_time = time.time() - start_time
-            
-            # GeneratedArticleオブジェクト作成
-            article = GeneratedArticle(
-                title=optimized_article.get('title', ''),
-                content=optimized_article.get('content', ''),
-                meta_description=optimized_article.get('meta_description', ''),
-                keywords=[main_keyword] + related_keywords[:4],
-                headings=optimized_article.get('headings', []),
-                word_count=quality_metrics['word_count'],
-                keyword_density=quality_metrics['keyword_density'],
-                readability_score=quality_metrics['readability_score'],
-                seo_score=quality_metrics['seo_score'],
-                generated_at=datetime.now().isoformat(),
-                model_used=self.config.model,
-                generation_time=generation_time
-            )
+            def submit_next() -> bool:
+                try:
+                    keyword = next(keyword_iter)
+                except StopIteration:
+                    return False
+                future = executor.submit(self.generate_article, keyword, additional_context,
+                                         config=config)
+                in_flight[future] = keyword
+                return True
             
-            logger.info(f"記事生成完了: {main_keyword} ({generation_time:.2f}s)")
-            return article
+            # 最初にconcurrency個まで投入
+            while len(in_flight) < concurrency and submit_next():
+                pass
             
-        except Exception as e:
-            logger.error(f"記事生成エラー: {e}")
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    keyword = in_flight.pop(future)
+                    try:
+                        article = future.result()
+                    except Exception as e:
+                        logger.error(f"並列記事生成エラー: {e}")
+                        article = None
+                    
+                    yield keyword, article
+                    # 呼び出し側が結果を処理し終えてから、空いた枠に次のキーワードを投入
+                    # （呼び出し側の待機がそのままリクエスト間隔になる）
+                    submit_next()
+    
+    def _generate_outline_first(self,
+                                config: ArticleConfig,
+                                main_keyword: str,
+                                related_keywords: List[str],
+                                additional_context: str = "",
+                                custom_outline: Optional[List[str]] = None) -> Optional[str]:
+        """
+        アウトラインを生成してから各セクションを並列生成し、1つの記事テキストに結合
+        
+        所要時間は全セクションの合計ではなく最も遅いセクション程度になり、
+        失敗したセクションはそのセクションだけを再生成する。
+        
+        Args:
+            config: 記事生成設定
+            main_keyword: メインキーワード
+            related_keywords: 関連キーワード
+            additional_context: 追加コンテキスト
+            custom_outline: カスタム見出し構成（アウトライン生成時に使用）
+            
+        Returns:
+            _build_article に渡せる記事テキスト or None
+        """
+        outline_prompt = self.prompt_templates.build_outline(
+            config,
+            self.seo_settings,
+            main_keyword,
+            related_keywords,
+            additional_context,
+            custom_outline
+        )
+        outline_raw = self._call_ai_api(outline_prompt, config, OUTLINE_TARGET_CHARS)
+        outline = parse_article(outline_raw) if outline_raw else None
+        
+        headings = outline.headings_at(2) if outline else []
+        if not headings and custom_outline:
+            headings = list(custom_outline)
+        if not headings:
+            logger.error(f"アウトライン生成に失敗しました: {main_keyword}")
             return None
+        
+        title = outline.title if outline and outline.title else main_keyword
+        meta_description = outline.meta_description if outline else ""
+        
+        sections = self._plan_sections(headings, config)
+        bodies = self._generate_sections(
+            sections,
+            main_keyword,
+            related_keywords,
+            title,
+            [heading for _, heading, _ in sections],
+            config,
+            additional_context
+        )
+        if bodies is None:
+            return None
+        
+        # 結合（導入部は見出し無し）
+        parts = [f"# {title}"]
+        for (kind, heading, _), body in zip(sections, bodies):
+            if kind == "intro":
+                parts.append(body)
+            else:
+                parts.append(f"## {heading}\n\n{body}")
+        
+        raw_content = "\n\n".join(parts) + "\n"
+        if meta_description:
+            raw_content += f"\n---\nMETA_DESCRIPTION: {meta_description}\n"
+        return raw_content
+    
+    def _plan_sections(self, headings: List[str], config: ArticleConfig) -> List[Tuple[str, str, int]]:
+        """
+        見出しから生成するセクションと目安文字数を決める
+        
+        Args:
+            headings: アウトラインのH2見出し
+            config: 記事生成設定
+            
+        Returns:
+            (種別, 見出し, 目安文字数) のリスト
+        """
+        # まとめ・FAQはこちらで付け足すため、アウトライン側のものは除く
+        body_headings = [h for h in headings
+                         if "まとめ" not in h and "よくある質問" not in h and "FAQ" not in h.upper()]
+        if not body_headings:
+            body_headings = list(headings)
+        
+        intro_chars, summary_chars, faq_chars = 250, 175, 400
+        target = (config.min_length + config.max_length) // 2
+        fixed = intro_chars + summary_chars + (faq_chars if config.include_faq else 0)
+        body_chars = max(200, (target - fixed) // len(body_headings))
+        
+        sections = [("intro", "導入", intro_chars)]
+        sections += [("body", heading, body_chars) for heading in body_headings]
+        if config.include_faq:
+            sections.append(("faq", "よくある質問", faq_chars))
+        sections.append(("summary", "まとめ", summary_chars))
+        return sections
+    
+    def _generate_sections(self,
+                           sections: List[Tuple[str, str, int]],
+                           main_keyword: str,
+                           related_keywords: List[str],
+                           title: str,
+                           outline: List[str],
+                           config: ArticleConfig,
+                           additional_context: str = "") -> Optional[List[str]]:
+        """
+        各セクションの本文を並列生成（失敗したセクションは個別に再試行）
+        
+        Returns:
+            sectionsと同じ順序の本文リスト or None（再試行しても失敗したセクションがある場合）
+        """
+        def generate_section(kind: str, heading: str, target_chars: int) -> Optional[str]:
+            prompt = self.prompt_templates.build_section(
+                config,
+                main_keyword,
+                related_keywords,
+                title,
+                outline,
+                heading,
+                kind,
+                target_chars,
+                additional_context
+            )
+            for attempt in range(1 + max(0, config.section_retries)):
+                try:
+                    body = self._call_ai_api(prompt, config, target_chars + SECTION_MARKUP_CHARS)
+                except Exception as e:
+                    logger.warning(f"セクション生成エラー: {heading} ({e})")
+                    body = None
+                if body:
+                    body = normalize_section_body(body, heading)
+                    if body:
+                        return body
+                logger.warning(f"セクション再生成: {heading} ({attempt + 1}回目失敗)")
+            return None
+        
+        bodies: List[Optional[str]] = [None] * len(sections)
+        with ThreadPoolExecutor(max_workers=max(1, config.section_concurrency),
+                                thread_name_prefix="article-section") as executor:
+            futures = {
+                executor.submit(generate_section, kind, heading, target_chars): i
+                for i, (kind, heading, target_chars) in enumerate(sections)
+            }
+            for future in as_completed(futures):
+                bodies[futures[future]] = future.result()
+        
+        failed = [sections[i][1] for i, body in enumerate(bodies) if not body]
+        if failed:
+            logger.error(f"セクション生成に失敗しました: {main_keyword} ({', '.join(failed)})")
+            return None
+        return bodies
     
     def _create_article_prompt(self, 
                               main_keyword: str, 
                               related_keywords: List[str],
                               additional_context: str = "",
-                              custom_outline: Optional[List[str]] = None) -> str:
+                              custom_outline: Optional[List[str]] = None,
+                              config: Optional[ArticleConfig] = None) -> ArticlePrompt:
         """
         記事生成用プロンプトを作成
         
+        設定ごとに固定のプレフィックスを使い回し、キーワード等はサフィックスにまとめる。
+        
         Args:
             main_keyword: メインキーワード
             related_keywords: 関連キーワード
             additional_context: 追加コンテキスト
             custom_outline: カスタム見出し
+            config: 記事生成設定（Noneで初期化時の設定）
             
         Returns:
-            プロンプト文字列
+            プロンプト文字列（ArticlePrompt）
         """
-        related_str = ", ".join(related_keywords[:5]) if related_keywords else ""
-        
-        # 基本プロンプト
-        base_prompt = f"""
-あなたはSEOに精通したプロのライターです。以下の条件で「{main_keyword}」についての記事を作成してください：
-
-## 記事要件
-1. **文字数**: {self.config.min_length}〜{self.config.max_length}文字
-2. **言語**: 日本語
-3. **トーン**: {self._get_tone_description(self.config.tone)}
-4. **対象読者**: 初心者から中級者
-
-## SEO要件
-1. **メインキーワード**: 「{main_keyword}」を自然に含める（密度約{self.config.target_keyword_density*100:.1f}%）
-2. **関連キーワード**: {related_str}
-3. **見出し**: H2, H3タグを{self.seo_settings.min_headings}〜{self.seo_settings.max_headings}個使用
-4. **構造**: 導入→本文→まとめの流れ
-
-## 記事構成
-"""
-        
-        # カスタム見出し構成がある場合
-        if custom_outline:
-            base_prompt += "\n以下の見出し構成に従って記事を作成してください：\n"
-            for i, heading in enumerate(custom_outline, 1):
-                base_prompt += f"{i}. {heading}\n"
-        else:
-            base_prompt += """
-1. **導入部** (200-300文字)
-   - 読者の関心を引く
-   - 記事で学べることを明示
-
-2. **本文** (複数のH2見出しで構成)
-   - 実用的な情報と具体例
-   - 読者の疑問に答える内容
-   - データや事例を含める
-
-3. **まとめ** (150-200文字)
-   - 重要ポイントの整理
-   - 読者へのアクションアイテム
-"""
-        
-        # 追加コンテキスト
-        if additional_context:
-            base_prompt += f"\n## 追加情報\n{additional_context}\n"
-        
-        # FAQセクション
-        if self.config.include_faq:
-            base_prompt += "\n4. **FAQ**: よくある質問3-5個を含めてください\n"
-        
-        base_prompt += """
-## 出力形式
-以下の形式で出力してください：
-
-# [記事タイトル]
-
-[導入文]
-
-## [見出し1]
-[内容]
-
-## [見出し2]  
-[内容]
-
-## まとめ
-[まとめ文]
-
----
-META_DESCRIPTION: [120-160文字のメタディスクリプション]
-"""
-        
-        return base_prompt
+        return self.prompt_templates.build(
+            config or self.config,
+            self.seo_settings,
+            main_keyword,
+            related_keywords,
+            additional_context,
+            custom_outline
+        )
     
     def _get_tone_description(self, tone: str) -> str:
         """トーン説明を取得"""
-        tone_map = {
-            "friendly": "親しみやすく、読みやすい文体",
-            "professional": "専門的で信頼性のある文体", 
-            "casual": "カジュアルで親近感のある文体"
-        }
-        return tone_map.get(tone, "親しみやすい文体")
+        return TONE_DESCRIPTIONS.get(tone, "親しみやすい文体")
+    
+    def _article_target_chars(self, config: ArticleConfig) -> int:
+        """記事全体を1回で生成する場合の出力文字数の目安"""
+        return config.max_length + ARTICLE_MARKUP_CHARS
+    
+    def _max_tokens_for(self, target_chars: Optional[int], config: ArticleConfig) -> int:
+        """目標文字数からmax_tokensを決める（目標が無い場合は設定値）"""
+        if not target_chars:
+            return config.max_tokens
+        return self.token_budget.budget(config.model, target_chars)
     
-    def _call_ai_api(self, prompt: str) -> Optional[str]:
+    def _call_ai_api(self, prompt: str, config: ArticleConfig,
+                     target_chars: Optional[int] = None) -> Optional[str]:
         """
         AI APIを呼び出して記事を生成
         
+        キャッシュが設定されている場合は、同一条件（モデル・温度・max_tokens設定・目標文字数・プロンプト）の結果を再利用する。
+        
         Args:
             prompt: 生成プロンプト
+            config: 記事生成設定（モデル・温度など）
+            target_chars: 出力させたい最大文字数（max_tokensの見積もりに使用）
             
         Returns:
             生成された記事 or None
         """
+        if self.cache is None:
+            return self._complete_with_continuation(prompt, config, target_chars)
+        
+        # キーは実行ごとに変わらない値で作る（学習で変わる見積もりのmax_tokensはAPI呼び出しにだけ使う）
+        key = LLMResponseCache.make_key(
+            config.model,
+            config.temperature,
+            config.max_tokens,
+            prompt,
+            target_chars=target_chars
+        )
+        # 続きの生成回数の上限で途切れたままの結果はキャッシュしない
+        status: Dict[str, bool] = {}
+        return self.cache.get_or_compute(
+            key,
+            lambda: self._complete_with_continuation(prompt, config, target_chars, status=status),
+            model=config.model,
+            cacheable=lambda result: not status.get('truncated')
+        )
+    
+    def _complete_with_continuation(self, prompt: str, config: ArticleConfig,
+                                    target_chars: Optional[int] = None,
+                                    completion: Optional[LLMCompletion] = None,
+                                    status: Optional[Dict[str, bool]] = None) -> Optional[str]:
+        """
+        生成を実行し、出力上限で途切れた場合は続きだけを追加で生成する
+        
+        続きの生成はconfig.max_continuations回まで、max_tokensは目標文字数の残り分。
+        全体を再生成はしない。
+        
+        Args:
+            prompt: 生成プロンプト
+            config: 記事生成設定
+            target_chars: 出力させたい最大文字数
+            completion: 生成済みの結果（バッチAPI等、指定時は最初の生成を省略）
+            status: 指定時、途切れたまま終わったかを 'truncated' に設定する
+            
+        Returns:
+            生成されたテキスト or None
+        """
+        if completion is None:
+            completion = self._dispatch_ai_api(prompt, config, self._max_tokens_for(target_chars, config))
+        if not completion:
+            return None
+        # ルーターが別モデルで応答しても、見積もり（_max_tokens_for）と同じ要求モデル名で記録する
+        self.token_budget.record(config.model, len(completion.text), completion.output_tokens)
+        
+        text = completion.text
+        continuations = 0
+        while completion.finish_reason == "length":
+            self.token_budget.record_truncation()
+            if continuations >= config.max_continuations:
+                logger.warning(f"出力上限で途切れたまま続きの生成回数上限に達しました ({len(text)}文字)")
+                break
+            
+            continuations += 1
+            self.token_budget.record_continuation()
+            logger.info(f"出力上限で途切れたため続きを生成 ({continuations}回目, {len(text)}文字)")
+            
+            remaining = max(target_chars - len(text), SECTION_MARKUP_CHARS) if target_chars else None
+            completion = self._dispatch_ai_api(
+                self.prompt_templates.build_continuation(prompt, text),
+                config,
+                self._max_tokens_for(remaining, config)
+            )
+            if not completion:
+                break
+            self.token_budget.record(config.model, len(completion.text), completion.output_tokens)
+            text = join_continuation(text, completion.text)
+        
+        if status is not None:
+            status['truncated'] = not completion or completion.finish_reason == "length"
+        return text
+    
+    def _dispatch_ai_api(self, prompt: str, config: ArticleConfig,
+                         max_tokens: Optional[int] = None) -> Optional[LLMCompletion]:
+        """
+        ルーター、またはモデル名に応じたAPIを呼び出す
+        
+        一時的なエラー（429・5xx・タイムアウト等）はretry_policyで再試行し、
+        hedgingが設定されていれば応答の遅い呼び出しに同じリクエストを重ねて送る。
+        """
+        max_tokens = max_tokens or config.max_tokens
+        
+        def attempt(timeout: Optional[float]) -> LLMCompletion:
+            if self.hedging is None:
+                return self._request_completion(prompt, config, max_tokens, timeout)
+            # 応答時間はモデルと出力サイズ（2の冪で丸める）ごとに集計
+            key = (config.model, 1 << max(0, max_tokens - 1).bit_length())
+            return self.hedging.call(key, lambda: self._request_completion(prompt, config, max_tokens, timeout))
+        
         try:
-            if self.config.model.startswith("gpt"):
-                return self._call_openai_api(prompt)
-            elif self.config.model.startswith("claude"):
-                return self._call_anthropic_api(prompt)
-            else:
-                logger.error(f"サポートされていないモデル: {self.config.model}")
-                return None
-                
+            return self.retry_policy.call(attempt, description=config.model)
         except Exception as e:
             logger.error(f"AI API呼び出しエラー: {e}")
             return None
     
-    def _call_openai_api(self, prompt: str) -> Optional[str]:
-        """OpenAI API呼び出し"""
-        try:
-            response = openai.ChatCompletion.create(
-                model=self.config.model,
-                messages=[
-                    {"role": "system", "content": "あなたはSEOに精通したプロのライターです。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
+    def _request_completion(self, prompt: str, config: ArticleConfig, max_tokens: int,
+                            timeout: Optional[float] = None) -> LLMCompletion:
+        """1回分のAPI呼び出し（失敗時は例外を送出、timeoutはretry_policyが試行ごとに決める）"""
+        if self.router is not None:
+            completion = self.router.complete(
+                prompt,
+                temperature=config.temperature,
+                max_tokens=max_tokens,
+                model=config.model,
+                timeout=timeout
             )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            logger.error(f"OpenAI API エラー: {e}")
-            return None
+            if completion is None:
+                raise RuntimeError("全てのLLMプロバイダーで生成に失敗しました")
+            return completion
+        
+        if config.model.startswith("gpt"):
+            return self._call_openai_api(prompt, config, max_tokens, timeout)
+        elif config.model.startswith("claude"):
+            return self._call_anthropic_api(prompt, config, max_tokens, timeout)
+        else:
+            raise ValueError(f"サポートされていないモデル: {config.model}")
     
-    def _call_anthropic_api(self, prompt: str) -> Optional[str]:
+    def _call_openai_api(self, prompt: str, config: ArticleConfig, max_tokens: int,
+                         timeout: Optional[float] = None) -> LLMCompletion:
+        """OpenAI API呼び出し"""
+        response = openai.ChatCompletion.create(
+            model=config.model,
+            messages=[
+                {"role": "system", "content": "あなたはSEOに精通したプロのライターです。"},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=config.temperature,
+            max_tokens=max_tokens,
+            request_timeout=timeout,
+            api_base=self.openai_base_url
+        )
+        
+        choice = response.choices[0]
+        usage = getattr(response, 'usage', None)
+        return LLMCompletion(
+            text=choice.message.content,
+            provider="openai",
+            model=config.model,
+            finish_reason=choice.finish_reason or "stop",
+            output_tokens=getattr(usage, 'completion_tokens', None)
+        )
+    
+    def _call_anthropic_api(self, prompt: str, config: ArticleConfig, max_tokens: int,
+                            timeout: Optional[float] = None) -> LLMCompletion:
         """Anthropic API呼び出し"""
         if not self.anthropic_client:
-            logger.error("Anthropic APIキーが設定されていません")
-            return None
+            raise RuntimeError("Anthropic APIキーが設定されていません")
+        
+        message = self.anthropic_client.messages.create(
+            model=config.model,
+            max_tokens=max_tokens,
+            temperature=config.temperature,
+            messages=[{
+                "role": "user",
+                "content": anthropic_content(prompt)
+            }],
+            timeout=timeout
+        )
+        
+        return LLMCompletion(
+            text=message.content[0].text,
+            provider="anthropic",
+            model=config.model,
+            finish_reason="length" if message.stop_reason == "max_tokens" else "stop",
+            output_tokens=message.usage.output_tokens
+        )
+    
+    def _stream_ai_api(self, prompt: str, config: ArticleConfig) -> Iterator[str]:
+        """
+        AI APIをストリーミングモードで呼び出す
+        
+        Args:
+            prompt: 生成プロンプト
+            config: 記事生成設定
             
+        Yields:
+            生成されたテキストのチャンク
+        """
+        if config.model.startswith("gpt"):
+            return self._stream_openai_api(prompt, config)
+        elif config.model.startswith("claude"):
+            return self._stream_anthropic_api(prompt, config)
+        else:
+            raise ValueError(f"サポートされていないモデル: {config.model}")
+    
+    def _stream_openai_api(self, prompt: str, config: ArticleConfig) -> Iterator[str]:
+        """OpenAI API ストリーミング呼び出し"""
+        response = openai.ChatCompletion.create(
+            model=config.model,
+            messages=[
+                {"role": "system", "content": "あなたはSEOに精通したプロのライターです。"},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=config.temperature,
+            max_tokens=self._max_tokens_for(self._article_target_chars(config), config),
+            stream=True,
+            api_base=self.openai_base_url
+        )
+        
         try:
-            message = self.anthropic_client.messages.create(
-                model=self.config.model,
-                max_tokens=self.config.max_tokens,
-                temperature=self.config.temperature,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
-            
-            return message.content[0].text
-            
-        except Exception as e:
-            logger.error(f"Anthropic API エラー: {e}")
-            return None
+            for chunk in response:
+                choices = chunk['choices']
+                if not choices:
+                    continue
+                text = choices[0]['delta'].get('content')
+                if text:
+                    yield text
+        finally:
+            close = getattr(response, 'close', None)
+            if close:
+                close()
+    
+    def _stream_anthropic_api(self, prompt: str, config: ArticleConfig) -> Iterator[str]:
+        """Anthropic API ストリーミング呼び出し"""
+        if not self.anthropic_client:
+            raise RuntimeError("Anthropic APIキーが設定されていません")
+        
+        with self.anthropic_client.messages.stream(
+            model=config.model,
+            max_tokens=self._max_tokens_for(self._article_target_chars(config), config),
+            temperature=config.temperature,
+            messages=[{
+                "role": "user",
+                "content": anthropic_content(prompt)
+            }]
+        ) as stream:
+            for text in stream.text_stream:
+                yield text
     
     def _parse_article_structure(self, raw_content: str) -> Dict:
         """
@@ -341,32 +926,9 @@ META_DESCRIPTION: [120-160文字のメタディスクリプション]
             raw_content: 生成された記事
             
         Returns:
-            構造化された記事データ
+            構造化された記事データ（'parsed' に ParsedArticle を含む）
         """
-        # メタディスクリプション抽出
-        meta_description = ""
-        meta_match = re.search(r'META_DESCRIPTION:\s*(.+)', raw_content)
-        if meta_match:
-            meta_description = meta_match.group(1).strip()
-            raw_content = re.sub(r'---\s*META_DESCRIPTION:.*', '', raw_content, flags=re.DOTALL)
-        
-        # タイトル抽出
-        title_match = re.search(r'^#\s+(.+)', raw_content, re.MULTILINE)
-        title = title_match.group(1).strip() if title_match else ""
-        
-        # 見出し抽出
-        headings = re.findall(r'^##\s+(.+)', raw_content, re.MULTILINE)
-        
-        # 本文抽出（メタ情報を除去）
-        content = re.sub(r'^#\s+.+', '', raw_content, flags=re.MULTILINE).strip()
-        content = re.sub(r'---.*$', '', content, flags=re.DOTALL).strip()
-        
-        return {
-            'title': title,
-            'content': content,
-            'meta_description': meta_description,
-            'headings': headings
-        }
+        return parse_article(raw_content, strip_footer=True).to_dict()
     
     def _optimize_for_seo(self, 
                          structured_content: Dict, 
@@ -406,6 +968,10 @@ META_DESCRIPTION: [120-160文字のメタディスクリプション]
                 related_keywords
             )
             
+            # 本文が変わった場合は構造を取り直す
+            if optimized['content'] != structured_content['content']:
+                optimized['parsed'] = parse_article(optimized['content'])
+            
             return optimized
             
         except Exception as e:
@@ -453,49 +1019,52 @@ META_DESCRIPTION: [120-160文字のメタディスクリプション]
         # 実際はより高度な自然言語処理が必要
         return content
     
-    def _evaluate_article_quality(self, article: Dict, main_keyword: str) -> Dict:
+    def _evaluate_article_quality(self, article: Dict, main_keyword: str,
+                                  config: Optional[ArticleConfig] = None) -> Dict:
         """
         記事品質評価
         
         Args:
-            article: 記事データ
+            article: 記事データ（'stats' があれば再利用する）
             main_keyword: メインキーワード
+            config: 記事生成設定（Noneで初期化時の設定）
             
         Returns:
-            品質メトリクス
+            品質メトリクス（'text_stats' に計算済みのTextStatsを含む）
         """
         content = article.get('content', '')
+        stats = TextStats.of(content, article.get('stats'))
         
         # 文字数カウント
-        word_count = len(content.replace(' ', ''))
+        word_count = stats.char_count
         
         # キーワード密度計算
-        keyword_count = content.lower().count(main_keyword.lower())
-        keyword_density = (keyword_count / max(word_count, 1)) * 100
+        keyword_density = stats.keyword_density(main_keyword)
         
         # 読みやすさスコア（簡易版）
-        readability_score = self._calculate_readability_score(content)
+        readability_score = self._calculate_readability_score(content, stats)
         
         # SEOスコア（簡易版）
-        seo_score = self._calculate_seo_score(article, main_keyword)
+        seo_score = self._calculate_seo_score(article, main_keyword, stats, config)
         
         return {
             'word_count': word_count,
             'keyword_density': keyword_density,
             'readability_score': readability_score,
-            'seo_score': seo_score
+            'seo_score': seo_score,
+            'text_stats': stats
         }
     
-    def _calculate_readability_score(self, content: str) -> float:
+    def _calculate_readability_score(self, content: str, stats: Optional[TextStats] = None) -> float:
         """読みやすさスコア計算（簡易版）"""
         try:
-            sentences = re.split(r'[。！？]', content)
-            sentence_count = len([s for s in sentences if s.strip()])
+            stats = TextStats.of(content, stats)
+            sentence_count = stats.sentence_count
             
             if sentence_count == 0:
                 return 0.0
                 
-            words_per_sentence = len(content) / sentence_count
+            words_per_sentence = stats.length / sentence_count
             
             # 簡易スコア（100点満点）
             if words_per_sentence < 20:
@@ -510,9 +1079,14 @@ META_DESCRIPTION: [120-160文字のメタディスクリプション]
         except Exception:
             return 70.0
     
-    def _calculate_seo_score(self, article: Dict, main_keyword: str) -> float:
+    def _calculate_seo_score(self, article: Dict, main_keyword: str,
+                             stats: Optional[TextStats] = None,
+                             config: Optional[ArticleConfig] = None) -> float:
         """SEOスコア計算（簡易版）"""
+        config = config or self.config
         score = 0.0
+        stats = TextStats.of(article.get('content', ''), stats)
+        parsed = article.get('parsed')
         
         # タイトルにキーワード
         if main_keyword.lower() in article.get('title', '').lower():
@@ -523,17 +1097,20 @@ META_DESCRIPTION: [120-160文字のメタディスクリプション]
             score += 15
         
         # 見出し数
-        heading_count = len(article.get('headings', []))
+        if parsed is not None:
+            heading_count = len(parsed.headings_at(2))
+        else:
+            heading_count = len(article.get('headings', []))
         if self.seo_settings.min_headings <= heading_count <= self.seo_settings.max_headings:
             score += 20
         
         # 文字数
-        word_count = len(article.get('content', ''))
-        if self.config.min_length <= word_count <= self.config.max_length:
+        word_count = stats.length
+        if config.min_length <= word_count <= config.max_length:
             score += 25
         
         # キーワード密度
-        keyword_count = article.get('content', '').lower().count(main_keyword.lower())
+        keyword_count = stats.keyword_count(main_keyword)
         if word_count > 0:
             density = (keyword_count / word_count) * 100
             if 1.0 <= density <= 4.0:
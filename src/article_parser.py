@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+記事パーサーモジュール
+AIが出力したMarkdown形式の記事を解析し、タイトル・見出し・メタ情報を取り出す
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+META_PREFIX = "META_DESCRIPTION:"
+
+@dataclass
+class Heading:
+    """見出し（start/endはParsedArticle.content内の行の文字位置）"""
+    level: int
+    text: str
+    start: int
+    end: int
+
+@dataclass
+class Section:
+    """見出しで区切られた本文の範囲（先頭の導入部はheading=None）"""
+    heading: Optional[Heading]
+    start: int
+    end: int
+
+@dataclass
+class ListItem:
+    """箇条書き・番号付きリストの項目"""
+    text: str
+    ordered: bool
+    start: int
+
+@dataclass
+class ParsedArticle:
+    """1回の走査で得られる記事の構造"""
+    title: str = ""
+    content: str = ""
+    meta_description: str = ""
+    headings: List[Heading] = field(default_factory=list)
+    h1_headings: List[str] = field(default_factory=list)
+    sections: List[Section] = field(default_factory=list)
+    list_items: List[ListItem] = field(default_factory=list)
+    links: List[Tuple[str, str]] = field(default_factory=list)
+    images: List[Tuple[str, str]] = field(default_factory=list)
+
+    def headings_at(self, level: int) -> List[str]:
+        """
+        指定レベルの見出しテキスト
+
+        Args:
+            level: 見出しレベル（1〜6）
+
+        Returns:
+            見出しテキストのリスト
+        """
+        if level == 1:
+            return list(self.h1_headings)
+        return [h.text for h in self.headings if h.level == level]
+
+    def section_text(self, section: Section) -> str:
+        """セクション本文（見出し行を除く）"""
+        return self.content[section.start:section.end].strip()
+
+    def to_dict(self) -> Dict:
+        """ArticleGenerator._parse_article_structure 互換の辞書"""
+        return {
+            'title': self.title,
+            'content': self.content,
+            'meta_description': self.meta_description,
+            'headings': self.headings_at(2),
+            'parsed': self
+        }
+
+# 構造要素になり得る行頭文字（それ以外の行はリンク記法の有無だけを見る）
+_SPECIAL_LINE_START = frozenset('#-*+・0123456789 \t')
+_INLINE_RE = re.compile(r'(!?)\[([^\]\n]*)\]\(([^)\n]+)\)')
+
+def _scan_inline(article: 'ParsedArticle', text: str):
+    """行内の [text](url) と ![alt](url) を抽出"""
+    for bang, label, url in _INLINE_RE.findall(text):
+        if bang:
+            article.images.append((label, url))
+        elif label:
+            article.links.append((label, url))
+
+def _heading_level(line: str) -> int:
+    """Markdown見出しのレベル（見出しでなければ0）"""
+    level = len(line) - len(line.lstrip('#'))
+    if 1 <= level <= 6 and line[level:level + 1] in (' ', '\t'):
+        return level
+    return 0
+
+def parse_article(raw_content: str, strip_footer: bool = False) -> ParsedArticle:
+    """
+    記事を1回の走査で解析
+
+    - 最初のH1をタイトルとし、H1行は本文から除く（空行として残す）
+    - 見出し・セクション範囲・リスト・リンク・画像を同じ走査で収集
+    - strip_footer=True（生成直後の記事）では、"---" で始まる行以降、および META_DESCRIPTION: の行以降を
+      フッターとして本文から除く。任意のMarkdown（水平線やフロントマターを含む）は全文を解析する
+
+    Args:
+        raw_content: 記事テキスト（Markdown）
+        strip_footer: 生成記事のフッター（区切り線・メタ情報）を除くか
+
+    Returns:
+        ParsedArticle
+    """
+    article = ParsedArticle()
+
+    # メタディスクリプション（生成記事ではその行から後ろはフッター）
+    body = raw_content
+    meta_pos = raw_content.find(META_PREFIX)
+    if meta_pos != -1:
+        line_end = raw_content.find('\n', meta_pos)
+        if line_end == -1:
+            line_end = len(raw_content)
+        article.meta_description = raw_content[meta_pos + len(META_PREFIX):line_end].strip()
+        if strip_footer:
+            body = raw_content[:raw_content.rfind('\n', 0, meta_pos) + 1]
+
+    lines = body.split('\n')
+    offset = 0
+    h2_headings: List[Heading] = []
+
+    for index, line in enumerate(lines):
+        head = line[:1]
+        if head not in _SPECIAL_LINE_START:
+            # 通常の段落行
+            if '](' in line:
+                _scan_inline(article, line)
+            offset += len(line) + 1
+            continue
+
+        stripped = line.lstrip(' \t')
+        if strip_footer and stripped.startswith('---'):
+            lines = lines[:index]
+            break
+
+        if head == '#':
+            level = _heading_level(line)
+            if level == 1:
+                text = line[2:].strip()
+                article.h1_headings.append(text)
+                if not article.title:
+                    article.title = text
+                # H1行は本文から除く
+                lines[index] = ''
+                offset += 1
+                continue
+            if level:
+                heading = Heading(level, line[level + 1:].strip(), offset, offset + len(line))
+                article.headings.append(heading)
+                if level == 2:
+                    h2_headings.append(heading)
+        else:
+            marker = stripped[:1]
+            if marker in ('-', '*', '+') and stripped[1:2] in (' ', '\t'):
+                article.list_items.append(ListItem(stripped[2:].strip(), False, offset))
+            elif marker == '・':
+                article.list_items.append(ListItem(stripped[1:].strip(), False, offset))
+            elif marker.isdigit():
+                dot = stripped.find('. ', 0, 5)
+                if dot > 0 and stripped[:dot].isdigit():
+                    article.list_items.append(ListItem(stripped[dot + 2:].strip(), True, offset))
+
+        if '](' in line:
+            _scan_inline(article, line)
+        offset += len(line) + 1
+
+    content = '\n'.join(lines)
+
+    # 前後の空白を除去し、位置情報をずらす
+    leading = len(content) - len(content.lstrip())
+    article.content = content.strip()
+    end = len(article.content)
+    if leading:
+        for heading in article.headings:
+            heading.start -= leading
+            heading.end -= leading
+        for list_item in article.list_items:
+            list_item.start -= leading
+
+    # H2ごとのセクション範囲（先頭は導入部）
+    section_heading: Optional[Heading] = None
+    section_start = 0
+    for heading in h2_headings:
+        if section_heading is not None or article.content[section_start:heading.start].strip():
+            article.sections.append(Section(section_heading, section_start, heading.start))
+        section_heading = heading
+        section_start = min(heading.end + 1, end)
+    if section_heading is not None or article.content:
+        article.sections.append(Section(section_heading, section_start, end))
+
+    return article
+
+def normalize_section_body(text: str, heading: str = "") -> str:
+    """
+    セクション単位で生成された本文を、記事へ結合できる形に整える
+
+    - 先頭で見出しを繰り返している行を除く
+    - 区切り線・META_DESCRIPTION以降を除く
+    - H1/H2見出しはセクション構造を壊さないようH3に下げる
+
+    Args:
+        text: 生成されたセクション本文
+        heading: セクションの見出し
+
+    Returns:
+        整形した本文
+    """
+    lines = text.strip().split('\n')
+
+    # 先頭の見出し行（H1/H2、または見出しそのもの）を除く
+    while lines:
+        first = lines[0].strip()
+        level = _heading_level(first)
+        if 1 <= level <= 2 or (heading and first.strip('#* ') == heading):
+            lines.pop(0)
+        elif not first:
+            lines.pop(0)
+        else:
+            break
+
+    body = []
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith('---') or stripped.startswith(META_PREFIX):
+            break
+        level = _heading_level(line)
+        if 1 <= level <= 2:
+            line = '### ' + line[level + 1:].strip()
+        body.append(line)
+
+    return '\n'.join(body).strip()
+
+class IncrementalArticleParser:
+    """ストリーミング出力を逐次解析するパーサー
+
+    チャンクをfeed()で受け取り、タイトル・各##セクション・META_DESCRIPTIONが
+    確定した時点でイベントを返す。イベントは以下の形式の辞書：
+
+        {'type': 'title', 'title': str}
+        {'type': 'intro', 'content': str}
+        {'type': 'section', 'heading': str, 'content': str}
+        {'type': 'meta_description', 'meta_description': str}
+    """
+
+    def __init__(self):
+        """初期化"""
+        self.title: Optional[str] = None
+        self.meta_description: Optional[str] = None
+        self.sections: List[Dict] = []
+
+        self._pending = ""
+        self._chunks: List[str] = []
+        self._heading: Optional[str] = None
+        self._lines: List[str] = []
+        self._in_footer = False
+        self._closed = False
+
+    @property
+    def raw_content(self) -> str:
+        """これまでに受け取った全テキスト"""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """
+        チャンクを追加して解析
+
+        Args:
+            chunk: ストリームから受け取った文字列
+
+        Returns:
+            このチャンクで確定したイベントのリスト
+        """
+        if self._closed or not chunk:
+            return []
+
+        self._chunks.append(chunk)
+        self._pending += chunk
+
+        events = []
+        while "\n" in self._pending:
+            line, self._pending = self._pending.split("\n", 1)
+            events.extend(self._process_line(line))
+        return events
+
+    def close(self) -> List[Dict]:
+        """
+        ストリーム終了時に残りのバッファを確定
+
+        Returns:
+            確定したイベントのリスト
+        """
+        if self._closed:
+            return []
+
+        events = []
+        if self._pending:
+            events.extend(self._process_line(self._pending))
+            self._pending = ""
+        events.extend(self._flush_section())
+        self._closed = True
+        return events
+
+    def _process_line(self, line: str) -> List[Dict]:
+        """1行分の解析"""
+        stripped = line.strip()
+
+        # メタディスクリプション行（区切り線の前後どちらでも受け付ける）
+        if stripped.startswith(META_PREFIX):
+            events = self._flush_section()
+            self._in_footer = True
+            if self.meta_description is None:
+                self.meta_description = stripped[len(META_PREFIX):].strip()
+                events.append({'type': 'meta_description',
+                               'meta_description': self.meta_description})
+            return events
+
+        if self._in_footer:
+            return []
+
+        # 区切り線以降は本文に含めない
+        if stripped.startswith("---"):
+            self._in_footer = True
+            return self._flush_section()
+
+        if line.startswith("# "):
+            if self.title is None:
+                self.title = line[2:].strip()
+                return [{'type': 'title', 'title': self.title}]
+            return []
+
+        if line.startswith("## "):
+            events = self._flush_section()
+            self._heading = line[3:].strip()
+            return events
+
+        self._lines.append(line)
+        return []
+
+    def _flush_section(self) -> List[Dict]:
+        """作成中のセクションを確定"""
+        content = "\n".join(self._lines).strip()
+        heading = self._heading
+        self._heading = None
+        self._lines = []
+
+        if heading is not None:
+            section = {'type': 'section', 'heading': heading, 'content': content}
+            self.sections.append(section)
+            return [section]
+        if content:
+            return [{'type': 'intro', 'content': content}]
+        return []
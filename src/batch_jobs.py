@@ -0,0 +1,649 @@
+#!/usr/bin/env python3
+"""
+バッチジョブモジュール
+OpenAI Batch API・Anthropic Message Batches APIにまとめて記事生成を依頼し、
+ジョブの状態をJSONファイルに記録して、中断しても投入・ポーリング・回収を再開できるようにする
+"""
+
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Set
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "あなたはSEOに精通したプロのライターです。"
+
+# ジョブの状態
+STATUS_CREATED = "created"          # リクエストファイル作成済み・未投入
+STATUS_SUBMITTING = "submitting"    # 投入を開始した（応答を記録する前に中断した可能性がある）
+STATUS_SUBMITTED = "submitted"      # プロバイダーで処理中
+STATUS_ENDED = "ended"              # プロバイダーでの処理完了・結果未回収
+STATUS_COLLECTED = "collected"      # 全結果を回収済み
+STATUS_FAILED = "failed"            # プロバイダー側で失敗・期限切れ・取消
+
+@dataclass
+class BatchItem:
+    """バッチ内の1記事分のリクエスト"""
+    custom_id: str
+    keyword: str
+    related_keywords: List[str] = field(default_factory=list)
+    status: str = "pending"  # pending, collected, errored
+    finish_reason: Optional[str] = None
+    error: Optional[str] = None
+    output: Optional[str] = None
+
+@dataclass
+class BatchJobRecord:
+    """再開可能なバッチジョブの記録"""
+    job_id: str
+    provider: str
+    model: str
+    status: str = STATUS_CREATED
+    remote_id: Optional[str] = None
+    input_file_id: Optional[str] = None
+    output_file_id: Optional[str] = None
+    error_file_id: Optional[str] = None
+    submit_started_at: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    updated_at: str = field(default_factory=lambda: datetime.now().isoformat())
+    config: Dict = field(default_factory=dict)
+    items: List[BatchItem] = field(default_factory=list)
+    path: str = field(default="", repr=False)
+
+    @property
+    def input_path(self) -> str:
+        """リクエストファイル（JSONL）"""
+        return self.path[:-len(".json")] + ".input.jsonl"
+
+    @property
+    def results_path(self) -> str:
+        """ダウンロードした結果ファイル（JSONL）"""
+        return self.path[:-len(".json")] + ".results.jsonl"
+
+    def save(self):
+        """記録を保存（一時ファイルに書いてから置き換える）"""
+        self.updated_at = datetime.now().isoformat()
+        data = asdict(self)
+        data.pop('path')
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def load(cls, path: str) -> 'BatchJobRecord':
+        """記録を読み込む"""
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['items'] = [BatchItem(**item) for item in data.get('items', [])]
+        return cls(path=path, **data)
+
+    def item(self, custom_id: str) -> Optional[BatchItem]:
+        """custom_idに対応する項目"""
+        for item in self.items:
+            if item.custom_id == custom_id:
+                return item
+        return None
+
+    def summary(self) -> Dict:
+        """状態の集計"""
+        counts: Dict[str, int] = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {'job_id': self.job_id, 'provider': self.provider, 'status': self.status,
+                'remote_id': self.remote_id, 'items': counts}
+
+class BatchBackend:
+    """プロバイダーのバッチAPIの基底クラス"""
+
+    name = "base"
+
+    def request_line(self, custom_id: str, request: Dict) -> Dict:
+        """1リクエスト分をリクエストファイルの1行に変換"""
+        raise NotImplementedError
+
+    def submit(self, record: BatchJobRecord, lines: List[Dict]) -> str:
+        """バッチを投入してリモートのIDを返す"""
+        raise NotImplementedError
+
+    def find_submitted(self, record: BatchJobRecord, lines: List[Dict], exclude: Set[str]) -> Optional[str]:
+        """
+        前回の投入が応答を記録する前に中断した場合に、投入済みのバッチを探す
+
+        Args:
+            record: ジョブ記録（STATUS_SUBMITTING）
+            lines: リクエストファイルの各行
+            exclude: 他のジョブに記録済みのリモートID
+
+        Returns:
+            リモートのID（見つからなければNone）
+        """
+        return None
+
+    def poll(self, record: BatchJobRecord) -> str:
+        """リモートの状態を確認（STATUS_SUBMITTED / STATUS_ENDED / STATUS_FAILED）"""
+        raise NotImplementedError
+
+    def download_results(self, record: BatchJobRecord) -> str:
+        """結果（JSONL文字列）をダウンロード"""
+        raise NotImplementedError
+
+    def parse_result(self, line: Dict) -> Dict:
+        """
+        結果の1行を共通形式に変換
+
+        Returns:
+            {'custom_id', 'text', 'finish_reason', 'output_tokens', 'error'}
+        """
+        raise NotImplementedError
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API（/v1/files + /v1/batches）"""
+
+    name = "openai"
+    FAILED_STATUSES = ("failed",)
+    # 期限切れ・取消でも、それまでに完了したリクエストの結果は output_file_id にある
+    PARTIAL_STATUSES = ("expired", "cancelled")
+    LIST_PAGE_SIZE = 100
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, timeout: float = 120):
+        self.api_key = api_key
+        self.base_url = (base_url or "https://api.openai.com/v1").rstrip('/')
+        self.timeout = timeout
+
+    def _headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def request_line(self, custom_id: str, request: Dict) -> Dict:
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": request['model'],
+                "messages": [
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": request['prompt']}
+                ],
+                "temperature": request['temperature'],
+                "max_tokens": request['max_tokens']
+            }
+        }
+
+    def submit(self, record: BatchJobRecord, lines: List[Dict]) -> str:
+        if not record.input_file_id:
+            with open(record.input_path, 'rb') as f:
+                response = requests.post(
+                    f"{self.base_url}/files",
+                    headers=self._headers(),
+                    files={"file": (os.path.basename(record.input_path), f, "application/jsonl")},
+                    data={"purpose": "batch"},
+                    timeout=self.timeout
+                )
+            response.raise_for_status()
+            record.input_file_id = response.json()['id']
+            record.save()
+
+        response = requests.post(
+            f"{self.base_url}/batches",
+            headers=self._headers(),
+            json={
+                "input_file_id": record.input_file_id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+                "metadata": {"job_id": record.job_id}
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()['id']
+
+    def find_submitted(self, record: BatchJobRecord, lines: List[Dict], exclude: Set[str]) -> Optional[str]:
+        """
+        metadata.job_id が一致する投入済みのバッチを探す（失敗したものは除く）
+
+        バッチ一覧は新しい順なので、ジョブ作成より前に作られたバッチまで来たら打ち切る。
+        """
+        created_after = datetime.fromisoformat(record.created_at).timestamp() - 60
+        params: Dict = {"limit": self.LIST_PAGE_SIZE}
+        while True:
+            response = requests.get(f"{self.base_url}/batches", headers=self._headers(),
+                                    params=params, timeout=self.timeout)
+            response.raise_for_status()
+            page = response.json()
+            batches = page.get('data', [])
+            for batch in batches:
+                if ((batch.get('metadata') or {}).get('job_id') == record.job_id
+                        and batch.get('status') not in self.FAILED_STATUSES):
+                    return batch['id']
+            if not page.get('has_more') or not batches or batches[-1].get('created_at', 0) < created_after:
+                return None
+            params['after'] = batches[-1]['id']
+
+    def poll(self, record: BatchJobRecord) -> str:
+        response = requests.get(f"{self.base_url}/batches/{record.remote_id}",
+                                headers=self._headers(), timeout=self.timeout)
+        response.raise_for_status()
+        batch = response.json()
+        status = batch.get('status')
+
+        if status == "completed" or status in self.PARTIAL_STATUSES:
+            record.output_file_id = batch.get('output_file_id')
+            record.error_file_id = batch.get('error_file_id')
+            if status != "completed":
+                logger.warning(f"バッチが途中で終了しました（{status}）。完了分の結果を回収します: {record.job_id}")
+            return STATUS_ENDED
+        if status in self.FAILED_STATUSES:
+            return STATUS_FAILED
+        return STATUS_SUBMITTED
+
+    def download_results(self, record: BatchJobRecord) -> str:
+        # 成功分（output_file_id）と、エラー・期限切れになったリクエスト（error_file_id）を合わせる
+        parts = []
+        for file_id in (record.output_file_id, record.error_file_id):
+            if not file_id:
+                continue
+            response = requests.get(f"{self.base_url}/files/{file_id}/content",
+                                    headers=self._headers(), timeout=self.timeout)
+            response.raise_for_status()
+            if response.text.strip():
+                parts.append(response.text.rstrip("\n") + "\n")
+        return "".join(parts)
+
+    def parse_result(self, line: Dict) -> Dict:
+        result = {'custom_id': line.get('custom_id'), 'text': None,
+                  'finish_reason': None, 'output_tokens': None, 'error': None}
+        response = line.get('response') or {}
+        if line.get('error') or response.get('status_code', 200) >= 400:
+            result['error'] = json.dumps(line.get('error') or response.get('body'), ensure_ascii=False)
+            return result
+
+        body = response.get('body', {})
+        choice = body['choices'][0]
+        result['text'] = choice['message']['content']
+        result['finish_reason'] = choice.get('finish_reason') or "stop"
+        result['output_tokens'] = body.get('usage', {}).get('completion_tokens')
+        return result
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches API（/v1/messages/batches）"""
+
+    name = "anthropic"
+    API_VERSION = "2023-06-01"
+    LIST_PAGE_SIZE = 100
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, timeout: float = 120):
+        self.api_key = api_key
+        self.base_url = (base_url or "https://api.anthropic.com").rstrip('/')
+        self.timeout = timeout
+
+    def _headers(self) -> Dict[str, str]:
+        return {"x-api-key": self.api_key, "anthropic-version": self.API_VERSION}
+
+    def request_line(self, custom_id: str, request: Dict) -> Dict:
+        content = [{"type": "text", "text": request['prompt']}]
+        prefix = request.get('prompt_prefix')
+        if prefix and request['prompt'].startswith(prefix):
+            content = [
+                {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": request['prompt'][len(prefix):]}
+            ]
+        return {
+            "custom_id": custom_id,
+            "params": {
+                "model": request['model'],
+                "max_tokens": request['max_tokens'],
+                "temperature": request['temperature'],
+                "system": SYSTEM_PROMPT,
+                "messages": [{"role": "user", "content": content}]
+            }
+        }
+
+    def submit(self, record: BatchJobRecord, lines: List[Dict]) -> str:
+        response = requests.post(
+            f"{self.base_url}/v1/messages/batches",
+            headers=self._headers(),
+            json={"requests": lines},
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()['id']
+
+    def find_submitted(self, record: BatchJobRecord, lines: List[Dict], exclude: Set[str]) -> Optional[str]:
+        """
+        投入開始以降に作られ、リクエスト数が一致するバッチを探す
+
+        Message Batchesにはメタデータが無いため、投入開始時刻（時計のずれを見込んで1分前から）と
+        リクエスト数で照合し、他のジョブに記録済みのバッチは除く。一覧は新しい順なので、
+        投入開始より前に作られたバッチまで来たら打ち切る。
+        """
+        if not record.submit_started_at:
+            return None
+        started = datetime.fromisoformat(record.submit_started_at).timestamp() - 60
+        params: Dict = {"limit": self.LIST_PAGE_SIZE}
+        while True:
+            response = requests.get(f"{self.base_url}/v1/messages/batches", headers=self._headers(),
+                                    params=params, timeout=self.timeout)
+            response.raise_for_status()
+            page = response.json()
+            batches = page.get('data', [])
+            for batch in batches:
+                if batch['id'] in exclude or self._created_at(batch) < started:
+                    continue
+                if sum((batch.get('request_counts') or {}).values()) == len(lines):
+                    return batch['id']
+            if not page.get('has_more') or not batches or self._created_at(batches[-1]) < started:
+                return None
+            params['after_id'] = page.get('last_id') or batches[-1]['id']
+
+    @staticmethod
+    def _created_at(batch: Dict) -> float:
+        """バッチの作成時刻（UNIX時刻）"""
+        return datetime.fromisoformat(batch['created_at'].replace('Z', '+00:00')).timestamp()
+
+    def poll(self, record: BatchJobRecord) -> str:
+        response = requests.get(f"{self.base_url}/v1/messages/batches/{record.remote_id}",
+                                headers=self._headers(), timeout=self.timeout)
+        response.raise_for_status()
+        batch = response.json()
+
+        if batch.get('processing_status') == "ended":
+            return STATUS_ENDED
+        return STATUS_SUBMITTED
+
+    def download_results(self, record: BatchJobRecord) -> str:
+        response = requests.get(f"{self.base_url}/v1/messages/batches/{record.remote_id}/results",
+                                headers=self._headers(), timeout=self.timeout)
+        response.raise_for_status()
+        return response.text
+
+    def parse_result(self, line: Dict) -> Dict:
+        result = {'custom_id': line.get('custom_id'), 'text': None,
+                  'finish_reason': None, 'output_tokens': None, 'error': None}
+        outcome = line.get('result') or {}
+        if outcome.get('type') != "succeeded":
+            result['error'] = json.dumps(outcome.get('error') or {'type': outcome.get('type')}, ensure_ascii=False)
+            return result
+
+        message = outcome['message']
+        result['text'] = "".join(block.get('text', '') for block in message.get('content', [])
+                                 if block.get('type') == "text")
+        result['finish_reason'] = "length" if message.get('stop_reason') == "max_tokens" else "stop"
+        result['output_tokens'] = message.get('usage', {}).get('output_tokens')
+        return result
+
+def provider_for_model(model: str) -> str:
+    """モデル名からバッチAPIのプロバイダーを決める"""
+    return "anthropic" if model.startswith("claude") else "openai"
+
+def build_batch_backend(provider: str, config: Dict) -> BatchBackend:
+    """
+    設定からバッチAPIのバックエンドを作成
+
+    config/api_keys.json の *_api_key と *_base_url（スタブサーバー等）を使用する。
+
+    Args:
+        provider: openai または anthropic
+        config: 設定辞書
+
+    Returns:
+        BatchBackend
+    """
+    if provider == "openai":
+        return OpenAIBatchBackend(config.get('openai_api_key', ''), config.get('openai_base_url'))
+    if provider == "anthropic":
+        return AnthropicBatchBackend(config.get('anthropic_api_key', ''), config.get('anthropic_base_url'))
+    raise ValueError(f"バッチAPIに対応していないプロバイダー: {provider}")
+
+class BatchJobManager:
+    """バッチジョブの作成・投入・ポーリング・回収
+
+    各段階の終わりにジョブ記録を保存するため、プロセスが途中で終了しても
+    resume() で続きから処理できる。回収は記事単位で記録するので、同じ記事を二重に保存しない。
+    """
+
+    def __init__(self, config: Dict, jobs_dir: str = "data/batch_jobs"):
+        """
+        初期化
+
+        Args:
+            config: APIキー・ベースURLを含む設定辞書（config/api_keys.json）
+            jobs_dir: ジョブ記録・リクエスト・結果ファイルの保存先
+        """
+        self.config = config
+        self.jobs_dir = jobs_dir
+        self._backends: Dict[str, BatchBackend] = {}
+        os.makedirs(jobs_dir, exist_ok=True)
+
+    def backend(self, provider: str) -> BatchBackend:
+        """プロバイダーのバッチAPI"""
+        if provider not in self._backends:
+            self._backends[provider] = build_batch_backend(provider, self.config)
+        return self._backends[provider]
+
+    def job_path(self, job_id: str) -> str:
+        """ジョブ記録のパス"""
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def create(self, requests_by_keyword: List[Dict], model: str, config: Optional[Dict] = None) -> BatchJobRecord:
+        """
+        ジョブを作成してリクエストファイル（JSONL）を書き出す
+
+        プロバイダーはモデル名から決める（claude-* はAnthropic、それ以外はOpenAI）。
+
+        Args:
+            requests_by_keyword: ArticleGenerator.prepare_request() の戻り値のリスト
+            model: モデル名
+            config: 記録しておく記事生成設定（再開時に使用）
+
+        Returns:
+            BatchJobRecord
+        """
+        job_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        record = BatchJobRecord(
+            job_id=job_id,
+            provider=provider_for_model(model),
+            model=model,
+            config=config or {},
+            path=self.job_path(job_id)
+        )
+
+        backend = self.backend(record.provider)
+        with open(record.input_path, 'w', encoding='utf-8') as f:
+            for index, request in enumerate(requests_by_keyword, 1):
+                custom_id = f"article-{index:05d}"
+                record.items.append(BatchItem(
+                    custom_id=custom_id,
+                    keyword=request['main_keyword'],
+                    related_keywords=request.get('related_keywords', [])
+                ))
+                line = backend.request_line(custom_id, request)
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+        record.save()
+        logger.info(f"バッチジョブ作成: {job_id} ({len(record.items)}件)")
+        return record
+
+    def load(self, job_id: str) -> BatchJobRecord:
+        """ジョブ記録を読み込む"""
+        return BatchJobRecord.load(self.job_path(job_id))
+
+    def submit(self, record: BatchJobRecord):
+        """リクエストファイルをプロバイダーに投入"""
+        if record.status not in (STATUS_CREATED, STATUS_SUBMITTING):
+            return
+
+        with open(record.input_path, 'r', encoding='utf-8') as f:
+            lines = [json.loads(line) for line in f if line.strip()]
+        backend = self.backend(record.provider)
+
+        remote_id = None
+        if record.status == STATUS_SUBMITTING:
+            # 前回の投入が応答を記録する前に中断した場合は、投入済みのバッチを使う（二重投入・二重課金を防ぐ）
+            remote_id = backend.find_submitted(record, lines, self._claimed_remote_ids(record))
+            if remote_id:
+                logger.info(f"投入済みのバッチを使用: {record.job_id} -> {remote_id}")
+        else:
+            record.status = STATUS_SUBMITTING
+            record.submit_started_at = datetime.now().isoformat()
+            record.save()
+
+        record.remote_id = remote_id or backend.submit(record, lines)
+        record.status = STATUS_SUBMITTED
+        record.save()
+        logger.info(f"バッチ投入: {record.job_id} -> {record.remote_id}")
+
+    def _claimed_remote_ids(self, record: BatchJobRecord) -> Set[str]:
+        """他のジョブに記録済みのリモートID"""
+        claimed = set()
+        for name in os.listdir(self.jobs_dir):
+            if name.endswith(".json") and name != os.path.basename(record.path):
+                other = BatchJobRecord.load(os.path.join(self.jobs_dir, name))
+                if other.remote_id:
+                    claimed.add(other.remote_id)
+        return claimed
+
+    def poll(self, record: BatchJobRecord) -> str:
+        """
+        リモートの状態を1回確認して記録を更新
+
+        Returns:
+            更新後の状態
+        """
+        if record.status != STATUS_SUBMITTED:
+            return record.status
+
+        status = self.backend(record.provider).poll(record)
+        if status != record.status:
+            record.status = status
+            record.save()
+            logger.info(f"バッチ状態更新: {record.job_id} -> {status}")
+        return status
+
+    def wait(self, record: BatchJobRecord, poll_interval: float = 60.0,
+             timeout: Optional[float] = None) -> str:
+        """
+        処理が終わるまでポーリング
+
+        Args:
+            record: ジョブ記録
+            poll_interval: 確認間隔（秒）
+            timeout: 最大待機秒数（Noneで無制限）
+
+        Returns:
+            最終的な状態（タイムアウト時はSTATUS_SUBMITTED）
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self.poll(record) == STATUS_SUBMITTED:
+            if deadline is not None and time.monotonic() + poll_interval > deadline:
+                logger.info(f"バッチ処理待ちを中断（再開可能）: {record.job_id}")
+                break
+            time.sleep(poll_interval)
+        return record.status
+
+    def results(self, record: BatchJobRecord) -> Iterator[Dict]:
+        """
+        結果を共通形式で返す（初回のみダウンロードしてファイルに保存）
+
+        Yields:
+            {'custom_id', 'text', 'finish_reason', 'output_tokens', 'error'}
+        """
+        backend = self.backend(record.provider)
+        if not os.path.exists(record.results_path):
+            data = backend.download_results(record)
+            tmp_path = f"{record.results_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(tmp_path, record.results_path)
+
+        with open(record.results_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield backend.parse_result(json.loads(line))
+
+    def collect(self, record: BatchJobRecord,
+                handler: Callable[[BatchItem, Dict], Optional[str]]) -> Dict:
+        """
+        未回収の結果をhandlerに渡し、記事ごとに回収済みとして記録
+
+        Args:
+            record: ジョブ記録（STATUS_ENDEDであること）
+            handler: (項目, 結果) を受け取り、保存先パス等を返す関数（Noneで失敗扱い）
+
+        Returns:
+            ジョブの集計
+        """
+        if record.status not in (STATUS_ENDED, STATUS_COLLECTED):
+            return record.summary()
+
+        for result in self.results(record):
+            item = record.item(result['custom_id'])
+            if item is None or item.status != "pending":
+                continue
+
+            if result['error'] or not result['text']:
+                item.status = "errored"
+                item.error = result['error'] or "空の応答"
+                logger.warning(f"バッチ結果エラー: {item.keyword} ({item.error})")
+            else:
+                item.finish_reason = result['finish_reason']
+                try:
+                    item.output = handler(item, result)
+                except Exception as e:
+                    logger.error(f"バッチ結果の処理エラー: {item.keyword} ({e})")
+                    item.output = None
+                if item.output:
+                    item.status = "collected"
+                else:
+                    item.status = "errored"
+                    item.error = item.error or "記事の作成に失敗"
+            record.save()
+
+        # 結果に含まれなかった項目は失敗として確定
+        for item in record.items:
+            if item.status == "pending":
+                item.status = "errored"
+                item.error = "結果に含まれていません"
+
+        record.status = STATUS_COLLECTED
+        record.save()
+        logger.info(f"バッチ回収完了: {record.summary()}")
+        return record.summary()
+
+    def run(self, record: BatchJobRecord,
+            handler: Callable[[BatchItem, Dict], Optional[str]],
+            poll_interval: float = 60.0,
+            timeout: Optional[float] = None) -> Dict:
+        """
+        現在の状態から投入・待機・回収までを進める（resumeにも使用）
+
+        Args:
+            record: ジョブ記録
+            handler: 結果の処理関数
+            poll_interval: 確認間隔（秒）
+            timeout: 最大待機秒数（超えた場合は記録を残して戻る）
+
+        Returns:
+            ジョブの集計
+        """
+        self.submit(record)
+        if self.wait(record, poll_interval, timeout) == STATUS_ENDED:
+            return self.collect(record, handler)
+        return record.summary()
+
+    def pending_jobs(self) -> List[BatchJobRecord]:
+        """回収が終わっていないジョブの一覧"""
+        jobs = []
+        for name in sorted(os.listdir(self.jobs_dir)):
+            if name.endswith(".json"):
+                record = BatchJobRecord.load(os.path.join(self.jobs_dir, name))
+                if record.status not in (STATUS_COLLECTED, STATUS_FAILED):
+                    jobs.append(record)
+        return jobs
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+キーワードバックログモジュール
+リサーチで見つけたキーワードをSQLiteに蓄積し、優先度の高い順に記事生成へ渡す
+"""
+
+import json
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from keyword_research import KeywordData
+
+logger = logging.getLogger(__name__)
+
+STATUS_PENDING = "pending"
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_GENERATED = "generated"
+STATUS_FAILED = "failed"
+
+# 検索ボリューム・競合性によるスコアの倍率
+VOLUME_WEIGHTS = {"high": 1.5, "medium": 1.2, "low": 0.8, "unknown": 1.0}
+COMPETITION_WEIGHTS = {"low": 1.3, "medium": 1.0, "high": 0.7, "unknown": 1.0}
+
+def keyword_score(keyword_data: KeywordData) -> float:
+    """
+    キーワードの基本スコア（トレンドスコア × 検索ボリューム倍率 × 競合性倍率）
+
+    Args:
+        keyword_data: キーワードデータ
+
+    Returns:
+        正のスコア
+    """
+    return (max(keyword_data.trend_score, 1.0)
+            * VOLUME_WEIGHTS.get(keyword_data.search_volume, 1.0)
+            * COMPETITION_WEIGHTS.get(keyword_data.competition, 1.0))
+
+class KeywordBacklog:
+    """SQLiteに永続化したキーワードの優先度付きキュー
+
+    優先度は ln(スコア) + λ × 最終検出時刻 で保存する。スコアが半減期ごとに半分になる減衰
+    （スコア × 2^(-経過時間/半減期)）と同じ順序になるため、時間が経っても全件を再計算せずに
+    (status, priority) の索引から最良のキーワードを取り出せる（O(log n)）。
+    """
+
+    def __init__(self,
+                 db_path: str = "data/keyword_backlog.db",
+                 half_life_hours: float = 72.0,
+                 max_attempts: int = 3,
+                 claim_timeout: float = 3600.0):
+        """
+        初期化
+
+        Args:
+            db_path: SQLiteファイルのパス
+            half_life_hours: スコアが半分になるまでの時間（最後にリサーチで見つかってから）
+            max_attempts: 生成に失敗した場合の最大試行回数
+            claim_timeout: 生成中のまま放置されたキーワードを待ち状態に戻すまでの秒数
+        """
+        self.db_path = db_path
+        self.half_life_hours = half_life_hours
+        self.decay = math.log(2) / (half_life_hours * 3600)
+        self.max_attempts = max_attempts
+        self.claim_timeout = claim_timeout
+
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS keywords (
+                keyword TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                score REAL NOT NULL,
+                priority REAL NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                seen_count INTEGER NOT NULL DEFAULT 1,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                claimed_at REAL,
+                generated_at REAL,
+                article_path TEXT,
+                error TEXT
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_keywords_queue ON keywords(status, priority DESC)"
+        )
+        self._conn.commit()
+
+    def _priority(self, score: float, seen_at: float) -> float:
+        return math.log(score) + self.decay * seen_at
+
+    def effective_score(self, priority: float, now: Optional[float] = None) -> float:
+        """減衰後のスコア（表示用）"""
+        now = time.time() if now is None else now
+        return math.exp(priority - self.decay * now)
+
+    def merge(self, keyword_data_list: List[KeywordData]) -> Dict[str, int]:
+        """
+        リサーチ結果をバックログに追加・更新
+
+        既存のキーワードは最新のデータで再スコアリングし、最終検出時刻を更新する（減衰がリセットされる）。
+        生成済みのキーワードは再度キューに入れない。失敗して諦めたキーワードは再び見つかれば待ち状態に戻す。
+
+        Args:
+            keyword_data_list: KeywordDataのリスト
+
+        Returns:
+            {'added': 追加数, 'updated': 更新数}
+        """
+        added = updated = 0
+        now = time.time()
+        with self._lock:
+            for keyword_data in keyword_data_list:
+                score = keyword_score(keyword_data)
+                priority = self._priority(score, now)
+                data = json.dumps(asdict(keyword_data), ensure_ascii=False)
+
+                cursor = self._conn.execute(
+                    "UPDATE keywords SET data = ?, score = ?, priority = ?, last_seen = ?, "
+                    "seen_count = seen_count + 1, "
+                    "attempts = CASE WHEN status = ? THEN 0 ELSE attempts END, "
+                    "status = CASE WHEN status = ? THEN ? ELSE status END "
+                    "WHERE keyword = ?",
+                    (data, score, priority, now, STATUS_FAILED, STATUS_FAILED, STATUS_PENDING,
+                     keyword_data.main_keyword)
+                )
+                if cursor.rowcount:
+                    updated += 1
+                    continue
+
+                self._conn.execute(
+                    "INSERT INTO keywords (keyword, data, score, priority, status, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (keyword_data.main_keyword, data, score, priority, STATUS_PENDING, now, now)
+                )
+                added += 1
+            self._conn.commit()
+
+        logger.info(f"キーワードバックログ: {added}個追加, {updated}個更新")
+        return {'added': added, 'updated': updated}
+
+    def pop(self) -> Optional[KeywordData]:
+        """
+        優先度が最も高い待ち状態のキーワードを取り出し、生成中にする
+
+        別プロセスが同じキーワードを先に取り出した場合は次の候補を取る。
+
+        Returns:
+            KeywordData（待ち状態のキーワードが無ければNone）
+        """
+        with self._lock:
+            while True:
+                row = self._conn.execute(
+                    "SELECT keyword, data FROM keywords WHERE status = ? ORDER BY priority DESC LIMIT 1",
+                    (STATUS_PENDING,)
+                ).fetchone()
+                if row is None:
+                    return None
+
+                keyword, data = row
+                cursor = self._conn.execute(
+                    "UPDATE keywords SET status = ?, claimed_at = ?, attempts = attempts + 1 "
+                    "WHERE keyword = ? AND status = ?",
+                    (STATUS_IN_PROGRESS, time.time(), keyword, STATUS_PENDING)
+                )
+                self._conn.commit()
+                if cursor.rowcount:
+                    return KeywordData(**json.loads(data))
+
+    def iter_pop(self, count: int) -> Iterator[KeywordData]:
+        """
+        最大count個のキーワードを1つずつ取り出す（生成側が次を要求した時点で取り出す）
+
+        Args:
+            count: 取り出す最大数
+
+        Yields:
+            KeywordData
+        """
+        self.release_stale()
+        for _ in range(count):
+            keyword_data = self.pop()
+            if keyword_data is None:
+                return
+            yield keyword_data
+
+    def mark_generated(self, keyword: str, article_path: Optional[str] = None):
+        """
+        生成済みにする
+
+        Args:
+            keyword: キーワード
+            article_path: 保存した記事のパス
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE keywords SET status = ?, generated_at = ?, article_path = ?, error = NULL "
+                "WHERE keyword = ?",
+                (STATUS_GENERATED, time.time(), article_path, keyword)
+            )
+            self._conn.commit()
+
+    def mark_failed(self, keyword: str, error: str = ""):
+        """
+        生成失敗を記録（試行回数が上限未満なら待ち状態に戻す）
+
+        Args:
+            keyword: キーワード
+            error: エラー内容
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE keywords SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "claimed_at = NULL, error = ? WHERE keyword = ?",
+                (self.max_attempts, STATUS_FAILED, STATUS_PENDING, error, keyword)
+            )
+            self._conn.commit()
+
+    def release_stale(self) -> int:
+        """生成中のままclaim_timeout秒を過ぎたキーワードを待ち状態に戻す"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE keywords SET status = ?, claimed_at = NULL WHERE status = ? AND claimed_at < ?",
+                (STATUS_PENDING, STATUS_IN_PROGRESS, time.time() - self.claim_timeout)
+            )
+            self._conn.commit()
+        if cursor.rowcount:
+            logger.info(f"キーワードバックログ: 放置された{cursor.rowcount}個を待ち状態に戻しました")
+        return cursor.rowcount
+
+    def peek(self, limit: int = 10) -> List[Tuple[KeywordData, float]]:
+        """
+        優先度の高い待ち状態のキーワード
+
+        Args:
+            limit: 取得数
+
+        Returns:
+            (KeywordData, 減衰後のスコア) のリスト
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data, priority FROM keywords WHERE status = ? ORDER BY priority DESC LIMIT ?",
+                (STATUS_PENDING, limit)
+            ).fetchall()
+        return [(KeywordData(**json.loads(data)), self.effective_score(priority, now)) for data, priority in rows]
+
+    def purge(self, older_than_days: float) -> int:
+        """
+        長期間リサーチで見つかっていない待ち状態のキーワードを削除
+
+        Args:
+            older_than_days: 最終検出からの日数
+
+        Returns:
+            削除数
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM keywords WHERE status IN (?, ?) AND last_seen < ?",
+                (STATUS_PENDING, STATUS_FAILED, time.time() - older_than_days * 86400)
+            )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict:
+        """状態ごとの件数"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM keywords GROUP BY status").fetchall()
+        counts = {STATUS_PENDING: 0, STATUS_IN_PROGRESS: 0, STATUS_GENERATED: 0, STATUS_FAILED: 0}
+        counts.update(dict(rows))
+        counts['total'] = sum(count for _, count in rows)
+        return counts
+
+    def close(self):
+        """接続を閉じる"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+キーワードクラスタリングモジュール
+文字n-gramのMinHash/LSHで表記ゆれ・ほぼ同じ検索語をまとめる
+（空白で区切らないため日本語にも使える。候補ペアだけを比較するので件数の2乗にならない）
+"""
+
+import logging
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# MinHashのハッシュ関数の数（= バンド数 × バンドあたりの行数）
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+
+# 同じクラスタとみなす文字n-gramのJaccard係数
+DEFAULT_SIMILARITY = 0.6
+
+_PRIME = (1 << 31) - 1
+
+_NUMBER_RE = re.compile(r'\d+')
+
+@dataclass
+class KeywordCluster:
+    """キーワードのクラスタ"""
+    representative: str
+    members: List[str] = field(default_factory=list)  # 代表以外（入力順）
+
+def normalize_keyword(keyword: str) -> str:
+    """
+    比較用にキーワードを正規化（全角半角・大文字小文字・ひらがなカタカナ・空白の違いを除く）
+
+    Args:
+        keyword: キーワード
+
+    Returns:
+        正規化した文字列
+    """
+    text = unicodedata.normalize("NFKC", keyword).lower()
+    text = "".join(chr(ord(char) + 0x60) if "ぁ" <= char <= "ゖ" else char for char in text)
+    return "".join(text.split())
+
+def number_tokens(keyword: str) -> Tuple[str, ...]:
+    """
+    キーワードに含まれる数字の並び（iPhone 15 と iPhone 16、2023 と 2024 は別の話題として扱う）
+
+    Args:
+        keyword: キーワード
+
+    Returns:
+        数字のまとまりのタプル（全角数字は半角にする）
+    """
+    return tuple(_NUMBER_RE.findall(unicodedata.normalize("NFKC", keyword)))
+
+def char_shingles(keyword: str, n: int = 2) -> Set[str]:
+    """
+    正規化したキーワードの文字n-gram
+
+    Args:
+        keyword: キーワード
+        n: n-gramの長さ
+
+    Returns:
+        n-gramの集合（n文字未満ならキーワード全体）
+    """
+    text = normalize_keyword(keyword)
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    """集合のJaccard係数"""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+class MinHasher:
+    """文字n-gram集合のMinHash署名"""
+
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, seed: int = 1):
+        """
+        初期化
+
+        Args:
+            num_perm: ハッシュ関数の数
+            seed: ハッシュ関数の乱数シード（同じシードなら署名は常に同じ）
+        """
+        rng = np.random.RandomState(seed)
+        self.num_perm = num_perm
+        self._a = rng.randint(1, _PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _PRIME, size=num_perm).astype(np.uint64)
+
+    def signature(self, shingles: Set[str]) -> np.ndarray:
+        """
+        MinHash署名
+
+        Args:
+            shingles: n-gramの集合
+
+        Returns:
+            長さnum_permの配列
+        """
+        if not shingles:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) & _PRIME for s in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        # (a * x + b) mod p をハッシュ関数ごと・n-gramごとに計算し、最小値を取る
+        return ((np.outer(self._a, hashes) + self._b[:, None]) % _PRIME).min(axis=1)
+
+class _UnionFind:
+    """素集合データ構造"""
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # 入力順が早い方を根にする
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+def cluster_indices(keywords: Sequence[str],
+                    threshold: float = DEFAULT_SIMILARITY,
+                    ngram: int = 2,
+                    num_perm: int = MINHASH_PERMUTATIONS,
+                    bands: int = LSH_BANDS) -> List[List[int]]:
+    """
+    近いキーワードをクラスタにまとめる
+
+    MinHash署名をバンドに分け、いずれかのバンドが一致したペアだけを候補として
+    実際のJaccard係数を確認し、threshold以上ならUnion-Findで同じクラスタにする。
+    含まれる数字（number_tokens）が異なるペアは、文字が似ていても別の話題なのでまとめない
+    （同じクラスタの要素は全て同じ数字の並びを持つ）。
+
+    Args:
+        keywords: キーワード
+        threshold: 同じクラスタとみなすJaccard係数
+        ngram: 文字n-gramの長さ
+        num_perm: MinHashのハッシュ関数の数
+        bands: LSHのバンド数（num_permの約数）
+
+    Returns:
+        クラスタごとのインデックスのリスト（クラスタ・要素とも入力順）
+    """
+    rows = num_perm // bands
+    hasher = MinHasher(num_perm=rows * bands)
+    shingles = [char_shingles(keyword, ngram) for keyword in keywords]
+    numbers = [number_tokens(keyword) for keyword in keywords]
+    signatures = [hasher.signature(s) for s in shingles]
+
+    union_find = _UnionFind(len(keywords))
+    checked = set()
+    for band in range(bands):
+        buckets: Dict[bytes, List[int]] = defaultdict(list)
+        for index, signature in enumerate(signatures):
+            buckets[signature[band * rows:(band + 1) * rows].tobytes()].append(index)
+
+        for members in buckets.values():
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    if (first, second) in checked:
+                        continue
+                    checked.add((first, second))
+                    if numbers[first] != numbers[second]:
+                        continue
+                    if jaccard(shingles[first], shingles[second]) >= threshold:
+                        union_find.union(first, second)
+
+    clusters: Dict[int, List[int]] = defaultdict(list)
+    for index in range(len(keywords)):
+        clusters[union_find.find(index)].append(index)
+    return list(clusters.values())
+
+def cluster_keywords(keywords: Sequence[str],
+                     threshold: float = DEFAULT_SIMILARITY,
+                     ngram: int = 2) -> List[KeywordCluster]:
+    """
+    キーワードをクラスタにまとめ、入力順で最初のものを代表にする
+
+    Args:
+        keywords: キーワード（重要な順に並べておく）
+        threshold: 同じクラスタとみなすJaccard係数
+        ngram: 文字n-gramの長さ
+
+    Returns:
+        KeywordClusterのリスト（代表の入力順）
+    """
+    clusters = [
+        KeywordCluster(
+            representative=keywords[indices[0]],
+            members=[keywords[index] for index in indices[1:]]
+        )
+        for indices in cluster_indices(keywords, threshold, ngram)
+    ]
+
+    merged = len(keywords) - len(clusters)
+    if merged:
+        logger.info(f"キーワードクラスタリング: {len(keywords)}個 → {len(clusters)}個（{merged}個を統合）")
+    return clusters
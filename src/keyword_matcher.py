@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+キーワードマッチングモジュール
+複数のキーワードの出現位置をまとめて求める（キーワードが多い場合はAho-Corasickオートマトンで本文を1回だけ走査する）
+"""
+
+import re
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+# これ未満のキーワード数ではオートマトンを作らず、キーワードごとに str.find で走査する
+# （CPythonでは数百語程度までC実装の str.find を繰り返す方が1文字ずつの遷移より速い）
+AUTOMATON_MIN_KEYWORDS = 256
+
+class KeywordMatcher:
+    """複数キーワードのマッチャー（キーワードが多い場合はAho-Corasickオートマトン）
+
+    キーワードは小文字化して登録する。照合するテキストも小文字化済みのもの（TextStats.lower など）を渡す。
+    同じキーワードの出現は重ならないように左から数えるため、件数は str.count と一致する。
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        初期化
+
+        Args:
+            keywords: キーワード（空文字列と重複は除く）
+        """
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(k.lower() for k in keywords if k))
+        self._lengths = [len(k) for k in self.keywords]
+        self.use_automaton = len(self.keywords) >= AUTOMATON_MIN_KEYWORDS
+        if self.use_automaton:
+            self._build_automaton()
+
+    def _build_automaton(self):
+        """トライ木と失敗遷移を構築"""
+        # トライ木
+        self._goto: List[Dict[str, int]] = [{}]
+        self._output: List[Tuple[int, ...]] = [()]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for ch in keyword:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._output.append(())
+                    self._goto[state][ch] = next_state
+                state = next_state
+            self._output[state] += (index,)
+
+        # 失敗遷移（幅優先で、失敗先の出力も引き継ぐ）
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = fail if fail != next_state else 0
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+        # 初期状態ではキーワードの先頭文字まで読み飛ばす
+        first_chars = ''.join(re.escape(ch) for ch in sorted(self._goto[0]))
+        self._first_char_re = re.compile(f'[{first_chars}]') if first_chars else None
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """
+        全キーワードの出現位置
+
+        Args:
+            text: 小文字化済みのテキスト
+
+        Returns:
+            {キーワード: 開始位置のリスト}（出現しないキーワードは空リスト）
+        """
+        positions: Dict[str, List[int]] = {keyword: [] for keyword in self.keywords}
+        if not self.use_automaton:
+            find = text.find
+            for keyword, hits in positions.items():
+                start = find(keyword)
+                while start != -1:
+                    hits.append(start)
+                    start = find(keyword, start + len(keyword))
+            return positions
+
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        hits = [positions[keyword] for keyword in self.keywords]
+        last_end = [0] * len(self.keywords)
+        search = self._first_char_re.search
+        length = len(text)
+        state = 0
+        i = 0
+        while i < length:
+            if state == 0:
+                match = search(text, i)
+                if match is None:
+                    break
+                i = match.start()
+            ch = text[i]
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            i += 1
+            for index in output[state]:
+                start = i - lengths[index]
+                if start >= last_end[index]:
+                    hits[index].append(start)
+                    last_end[index] = i
+        return positions
+
+    def count_all(self, text: str) -> Dict[str, int]:
+        """
+        全キーワードの出現回数
+
+        Args:
+            text: 小文字化済みのテキスト
+
+        Returns:
+            {キーワード: 出現回数}
+        """
+        return {keyword: len(hits) for keyword, hits in self.find_all(text).items()}
+
+    def found(self, text: str) -> Set[str]:
+        """
+        テキストに含まれるキーワード
+
+        Args:
+            text: 小文字化済みのテキスト
+
+        Returns:
+            1回以上出現したキーワードの集合
+        """
+        return {keyword for keyword, hits in self.find_all(text).items() if hits}
+
+@lru_cache(maxsize=256)
+def _cached_matcher(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+def get_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """
+    キーワードの組み合わせごとにキャッシュしたKeywordMatcher
+
+    Args:
+        keywords: キーワード
+
+    Returns:
+        KeywordMatcher
+    """
+    return _cached_matcher(tuple(dict.fromkeys(k.lower() for k in keywords if k)))
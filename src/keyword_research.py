@@ -4,19 +4,50 @@
 Google Trendsからトレンドキーワードを収集し、関連キーワードも取得する
 """
 
+import asyncio
 import time
 import json
 import csv
+import hashlib
 import logging
+import os
+import pickle
+import sqlite3
+import threading
+import zlib
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 import pandas as pd
 from pytrends.request import TrendReq
 import requests
 
+from keyword_clustering import DEFAULT_SIMILARITY, cluster_keywords
+from keyword_scoring import (
+    COMPETITION_HIGH_RELATED, COMPETITION_MEDIUM_RELATED, COMPETITION_SHORT_WORDS,
+    TREND_BONUS_WEIGHT, VOLUME_HIGH_AVG, VOLUME_HIGH_PEAK, VOLUME_MEDIUM_AVG, VOLUME_MEDIUM_PEAK,
+    score_keywords
+)
+from rate_limit import AdaptiveRateLimiter, CircuitBreaker, CircuitOpenError
+from retry_policy import is_retryable_error
+from trend_history import TIMEFRAME_DAYS, TrendHistoryStore
+
 logger = logging.getLogger(__name__)
 
+# Google Trendsの1ペイロードに含められるキーワード数
+PAYLOAD_MAX_TERMS = 5
+
+# 検索ボリューム・トレンドスコアの算出に使う期間
+VOLUME_TIMEFRAME = 'today 3-m'
+TREND_TIMEFRAME = 'now 7-d'
+
+# 同じ期間指定でこの秒数以内に取得済みの検索推移は、Google Trendsに問い合わせずトレンド履歴から読む
+HISTORY_MAX_AGE = 12 * 3600
+
+# Google Trendsへのリクエストレートの範囲（1秒あたり）
+TRENDS_MIN_RATE = 1 / 60
+TRENDS_MAX_RATE = 1.0
+
 @dataclass
 class KeywordData:
     """キーワードデータクラス"""
@@ -29,10 +60,228 @@ class KeywordData:
     category: str
     collected_at: str
 
+# キャッシュの有効期間（秒、期間指定ごと）。短い期間ほど変化が速いため短くする
+TRENDS_CACHE_TTLS = {
+    'trending': 15 * 60,
+    'now 1-H': 5 * 60,
+    'now 4-H': 10 * 60,
+    'now 1-d': 30 * 60,
+    'now 7-d': 60 * 60,
+    'today 1-m': 6 * 3600,
+    'today 3-m': 12 * 3600,
+    'today 12-m': 24 * 3600,
+    'today 5-y': 7 * 24 * 3600,
+}
+DEFAULT_TRENDS_CACHE_TTL = 60 * 60
+
+class TrendsCache:
+    """Google Trendsの応答（DataFrame等）をSQLiteに保存する共有キャッシュ
+
+    - キーは (種類, キーワードの集合, 期間, geo, hl)
+    - 値はpickleをzlibで圧縮して保存する
+    - 期間ごとのTTLを過ぎても stale_factor 倍の期間内であれば古い値を返し、
+      裏で1回だけ再取得する（stale-while-revalidate）
+    """
+
+    def __init__(self,
+                 db_path: str = "data/trends_cache.db",
+                 ttls: Optional[Dict[str, float]] = None,
+                 stale_factor: float = 4.0,
+                 bypass: bool = False):
+        """
+        初期化
+
+        Args:
+            db_path: SQLiteファイルのパス
+            ttls: 期間指定ごとのTTL（秒）の上書き
+            stale_factor: TTL切れ後も古い値を返す期間（TTLの倍数）
+            bypass: キャッシュ参照をスキップするか（取得結果は保存する）
+        """
+        self.db_path = db_path
+        self.ttls = dict(TRENDS_CACHE_TTLS, **(ttls or {}))
+        self.stale_factor = stale_factor
+        self.bypass = bypass
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS trends (
+                key TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                timeframe TEXT,
+                payload BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(kind: str, keywords: List[str], timeframe: str, geo: str, hl: str) -> str:
+        """
+        キャッシュキーを作成（キーワードの順序は問わない）
+
+        Args:
+            kind: trending_searches, related_queries, interest_over_time
+            keywords: キーワード
+            timeframe: 期間指定
+            geo: 地域
+            hl: 言語
+
+        Returns:
+            SHA-256ハッシュ文字列
+        """
+        payload = json.dumps([kind, sorted(keywords), timeframe, geo, hl], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def ttl_for(self, timeframe: str) -> float:
+        """期間指定のTTL（秒）"""
+        return self.ttls.get(timeframe, DEFAULT_TRENDS_CACHE_TTL)
+
+    def get(self, key: str) -> Tuple[Any, str]:
+        """
+        キャッシュから取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            (値, 状態)。状態は 'fresh', 'stale'（TTL切れだが利用可）, 'miss'
+        """
+        if self.bypass:
+            return None, 'miss'
+
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at, expires_at FROM trends WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None, 'miss'
+
+        payload, created_at, expires_at = row
+        if now > expires_at + (expires_at - created_at) * self.stale_factor:
+            with self._lock:
+                self._conn.execute("DELETE FROM trends WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+            return None, 'miss'
+
+        try:
+            value = pickle.loads(zlib.decompress(payload))
+        except Exception as e:
+            logger.warning(f"トレンドキャッシュの読み込みエラー: {e}")
+            with self._lock:
+                self.misses += 1
+            return None, 'miss'
+
+        with self._lock:
+            if now > expires_at:
+                self.stale_hits += 1
+                return value, 'stale'
+            self.hits += 1
+        return value, 'fresh'
+
+    def set(self, key: str, kind: str, timeframe: str, value: Any):
+        """
+        値を保存
+
+        Args:
+            key: キャッシュキー
+            kind: 種類（統計用）
+            timeframe: 期間指定（TTLの決定に使用）
+            value: 保存する値
+        """
+        now = time.time()
+        payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO trends (key, kind, timeframe, payload, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, timeframe, payload, now, now + self.ttl_for(timeframe))
+            )
+            self._conn.commit()
+
+    def refresh_in_background(self, key: str, refresh: Callable[[], None]):
+        """
+        古い値を返した後の再取得を裏で実行（同じキーの再取得は同時に1つまで）
+
+        Args:
+            key: 再取得の単位となるキー
+            refresh: 取得してset()まで行う関数
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.refreshes += 1
+
+        def run():
+            try:
+                refresh()
+            except Exception as e:
+                logger.warning(f"トレンドキャッシュの再取得エラー: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, name="trends-refresh", daemon=True).start()
+
+    def purge_expired(self) -> int:
+        """古い値としても使えなくなったエントリを削除"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM trends WHERE ? > expires_at + (expires_at - created_at) * ?",
+                (now, self.stale_factor)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict:
+        """キャッシュ統計"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(payload)), 0) FROM trends"
+            ).fetchone()
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': entries,
+                'bytes': size,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'hit_rate': (self.hits + self.stale_hits) / lookups if lookups else 0.0
+            }
+
 class KeywordResearcher:
     """トレンドキーワード収集クラス"""
     
-    def __init__(self, geo: str = 'JP', hl: str = 'ja-JP', tz: int = 540):
+    def __init__(self, geo: str = 'JP', hl: str = 'ja-JP', tz: int = 540,
+                 request_interval: float = 2.0,
+                 cache: Optional[TrendsCache] = None,
+                 use_cache: bool = True,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 circuit_breaker: Optional[CircuitBreaker] = None,
+                 max_attempts: int = 3,
+                 cluster_threshold: Optional[float] = DEFAULT_SIMILARITY,
+                 history: Optional[TrendHistoryStore] = None,
+                 history_max_age: float = HISTORY_MAX_AGE):
         """
         初期化
         
@@ -40,12 +289,42 @@ class KeywordResearcher:
             geo: 地理的な場所 (JP=日本)
             hl: 言語設定
             tz: タイムゾーン (540=JST)
+            request_interval: 初期のリクエスト間隔（秒、以降は429の有無に応じて調整）
+            cache: Google Trendsの応答キャッシュ（Noneで data/trends_cache.db を共有）
+            use_cache: キャッシュを使用するか
+            rate_limiter: リクエストレートの制御（Noneで request_interval から作成）
+            circuit_breaker: 連続してスロットリングされた場合に取得を止めるサーキットブレーカー
+            max_attempts: スロットリング・タイムアウト時を含めた1ペイロードあたりの最大試行回数
+            cluster_threshold: 表記ゆれとみなす文字n-gramのJaccard係数（Noneでまとめない）
+            history: 取得した検索推移を蓄積するトレンド履歴（Noneで蓄積しない）
+            history_max_age: 同じ期間指定でこの秒数以内に取得済みの検索推移は、Google Trendsに問い合わせず履歴を使う
         """
         self.geo = geo
         self.hl = hl
         self.tz = tz
+        initial_rate = 1.0 / request_interval if request_interval > 0 else TRENDS_MAX_RATE
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(
+            rate=initial_rate,
+            min_rate=TRENDS_MIN_RATE,
+            max_rate=max(TRENDS_MAX_RATE, initial_rate)
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker(
+            failure_threshold=5, reset_timeout=300.0, name="Google Trends"
+        )
+        self.max_attempts = max(1, max_attempts)
+        self.cluster_threshold = cluster_threshold
+        self.history = history
+        self.history_max_age = history_max_age
+        self.history_hits = 0
         self.pytrends = TrendReq(hl=hl, tz=tz)
         
+        self.cache = None
+        if use_cache:
+            try:
+                self.cache = cache or TrendsCache()
+            except Exception as e:
+                logger.warning(f"トレンドキャッシュを使用できません: {e}")
+        
     def get_trending_keywords(self, 
                             category: Optional[str] = None, 
                             limit: int = 10,
@@ -62,28 +341,7 @@ class KeywordResearcher:
             KeywordDataのリスト
         """
         try:
-            logger.info(f"トレンドキーワード取得開始: limit={limit}, category={category}")
-            
-            # 日本のトレンド検索を取得
-            trending_searches = self.pytrends.trending_searches(pn=self.geo.lower())
-            base_keywords = trending_searches[0].tolist()[:limit]
-            
-            keyword_data_list = []
-            
-            for keyword in base_keywords:
-                try:
-                    # 関連情報を取得
-                    keyword_data = self._analyze_keyword(keyword, timeframe)
-                    if keyword_data:
-                        keyword_data_list.append(keyword_data)
-                        
-                    # API制限対策
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    logger.warning(f"キーワード分析エラー {keyword}: {e}")
-                    continue
-                    
+            keyword_data_list = list(self.iter_trending_keywords(category, limit, timeframe))
             logger.info(f"取得完了: {len(keyword_data_list)}個のキーワード")
             return keyword_data_list
             
@@ -91,6 +349,113 @@ class KeywordResearcher:
             logger.error(f"トレンドキーワード取得エラー: {e}")
             return []
     
+    def iter_trending_keywords(self,
+                               category: Optional[str] = None,
+                               limit: int = 10,
+                               timeframe: str = 'now 7-d') -> Iterator[KeywordData]:
+        """
+        トレンドキーワードを分析できた順に返す
+        
+        5個ずつのペイロードを分析し終えるたびにそのKeywordDataを返すため、
+        呼び出し側は全キーワードの分析を待たずに記事生成などを始められる。
+        表記ゆれ・ほぼ同じ検索語は分析前に1つにまとめ、残りは related_keywords の先頭に加える。
+        
+        Args:
+            category: カテゴリ指定 (None=全カテゴリ)
+            limit: 取得するキーワード数
+            timeframe: 期間指定
+            
+        Yields:
+            KeywordData
+        """
+        logger.info(f"トレンドキーワード取得開始: limit={limit}, category={category}")
+        
+        # 日本のトレンド検索を取得
+        trending_searches = self._frames([], 'trending', ('trending_searches',))['trending_searches']
+        base_keywords = trending_searches[0].tolist()
+        
+        # 表記ゆれをまとめ、ランキング上位のものを代表にする
+        variants = {}
+        if self.cluster_threshold is not None:
+            clusters = cluster_keywords(base_keywords, self.cluster_threshold)
+            variants = {cluster.representative: cluster.members for cluster in clusters}
+            base_keywords = [cluster.representative for cluster in clusters]
+        base_keywords = base_keywords[:limit]
+        
+        # 1回のリクエストに最大5キーワードをまとめて分析
+        for start in range(0, len(base_keywords), PAYLOAD_MAX_TERMS):
+            batch = base_keywords[start:start + PAYLOAD_MAX_TERMS]
+            try:
+                keyword_data_list = self._analyze_keywords(batch, timeframe)
+            except CircuitOpenError as e:
+                logger.warning(f"キーワード分析を中断しました（{len(base_keywords) - start}個未分析）: {e}")
+                return
+            for keyword_data in keyword_data_list:
+                self._merge_related(keyword_data, variants.get(keyword_data.main_keyword, []))
+                yield keyword_data
+    
+    def cluster_keyword_data(self,
+                             keyword_data_list: List[KeywordData],
+                             threshold: Optional[float] = None) -> List[KeywordData]:
+        """
+        分析済みのキーワードから表記ゆれ・ほぼ同じ検索語をまとめる
+        
+        クラスタごとにトレンドスコアが最も高いものを残し、他のキーワードとその関連キーワードを
+        related_keywords に加える。
+        
+        Args:
+            keyword_data_list: KeywordDataのリスト
+            threshold: 表記ゆれとみなすJaccard係数（Noneで初期化時の値）
+            
+        Returns:
+            代表のKeywordDataのリスト（元の順序）
+        """
+        threshold = threshold if threshold is not None else self.cluster_threshold or DEFAULT_SIMILARITY
+        ranked = sorted(keyword_data_list, key=lambda kd: kd.trend_score, reverse=True)
+        by_keyword = {}
+        for keyword_data in ranked:
+            by_keyword.setdefault(keyword_data.main_keyword, keyword_data)
+        
+        representatives = set()
+        for cluster in cluster_keywords(list(by_keyword), threshold):
+            representative = by_keyword[cluster.representative]
+            for member in cluster.members:
+                self._merge_related(representative, [member] + by_keyword[member].related_keywords)
+            representatives.add(id(representative))
+        
+        return [kd for kd in keyword_data_list if id(kd) in representatives]
+    
+    @staticmethod
+    def _merge_related(keyword_data: KeywordData, keywords: List[str]):
+        """関連キーワードの先頭に追加（重複・メインキーワード自身は除く）"""
+        if not keywords:
+            return
+        merged = list(dict.fromkeys(keywords + keyword_data.related_keywords))
+        keyword_data.related_keywords = [kw for kw in merged if kw != keyword_data.main_keyword]
+    
+    async def aiter_trending_keywords(self,
+                                      category: Optional[str] = None,
+                                      limit: int = 10,
+                                      timeframe: str = 'now 7-d') -> AsyncIterator[KeywordData]:
+        """
+        iter_trending_keywords の非同期版（Google Trendsへのリクエストはスレッドで実行）
+        
+        Args:
+            category: カテゴリ指定 (None=全カテゴリ)
+            limit: 取得するキーワード数
+            timeframe: 期間指定
+            
+        Yields:
+            KeywordData
+        """
+        keywords = self.iter_trending_keywords(category, limit, timeframe)
+        done = object()
+        while True:
+            keyword_data = await asyncio.to_thread(next, keywords, done)
+            if keyword_data is done:
+                return
+            yield keyword_data
+    
     def _analyze_keyword(self, keyword: str, timeframe: str = 'now 7-d') -> Optional[KeywordData]:
         """
         個別キーワードを分析
@@ -102,15 +467,60 @@ class KeywordResearcher:
         Returns:
             KeywordData or None
         """
-        try:
-            # Google Trendsでキーワード分析
-            self.pytrends.build_payload([keyword], 
-                                      cat=0, 
-                                      timeframe=timeframe, 
-                                      geo=self.geo)
+        results = self._analyze_keywords([keyword], timeframe)
+        return results[0] if results else None
+    
+    def _analyze_keywords(self, keywords: List[str], timeframe: str = 'now 7-d') -> List[KeywordData]:
+        """
+        キーワードをまとめて分析（最大5個）
+        
+        期間ごとに1回だけペイロードを作成し、関連キーワード・検索ボリューム・トレンドスコアを
+        共有のDataFrameから求める。
+        
+        Args:
+            keywords: 分析するキーワード（最大5個）
+            timeframe: 関連キーワードの分析期間
             
-            # 関連キーワード取得
-            related_queries = self.pytrends.related_queries()
+        Returns:
+            KeywordDataのリスト（分析できたものだけ）
+        """
+        # 最近取得した検索推移はトレンド履歴から読む（関連キーワードは履歴に無いため取得する）
+        interest = {}
+        for window in dict.fromkeys((timeframe, VOLUME_TIMEFRAME, TREND_TIMEFRAME)):
+            series = self._history_interest(keywords, window)
+            if series is not None:
+                interest[window] = series
+        
+        try:
+            # 分析期間: 関連キーワード（＋同じ期間の推移）
+            kinds = ('related_queries',) if timeframe in interest else ('related_queries', 'interest_over_time')
+            frames = self._frames(keywords, timeframe, kinds)
+            related_queries = frames['related_queries']
+            if timeframe not in interest:
+                interest[timeframe] = self._normalize_interest(frames['interest_over_time'], keywords,
+                                                               rescale=timeframe != VOLUME_TIMEFRAME)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.warning(f"キーワード分析エラー {', '.join(keywords)}: {e}")
+            return []
+        
+        # 検索ボリューム（過去3ヶ月）・トレンドスコア（過去1週間）の推移
+        for window in (VOLUME_TIMEFRAME, TREND_TIMEFRAME):
+            if window in interest:
+                continue
+            try:
+                frames = self._frames(keywords, window, ('interest_over_time',))
+                interest[window] = self._normalize_interest(frames['interest_over_time'], keywords,
+                                                            rescale=window != VOLUME_TIMEFRAME)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                logger.warning(f"検索推移の取得エラー {', '.join(keywords)} ({window}): {e}")
+                interest[window] = {}
+        
+        keyword_data_list = []
+        for keyword in keywords:
             related_keywords = []
             rising_keywords = []
             
@@ -123,56 +533,227 @@ class KeywordResearcher:
                 if related_queries[keyword]['rising'] is not None:
                     rising_keywords = related_queries[keyword]['rising']['query'].tolist()[:5]
             
-            # 検索ボリューム推定
-            search_volume = self._estimate_search_volume(keyword)
-            
-            # 競合性推定
-            competition = self._estimate_competition(keyword, related_keywords)
-            
-            # トレンドスコア計算
-            trend_score = self._calculate_trend_score(keyword)
-            
-            return KeywordData(
+            keyword_data_list.append(KeywordData(
                 main_keyword=keyword,
-                search_volume=search_volume,
-                competition=competition,
+                search_volume=self._estimate_search_volume(keyword, interest[VOLUME_TIMEFRAME].get(keyword)),
+                competition=self._estimate_competition(keyword, related_keywords),
                 related_keywords=related_keywords,
                 rising_keywords=rising_keywords,
-                trend_score=trend_score,
+                trend_score=self._calculate_trend_score(keyword, interest[TREND_TIMEFRAME].get(keyword)),
                 category="general",
                 collected_at=datetime.now().isoformat()
-            )
+            ))
+        
+        return keyword_data_list
+    
+    def _history_interest(self, keywords: List[str], timeframe: str) -> Optional[Dict[str, pd.Series]]:
+        """
+        全キーワードの検索推移が同じ期間指定でhistory_max_age秒以内に取得済みなら、履歴から返す
+        
+        Returns:
+            {キーワード: 検索推移のSeries}（履歴が使えなければNone）
+        """
+        if self.history is None or not self.history_max_age or timeframe not in TIMEFRAME_DAYS:
+            return None
+        
+        try:
+            now = datetime.now()
+            start = now - timedelta(days=TIMEFRAME_DAYS[timeframe])
+            latest = self.history.latest_fetch(keywords, since=start, timeframe=timeframe)
+            fresh = latest[latest >= pd.Timestamp(now - timedelta(seconds=self.history_max_age))]
+            if any(keyword not in fresh.index for keyword in keywords):
+                return None
+            frame = self.history.interest(keywords, start=start, end=now, geo=self.geo, timeframe=timeframe)
+        except Exception as e:
+            logger.warning(f"トレンド履歴の読み込みエラー: {e}")
+            return None
+        
+        self.history_hits += 1
+        return self._normalize_interest(frame, keywords, rescale=timeframe != VOLUME_TIMEFRAME)
+    
+    def _frames(self, keywords: List[str], timeframe: str, kinds: Tuple[str, ...]) -> Dict[str, Any]:
+        """
+        Google Trendsの応答を取得（キャッシュ優先）
+        
+        キャッシュに無い種類だけを1回のペイロードでまとめて取得する。
+        TTL切れの値は返したうえで裏で再取得する。
+        
+        Args:
+            keywords: キーワード（trending_searchesでは空）
+            timeframe: 期間指定（trending_searchesでは 'trending'）
+            kinds: trending_searches, related_queries, interest_over_time
             
+        Returns:
+            {種類: 応答}
+        """
+        if self.cache is None:
+            return self._fetch_frames(self.pytrends, keywords, timeframe, kinds)
+        
+        frames = {}
+        stale = False
+        for kind in kinds:
+            value, state = self.cache.get(self._cache_key(kind, keywords, timeframe))
+            if state != 'miss':
+                frames[kind] = value
+                stale = stale or state == 'stale'
+        
+        missing = tuple(kind for kind in kinds if kind not in frames)
+        if missing:
+            frames.update(self._fetch_and_store(self.pytrends, keywords, timeframe, missing))
+        elif stale:
+            self.cache.refresh_in_background(
+                self._cache_key(",".join(kinds), keywords, timeframe),
+                lambda: self._fetch_and_store(TrendReq(hl=self.hl, tz=self.tz), keywords, timeframe, kinds)
+            )
+        return frames
+    
+    def _cache_key(self, kind: str, keywords: List[str], timeframe: str) -> str:
+        return self.cache.make_key(kind, keywords, timeframe, self.geo, self.hl)
+    
+    def _fetch_and_store(self, client: TrendReq, keywords: List[str], timeframe: str,
+                         kinds: Tuple[str, ...]) -> Dict[str, Any]:
+        """取得してキャッシュに保存"""
+        frames = self._fetch_frames(client, keywords, timeframe, kinds)
+        for kind, value in frames.items():
+            self.cache.set(self._cache_key(kind, keywords, timeframe), kind, timeframe, value)
+        return frames
+    
+    def _fetch_frames(self, client: TrendReq, keywords: List[str], timeframe: str,
+                      kinds: Tuple[str, ...]) -> Dict[str, Any]:
+        """
+        Google Trendsから取得（レート制御・サーキットブレーカー付き）
+        
+        429・タイムアウトを受けたらレートを下げて再試行し、続くようならサーキットを開いて
+        しばらく取得を止める（CircuitOpenErrorを送出）。
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            if not self.circuit_breaker.allow():
+                raise CircuitOpenError(
+                    f"Google Trendsへのリクエストを停止中です（再開まで{self.circuit_breaker.retry_after():.0f}秒）"
+                )
+            self.rate_limiter.acquire()
+            try:
+                frames = self._request_frames(client, keywords, timeframe, kinds)
+            except Exception as e:
+                if not self._is_throttled(e):
+                    # Google Trends自体は応答しているため、サーキットの失敗としては数えない
+                    self.circuit_breaker.record_success()
+                    raise
+                retry_after = self._retry_after(e)
+                if retry_after is not None:
+                    retry_after = min(retry_after, self.circuit_breaker.reset_timeout)
+                self.rate_limiter.record_throttle(retry_after)
+                self.circuit_breaker.record_failure()
+                if attempt == self.max_attempts:
+                    raise
+                logger.warning(f"Google Trendsのスロットリング・タイムアウト（{attempt}/{self.max_attempts}回目）: {e}")
+            else:
+                self.rate_limiter.record_success()
+                self.circuit_breaker.record_success()
+                self._record_history(timeframe, frames)
+                return frames
+    
+    def _request_frames(self, client: TrendReq, keywords: List[str], timeframe: str,
+                        kinds: Tuple[str, ...]) -> Dict[str, Any]:
+        """1回のペイロードで必要な種類をまとめて取得"""
+        if kinds == ('trending_searches',):
+            return {'trending_searches': client.trending_searches(pn=self.geo.lower())}
+        
+        client.build_payload(keywords, cat=0, timeframe=timeframe, geo=self.geo)
+        return {kind: getattr(client, kind)() for kind in kinds}
+    
+    def _record_history(self, timeframe: str, frames: Dict[str, Any]):
+        """取得した検索推移をトレンド履歴に追加"""
+        if self.history is None or frames.get('interest_over_time') is None:
+            return
+        try:
+            self.history.append_interest(frames['interest_over_time'], timeframe, self.geo)
         except Exception as e:
-            logger.error(f"キーワード分析エラー {keyword}: {e}")
+            logger.warning(f"トレンド履歴の保存エラー: {e}")
+    
+    @staticmethod
+    def _is_throttled(error: Exception) -> bool:
+        """429・タイムアウト・接続エラーなど、リクエストを控えるべき失敗か"""
+        # pytrendsのResponseErrorは応答を .response に持つ
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+        if status is not None:
+            return status == 429 or status >= 500
+        return type(error).__name__ == 'TooManyRequestsError' or is_retryable_error(error)
+    
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """応答のRetry-Afterヘッダー（秒）"""
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        try:
+            return float(headers.get('Retry-After'))
+        except (TypeError, ValueError):
             return None
     
-    def _estimate_search_volume(self, keyword: str) -> str:
+    def metrics(self) -> Dict:
+        """
+        Google Trendsへのリクエストの統計
+        
+        Returns:
+            レート制御（requests・throttles・rate等）・サーキットブレーカー（opened・open_seconds等）・キャッシュの統計、
+            トレンド履歴から読んだ検索推移の数
+        """
+        return {
+            'rate_limiter': self.rate_limiter.stats(),
+            'circuit_breaker': self.circuit_breaker.stats(),
+            'cache': self.cache.stats() if self.cache else None,
+            'history_hits': self.history_hits
+        }
+    
+    def _normalize_interest(self, interest_over_time: pd.DataFrame, keywords: List[str],
+                            rescale: bool = True) -> Dict[str, pd.Series]:
+        """
+        検索推移をキーワードごとに取り出す
+        
+        複数キーワードのペイロードでは全体の最大値が100になるため、トレンドの計算用には
+        キーワードごとに自身の最大値が100になるよう換算する（単独で取得した場合と同じ尺度）。
+        検索ボリュームの判定には、同じペイロード内で比較できる換算前の値を使う（rescale=False）。
+        換算すると全キーワードの最大値が100になり、全て 'high' と判定されてしまう。
+        
+        Args:
+            interest_over_time: interest_over_time
+            keywords: キーワード
+            rescale: キーワードごとに最大値100に換算するか
+        
+        Returns:
+            {キーワード: 検索推移のSeries}（データが無いキーワードは含まない）
+        """
+        series = {}
+        if interest_over_time.empty:
+            return series
+        
+        for keyword in keywords:
+            if keyword not in interest_over_time:
+                continue
+            values = interest_over_time[keyword].astype(float)
+            peak = values.max()
+            series[keyword] = values * (100.0 / peak) if rescale and peak > 0 else values
+        return series
+    
+    def _estimate_search_volume(self, keyword: str, interest: Optional[pd.Series]) -> str:
         """
         検索ボリュームを推定
         
         Args:
             keyword: キーワード
+            interest: 過去3ヶ月の検索推移（ペイロード内の換算前の値、取得できなかった場合はNone）
             
         Returns:
             'high', 'medium', 'low', 'unknown'
         """
         try:
-            # 過去3ヶ月の検索トレンド取得
-            self.pytrends.build_payload([keyword], 
-                                      timeframe='today 3-m', 
-                                      geo=self.geo)
-            
-            interest_over_time = self.pytrends.interest_over_time()
-            
-            if not interest_over_time.empty:
-                avg_interest = interest_over_time[keyword].mean()
-                max_interest = interest_over_time[keyword].max()
+            if interest is not None and not interest.empty:
+                avg_interest = interest.mean()
+                max_interest = interest.max()
                 
                 # 判定基準
-                if avg_interest > 60 or max_interest > 80:
+                if avg_interest > VOLUME_HIGH_AVG or max_interest > VOLUME_HIGH_PEAK:
                     return "high"
-                elif avg_interest > 25 or max_interest > 50:
+                elif avg_interest > VOLUME_MEDIUM_AVG or max_interest > VOLUME_MEDIUM_PEAK:
                     return "medium"
                 else:
                     return "low"
@@ -202,9 +783,9 @@ class KeywordResearcher:
             word_count = len(keyword.split())
             
             # 判定ロジック
-            if related_count > 15 and word_count <= 2:
+            if related_count > COMPETITION_HIGH_RELATED and word_count <= COMPETITION_SHORT_WORDS:
                 return "high"
-            elif related_count > 8 or word_count <= 2:
+            elif related_count > COMPETITION_MEDIUM_RELATED or word_count <= COMPETITION_SHORT_WORDS:
                 return "medium"
             else:
                 return "low"
@@ -213,33 +794,27 @@ class KeywordResearcher:
             logger.warning(f"競合性推定エラー {keyword}: {e}")
             return "unknown"
     
-    def _calculate_trend_score(self, keyword: str) -> float:
+    def _calculate_trend_score(self, keyword: str, interest: Optional[pd.Series]) -> float:
         """
         トレンドスコアを計算
         
         Args:
             keyword: キーワード
+            interest: 過去1週間の検索推移（取得できなかった場合はNone）
             
         Returns:
             0-100のトレンドスコア
         """
         try:
-            # 過去1週間の検索トレンド
-            self.pytrends.build_payload([keyword], 
-                                      timeframe='now 7-d', 
-                                      geo=self.geo)
-            
-            interest_over_time = self.pytrends.interest_over_time()
-            
-            if not interest_over_time.empty:
-                values = interest_over_time[keyword].values
+            if interest is not None and not interest.empty:
+                values = interest.values
                 if len(values) > 1:
                     # 直近の上昇傾向を評価
                     recent_trend = (values[-1] - values[0]) / max(values[0], 1)
-                    base_score = interest_over_time[keyword].mean()
+                    base_score = interest.mean()
                     
                     # トレンドスコア = ベーススコア + 上昇傾向ボーナス
-                    trend_score = min(100, base_score + (recent_trend * 50))
+                    trend_score = min(100, base_score + (recent_trend * TREND_BONUS_WEIGHT))
                     return max(0, trend_score)
             
             return 0.0
@@ -248,6 +823,119 @@ class KeywordResearcher:
             logger.warning(f"トレンドスコア計算エラー {keyword}: {e}")
             return 0.0
     
+    def score_candidates(self,
+                         keywords: List[str],
+                         volume_timeframe: str = VOLUME_TIMEFRAME,
+                         trend_timeframe: str = TREND_TIMEFRAME,
+                         history_max_age: Optional[float] = None) -> pd.DataFrame:
+        """
+        多数の候補キーワードをまとめてスコアリング
+        
+        5個ずつのペイロードで取得した検索推移を1つの横長DataFrameに連結し、
+        keyword_scoring.score_keywords で全キーワードを一度に評価する（関連キーワードは取得しないため
+        競合性は 'unknown'）。トレンド履歴がある場合は、期間指定ごとにhistory_max_age秒以内に取得済みの
+        キーワードはGoogle Trendsに問い合わせず、履歴からまとめてスコアリングする。
+        
+        Args:
+            keywords: 候補キーワード
+            volume_timeframe: 検索ボリュームの算出に使う期間
+            trend_timeframe: トレンドスコアの算出に使う期間
+            history_max_age: 履歴をそのまま使う最終取得からの秒数（Noneで初期化時の値）
+            
+        Returns:
+            キーワードをindexとするスコアのDataFrame（trend_scoreの降順、取得できなかったキーワードは含まない）
+        """
+        keywords = list(dict.fromkeys(keywords))
+        history_max_age = self.history_max_age if history_max_age is None else history_max_age
+        
+        if self.history is not None:
+            now = datetime.now()
+            # 鮮度は期間指定ごとに確認し、足りない期間指定だけを取得する
+            for window in dict.fromkeys((volume_timeframe, trend_timeframe)):
+                latest = self.history.latest_fetch(keywords, since=now - timedelta(days=TIMEFRAME_DAYS[window]),
+                                                   timeframe=window)
+                fresh = set(latest[latest >= pd.Timestamp(now - timedelta(seconds=history_max_age))].index)
+                missing = [keyword for keyword in keywords if keyword not in fresh]
+                logger.info(f"候補キーワード（{window}）: 履歴から{len(keywords) - len(missing)}個, "
+                            f"Google Trendsから{len(missing)}個")
+                self._fetch_interest(missing, (window,))
+            return self.history.score(
+                keywords,
+                volume_days=TIMEFRAME_DAYS[volume_timeframe],
+                trend_days=TIMEFRAME_DAYS[trend_timeframe],
+                geo=self.geo,
+                volume_timeframe=volume_timeframe,
+                trend_timeframe=trend_timeframe
+            )
+        
+        frames = self._fetch_interest(keywords, (volume_timeframe, trend_timeframe))
+        if not frames[volume_timeframe]:
+            return score_keywords(pd.DataFrame())
+        
+        # 各ペイロードのisPartial列は score_keywords で除外される
+        volume = pd.concat(frames[volume_timeframe], axis=1)
+        trend = pd.concat(frames[trend_timeframe], axis=1) if frames[trend_timeframe] else pd.DataFrame()
+        return score_keywords(volume, trend)
+    
+    def research_candidates(self, keywords: List[str], limit: Optional[int] = None) -> List[KeywordData]:
+        """
+        候補キーワードをscore_candidatesでスコアリングし、KeywordDataとして返す
+        
+        関連キーワードは取得しないため、related_keywords・rising_keywordsは空、競合性は 'unknown'。
+        
+        Args:
+            keywords: 候補キーワード
+            limit: 返す最大件数（Noneで全件）
+            
+        Returns:
+            KeywordDataのリスト（trend_scoreの降順）
+        """
+        scores = self.score_candidates(keywords)
+        if limit is not None:
+            scores = scores.head(limit)
+        
+        collected_at = datetime.now().isoformat()
+        return [
+            KeywordData(
+                main_keyword=keyword,
+                search_volume=row['search_volume'],
+                competition=row['competition'],
+                related_keywords=[],
+                rising_keywords=[],
+                trend_score=float(row['trend_score']),
+                category="general",
+                collected_at=collected_at
+            )
+            for keyword, row in scores.iterrows()
+        ]
+    
+    def _fetch_interest(self, keywords: List[str], timeframes: Tuple[str, ...]) -> Dict[str, List[pd.DataFrame]]:
+        """
+        検索推移を5個ずつのペイロードで取得
+        
+        Returns:
+            {期間: 取得できたinterest_over_timeのリスト}
+        """
+        frames = {timeframe: [] for timeframe in timeframes}
+        
+        try:
+            for start in range(0, len(keywords), PAYLOAD_MAX_TERMS):
+                batch = keywords[start:start + PAYLOAD_MAX_TERMS]
+                for window in frames:
+                    try:
+                        interest = self._frames(batch, window, ('interest_over_time',))['interest_over_time']
+                    except CircuitOpenError:
+                        raise
+                    except Exception as e:
+                        logger.warning(f"検索推移の取得エラー {', '.join(batch)} ({window}): {e}")
+                        continue
+                    if not interest.empty:
+                        frames[window].append(interest)
+        except CircuitOpenError as e:
+            logger.warning(f"候補キーワードの取得を中断しました（{len(keywords) - start}個未取得）: {e}")
+        
+        return frames
+    
     def get_category_trends(self, category_id: int, limit: int = 20) -> List[KeywordData]:
         """
         特定カテゴリのトレンドキーワードを取得
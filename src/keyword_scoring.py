@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+キーワードスコアリングモジュール
+多数のキーワードの検索推移（interest_over_timeの横長DataFrame）から、
+検索ボリューム区分・トレンドの傾き・トレンドスコア・競合性を列単位でまとめて計算する
+"""
+
+import logging
+from typing import Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 検索ボリュームの判定基準（平均値・最大値、0-100）
+VOLUME_HIGH_AVG = 60
+VOLUME_HIGH_PEAK = 80
+VOLUME_MEDIUM_AVG = 25
+VOLUME_MEDIUM_PEAK = 50
+
+# トレンドスコア = 平均値 + 上昇率 × TREND_BONUS_WEIGHT（0-100に丸める）
+TREND_BONUS_WEIGHT = 50
+
+# 競合性の判定基準（関連キーワード数・語数）
+COMPETITION_HIGH_RELATED = 15
+COMPETITION_MEDIUM_RELATED = 8
+COMPETITION_SHORT_WORDS = 2
+
+# pytrendsのinterest_over_timeに付く、キーワード以外の列
+NON_KEYWORD_COLUMNS = ("isPartial",)
+
+SCORE_COLUMNS = [
+    "search_volume", "competition", "trend_score", "trend_slope",
+    "recent_trend", "avg_interest", "peak_interest", "word_count"
+]
+
+def interest_matrix(interest_over_time: pd.DataFrame, normalize: bool = True) -> pd.DataFrame:
+    """
+    interest_over_timeからキーワードの列だけを取り出して数値化
+
+    Args:
+        interest_over_time: 検索推移（行: 日時、列: キーワード）
+        normalize: キーワードごとに自身の最大値が100になるよう換算するか
+            （複数ペイロードを連結した場合や、5個単位のペイロードで尺度を揃えるため）
+
+    Returns:
+        行: 日時、列: キーワードのfloatのDataFrame
+    """
+    columns = [column for column in interest_over_time.columns if column not in NON_KEYWORD_COLUMNS]
+    frame = interest_over_time[columns]
+    numeric = frame.dtypes.map(pd.api.types.is_numeric_dtype)
+    if not numeric.all():
+        # 数値以外の列だけを変換（列ごとのapplyは数千列で遅いため）
+        frame = frame.copy()
+        for index in np.flatnonzero(~numeric.to_numpy()):
+            frame.isetitem(index, pd.to_numeric(frame.iloc[:, index], errors="coerce"))
+    frame = frame.astype(float)
+    if normalize and not frame.empty:
+        peak = frame.max()
+        frame = frame.div(peak.where(peak > 0, 100.0)) * 100.0
+    return frame
+
+def score_keywords(interest_over_time: pd.DataFrame,
+                   trend_interest: Optional[pd.DataFrame] = None,
+                   related_counts: Optional[Mapping[str, int]] = None,
+                   normalize: bool = True) -> pd.DataFrame:
+    """
+    キーワードをまとめてスコアリング
+
+    KeywordResearcherの _estimate_search_volume・_calculate_trend_score・_estimate_competition と
+    同じ基準を、全キーワードの列に対してNumPyで一度に計算する。
+
+    Args:
+        interest_over_time: 検索ボリュームの算出に使う検索推移（行: 日時、列: キーワード）
+        trend_interest: トレンドスコアの算出に使う検索推移（Noneで interest_over_time を使用）
+        related_counts: {キーワード: 関連キーワード数}（Noneなら競合性は 'unknown'）
+        normalize: トレンドの計算用に、キーワードごとに自身の最大値が100になるよう換算するか
+            （検索ボリュームは常に換算前の値で判定する）
+
+    Returns:
+        キーワードをindexとし、search_volume・competition・trend_score・trend_slope・recent_trend・
+        avg_interest・peak_interest・word_count を列に持つDataFrame（trend_scoreの降順）
+    """
+    # 検索ボリュームはペイロード内で比較できる換算前の値で判定する
+    # （キーワードごとに最大値100へ換算すると、データのある全キーワードが 'high' になる）
+    volume = interest_matrix(interest_over_time, normalize=False)
+    keywords = volume.columns
+    trend = interest_matrix(interest_over_time if trend_interest is None else trend_interest,
+                            normalize).reindex(columns=keywords)
+
+    scores = pd.DataFrame(index=pd.Index(keywords, name="keyword"))
+
+    # 検索ボリューム: 平均値・最大値による区分（データが無ければ unknown）
+    with np.errstate(all="ignore"):
+        values = volume.to_numpy()
+        counts = np.sum(~np.isnan(values), axis=0)
+        avg = np.nanmean(values, axis=0) if len(values) else np.full(len(keywords), np.nan)
+        peak = np.nanmax(values, axis=0) if len(values) else np.full(len(keywords), np.nan)
+    scores["avg_interest"] = avg
+    scores["peak_interest"] = peak
+    scores["search_volume"] = np.select(
+        [
+            counts == 0,
+            (avg > VOLUME_HIGH_AVG) | (peak > VOLUME_HIGH_PEAK),
+            (avg > VOLUME_MEDIUM_AVG) | (peak > VOLUME_MEDIUM_PEAK)
+        ],
+        ["unknown", "high", "medium"],
+        default="low"
+    )
+
+    # トレンド: 最初と最後の比較による上昇率と、最小二乗法による1期間あたりの傾き
+    scores["trend_slope"], scores["recent_trend"], scores["trend_score"] = _trend_scores(trend.to_numpy())
+
+    # 競合性: 関連キーワード数と語数（ロングテール指標）
+    word_count = np.array([len(str(keyword).split()) for keyword in keywords], dtype=int)
+    scores["word_count"] = word_count
+    if related_counts is None:
+        scores["competition"] = "unknown"
+    else:
+        related = pd.Series(related_counts, dtype=float).reindex(keywords).fillna(0).to_numpy()
+        short = word_count <= COMPETITION_SHORT_WORDS
+        scores["competition"] = np.select(
+            [
+                (related > COMPETITION_HIGH_RELATED) & short,
+                (related > COMPETITION_MEDIUM_RELATED) | short
+            ],
+            ["high", "medium"],
+            default="low"
+        )
+
+    return scores[SCORE_COLUMNS].sort_values("trend_score", ascending=False, kind="stable")
+
+def _trend_scores(values: np.ndarray):
+    """
+    列ごとのトレンド指標
+
+    Args:
+        values: 行: 時点、列: キーワードの配列（欠損はNaN）
+
+    Returns:
+        (傾き, 上昇率, トレンドスコア) の配列
+    """
+    rows, columns = values.shape
+    if rows < 2:
+        zeros = np.zeros(columns)
+        return np.full(columns, np.nan), zeros, zeros
+
+    # 欠損は前後の値で埋める（全て欠損の列は0）
+    filled = pd.DataFrame(values).ffill().bfill().fillna(0.0).to_numpy()
+    first = filled[0]
+    last = filled[-1]
+    recent_trend = (last - first) / np.maximum(first, 1)
+
+    x = np.arange(rows, dtype=float)
+    x -= x.mean()
+    mean = filled.mean(axis=0)
+    slope = x @ (filled - mean) / (x @ x)
+
+    trend_score = np.clip(mean + recent_trend * TREND_BONUS_WEIGHT, 0, 100)
+    return slope, recent_trend, trend_score
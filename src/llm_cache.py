@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+LLMレスポンスキャッシュモジュール
+(モデル, temperature, max_tokens, プロンプト) のハッシュをキーに、生成結果をSQLiteに保存する
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class _InFlightCall:
+    """実行中の上流呼び出し（シングルフライト用）"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[str] = None
+
+class LLMResponseCache:
+    """コンテンツアドレス型のLLMレスポンスキャッシュ
+
+    - SQLiteに永続化し、TTL切れと最終アクセス順(LRU)で削除する
+    - 同じキーの同時リクエストは1回の上流呼び出しにまとめる（シングルフライト）
+    - bypass=True の場合はキャッシュを読まずに上流を呼び、結果で上書きする
+    """
+
+    def __init__(self,
+                 db_path: str = "data/llm_cache.db",
+                 ttl_seconds: float = 7 * 24 * 3600,
+                 max_entries: int = 5000,
+                 bypass: bool = False):
+        """
+        初期化
+
+        Args:
+            db_path: SQLiteファイルのパス
+            ttl_seconds: エントリの有効期間（秒）
+            max_entries: 保持する最大エントリ数
+            bypass: キャッシュ参照をスキップするか
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.bypass = bypass
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, _InFlightCall] = {}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_accessed ON responses(last_accessed)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, temperature: float, max_tokens: int, prompt: str,
+                 target_chars: Optional[int] = None) -> str:
+        """
+        キャッシュキーを作成
+
+        Args:
+            model: モデル名
+            temperature: 生成温度
+            max_tokens: 最大トークン数
+            prompt: プロンプト
+            target_chars: 出力させたい文字数（指定時のみキーに含める）
+
+        Returns:
+            SHA-256ハッシュ文字列
+        """
+        parts = [model, temperature, max_tokens, prompt]
+        if target_chars is not None:
+            parts.append(target_chars)
+        payload = json.dumps(parts, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        キャッシュからレスポンスを取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            レスポンス文字列 or None
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            response, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.evictions += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_accessed = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            return response
+
+    def set(self, key: str, response: str, model: str = ""):
+        """
+        レスポンスを保存
+
+        Args:
+            key: キャッシュキー
+            response: レスポンス文字列
+            model: モデル名（統計用）
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def get_or_compute(self,
+                       key: str,
+                       compute: Callable[[], Optional[str]],
+                       model: str = "",
+                       bypass: Optional[bool] = None,
+                       cacheable: Optional[Callable[[str], bool]] = None) -> Optional[str]:
+        """
+        キャッシュを参照し、無ければ上流を呼び出して保存
+
+        同じキーで実行中の呼び出しがあれば、その結果を待って共有する。
+        Noneの結果（失敗）と、cacheableがFalseを返した結果はキャッシュしない。
+
+        Args:
+            key: キャッシュキー
+            compute: 上流呼び出し関数
+            model: モデル名（統計用）
+            bypass: この呼び出しだけバイパス指定を上書き
+            cacheable: 結果を保存してよいかの判定（Noneで常に保存）
+
+        Returns:
+            レスポンス文字列 or None
+        """
+        bypass = self.bypass if bypass is None else bypass
+
+        if not bypass:
+            cached = self.get(key)
+            if cached is not None:
+                with self._lock:
+                    self.hits += 1
+                return cached
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InFlightCall()
+                self._inflight[key] = call
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            return call.result
+
+        try:
+            # 直前に別の呼び出しが完了して保存済みの場合はそれを使う
+            cached = None if bypass else self.get(key)
+            if cached is not None:
+                call.result = cached
+                return cached
+
+            call.result = compute()
+            if call.result is not None and (cacheable is None or cacheable(call.result)):
+                self.set(key, call.result, model)
+            return call.result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+    def _evict(self, now: float):
+        """TTL切れ・上限超過のエントリを削除（ロック取得済みで呼ぶ）"""
+        cursor = self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+        evicted = max(cursor.rowcount, 0)
+
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_accessed ASC LIMIT ?)",
+                (overflow,)
+            )
+            evicted += max(cursor.rowcount, 0)
+
+        if evicted:
+            self.evictions += evicted
+            logger.debug(f"LLMキャッシュ削除: {evicted}件")
+
+    def stats(self) -> Dict:
+        """
+        キャッシュ統計を取得
+
+        Returns:
+            ヒット数・ミス数などの辞書
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'evictions': self.evictions,
+                'entries': entries,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def clear(self):
+        """全エントリを削除"""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
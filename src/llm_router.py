@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+LLMプロバイダールーターモジュール
+OpenAI・Anthropic・Ollamaを束ね、プロバイダーごとのレート制限とAIMD同時実行制御を行い、
+混雑・障害時には別プロバイダーへ自動でフェイルオーバーする
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import openai
+import anthropic
+import requests
+
+from prompt_templates import anthropic_content
+from rate_limit import TokenBucket, AIMDConcurrencyLimiter
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "あなたはSEOに精通したプロのライターです。"
+
+@dataclass
+class LLMCompletion:
+    """LLMの生成結果"""
+    text: str
+    provider: str
+    model: str
+    finish_reason: str = "stop"  # stop, length
+    output_tokens: Optional[int] = None
+    latency: float = 0.0
+
+class RateLimitError(Exception):
+    """プロバイダーが429等で処理を拒否した"""
+
+class LLMProvider:
+    """LLMプロバイダーの基底クラス"""
+
+    name = "base"
+    model_prefixes: tuple = ()
+
+    def __init__(self,
+                 model: str,
+                 requests_per_minute: float = 60,
+                 max_concurrency: int = 8,
+                 latency_target: Optional[float] = None,
+                 token_latency_target: Optional[float] = None):
+        """
+        初期化
+
+        記事全体の生成は1回で数十秒〜数分かかり、応答時間は出力トークン数にほぼ比例するため、
+        混雑の判定には出力1トークンあたりの秒数（token_latency_target）を使う。
+
+        Args:
+            model: このプロバイダーで使用するモデル名
+            requests_per_minute: 1分あたりのリクエスト上限
+            max_concurrency: 同時実行数の上限
+            latency_target: 1リクエストの応答がこの秒数を超えたら混雑とみなす（token_latency_target優先）
+            token_latency_target: 出力1トークンあたりの応答時間がこの秒数を超えたら混雑とみなす
+        """
+        self.model = model
+        self.token_latency_target = token_latency_target
+        self.bucket = TokenBucket(rate=requests_per_minute / 60.0,
+                                  capacity=max(1.0, min(max_concurrency, requests_per_minute / 60.0 * 10)))
+        self.limiter = AIMDConcurrencyLimiter(
+            initial_limit=max(1, max_concurrency // 2),
+            max_limit=max_concurrency,
+            latency_target=token_latency_target if token_latency_target is not None else latency_target
+        )
+
+        self.requests = 0
+        self.failures = 0
+        self.throttled = 0
+
+    def handles(self, model: str) -> bool:
+        """モデル名がこのプロバイダーのものか"""
+        return model == self.model or model.startswith(self.model_prefixes)
+
+    def try_acquire(self) -> bool:
+        """
+        実行枠とレートトークンを取得（待機しない）
+
+        Returns:
+            取得できたか
+        """
+        if not self.limiter.try_acquire():
+            return False
+        if not self.bucket.try_acquire():
+            self.limiter.release(failed=True)
+            return False
+        return True
+
+    def complete(self, prompt: str, temperature: float, max_tokens: int,
+                 model: Optional[str] = None, timeout: Optional[float] = None) -> LLMCompletion:
+        """
+        生成を実行（try_acquire()で枠を取得済みであること）
+
+        Args:
+            prompt: プロンプト
+            temperature: 生成温度
+            max_tokens: 最大トークン数
+            model: モデル名の上書き（Noneで既定モデル）
+            timeout: 1回のリクエストのタイムアウト秒数（Noneでプロバイダーの既定値）
+
+        Returns:
+            LLMCompletion
+
+        Raises:
+            RateLimitError: 429等で拒否された場合
+            Exception: その他のAPIエラー
+        """
+        self.requests += 1
+        start = time.time()
+        try:
+            completion = self._complete(prompt, temperature, max_tokens, model or self.model, timeout)
+        except RateLimitError:
+            self.throttled += 1
+            self.limiter.release(latency=time.time() - start, throttled=True)
+            raise
+        except Exception:
+            self.failures += 1
+            self.limiter.release(latency=time.time() - start, failed=True)
+            raise
+
+        completion.latency = time.time() - start
+        self.limiter.release(latency=self._congestion_latency(completion))
+        return completion
+
+    def _congestion_latency(self, completion: LLMCompletion) -> Optional[float]:
+        """混雑の判定に使う応答時間（token_latency_target指定時は出力1トークンあたり、トークン数不明ならNone）"""
+        if self.token_latency_target is None:
+            return completion.latency
+        if not completion.output_tokens:
+            return None
+        return completion.latency / completion.output_tokens
+
+    def _complete(self, prompt: str, temperature: float, max_tokens: int, model: str,
+                  timeout: Optional[float] = None) -> LLMCompletion:
+        """プロバイダー固有のAPI呼び出し"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        """プロバイダーの統計"""
+        return {
+            'model': self.model,
+            'requests': self.requests,
+            'failures': self.failures,
+            'throttled': self.throttled,
+            'concurrency_limit': round(self.limiter.limit, 2),
+            'in_flight': self.limiter.in_flight
+        }
+
+class OpenAIProvider(LLMProvider):
+    """OpenAI Chat Completions API"""
+
+    name = "openai"
+    model_prefixes = ("gpt",)
+
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4",
+                 base_url: Optional[str] = None, **kwargs):
+        super().__init__(model, **kwargs)
+        self.api_key = api_key
+        self.base_url = base_url
+
+    def _complete(self, prompt: str, temperature: float, max_tokens: int, model: str,
+                  timeout: Optional[float] = None) -> LLMCompletion:
+        try:
+            response = openai.ChatCompletion.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=temperature,
+                max_tokens=max_tokens,
+                api_key=self.api_key,
+                api_base=self.base_url,
+                request_timeout=timeout
+            )
+        except Exception as e:
+            if _is_rate_limit_error(e):
+                raise RateLimitError(str(e)) from e
+            raise
+
+        choice = response.choices[0]
+        usage = getattr(response, 'usage', None)
+        return LLMCompletion(
+            text=choice.message.content,
+            provider=self.name,
+            model=model,
+            finish_reason=choice.finish_reason or "stop",
+            output_tokens=getattr(usage, 'completion_tokens', None)
+        )
+
+class AnthropicProvider(LLMProvider):
+    """Anthropic Messages API"""
+
+    name = "anthropic"
+    model_prefixes = ("claude",)
+
+    def __init__(self, api_key: str, model: str = "claude-3-sonnet-20240229",
+                 base_url: Optional[str] = None, **kwargs):
+        super().__init__(model, **kwargs)
+        self.client = anthropic.Anthropic(api_key=api_key, base_url=base_url)
+
+    def _complete(self, prompt: str, temperature: float, max_tokens: int, model: str,
+                  timeout: Optional[float] = None) -> LLMCompletion:
+        try:
+            message = self.client.messages.create(
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                messages=[{
+                    "role": "user",
+                    "content": anthropic_content(prompt)
+                }],
+                timeout=timeout
+            )
+        except Exception as e:
+            if _is_rate_limit_error(e):
+                raise RateLimitError(str(e)) from e
+            raise
+
+        return LLMCompletion(
+            text=message.content[0].text,
+            provider=self.name,
+            model=model,
+            finish_reason="length" if message.stop_reason == "max_tokens" else "stop",
+            output_tokens=message.usage.output_tokens
+        )
+
+class OllamaProvider(LLMProvider):
+    """ローカルOllama /api/generate"""
+
+    name = "ollama"
+
+    def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.2",
+                 timeout: float = 600, **kwargs):
+        kwargs.setdefault('requests_per_minute', 600)
+        kwargs.setdefault('max_concurrency', 2)
+        super().__init__(model, **kwargs)
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def _complete(self, prompt: str, temperature: float, max_tokens: int, model: str,
+                  timeout: Optional[float] = None) -> LLMCompletion:
+        response = requests.post(
+            f"{self.base_url}/api/generate",
+            json={
+                "model": model,
+                "prompt": prompt,
+                "system": SYSTEM_PROMPT,
+                "stream": False,
+                "options": {
+                    "temperature": temperature,
+                    "num_predict": max_tokens
+                }
+            },
+            timeout=timeout if timeout is not None else self.timeout
+        )
+
+        if response.status_code in (429, 503):
+            raise RateLimitError(f"Ollama API Error: {response.status_code}")
+        response.raise_for_status()
+
+        result = response.json()
+        return LLMCompletion(
+            text=result.get('response', ''),
+            provider=self.name,
+            model=model,
+            finish_reason=result.get('done_reason', 'stop'),
+            output_tokens=result.get('eval_count')
+        )
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    """例外が429/過負荷を示すか"""
+    status = getattr(error, 'status_code', None) or getattr(error, 'http_status', None)
+    if status in (429, 529):
+        return True
+    return type(error).__name__ in ("RateLimitError", "OverloadedError")
+
+class LLMRouter:
+    """複数プロバイダーへの振り分けとフェイルオーバー
+
+    指定モデルを扱うプロバイダーを優先し、そのプロバイダーが上限に達している・
+    失敗した場合は、空き枠の多い順に他のプロバイダーへ振り分ける。
+    """
+
+    def __init__(self, providers: List[LLMProvider], acquire_timeout: float = 120.0):
+        """
+        初期化
+
+        Args:
+            providers: プロバイダーのリスト（先頭ほど優先度が高い）
+            acquire_timeout: 全プロバイダーが混雑しているときに待つ最大秒数
+        """
+        self.providers = providers
+        self.acquire_timeout = acquire_timeout
+        self.failovers = 0
+
+    def _candidates(self, model: str, exclude: set) -> List[LLMProvider]:
+        """優先順に並べた候補プロバイダー"""
+        preferred = [p for p in self.providers if p.handles(model) and p not in exclude]
+        others = [p for p in self.providers if p not in preferred and p not in exclude]
+        others.sort(key=lambda p: p.limiter.headroom, reverse=True)
+        return preferred + others
+
+    def complete(self, prompt: str, temperature: float, max_tokens: int,
+                 model: str = "", timeout: Optional[float] = None) -> Optional[LLMCompletion]:
+        """
+        空いているプロバイダーで生成を実行
+
+        Args:
+            prompt: プロンプト
+            temperature: 生成温度
+            max_tokens: 最大トークン数
+            model: 希望するモデル名（そのプロバイダーを優先する）
+            timeout: 1回のリクエストのタイムアウト秒数（RetryPolicy.request_timeout）
+
+        Returns:
+            LLMCompletion or None（全プロバイダーで失敗した場合）
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        failed = set()
+
+        while True:
+            candidates = self._candidates(model, failed)
+            if not candidates:
+                logger.error("全てのLLMプロバイダーで生成に失敗しました")
+                return None
+
+            for provider in candidates:
+                if not provider.try_acquire():
+                    continue
+
+                if not provider.handles(model):
+                    self.failovers += 1
+                    logger.info(f"LLMフェイルオーバー: {model or '-'} -> {provider.name}")
+
+                try:
+                    use_model = model if model and provider.handles(model) else None
+                    return provider.complete(prompt, temperature, max_tokens, use_model, timeout)
+                except RateLimitError as e:
+                    # レート制限はAIMDで上限を下げたうえで他プロバイダーを試す
+                    logger.warning(f"{provider.name} レート制限: {e}")
+                    continue
+                except Exception as e:
+                    logger.error(f"{provider.name} API エラー: {e}")
+                    failed.add(provider)
+                    continue
+
+            # 全候補が混雑中またはレート制限中 - 最も早く空きそうなトークンを待つ
+            if time.monotonic() >= deadline:
+                logger.error("LLMプロバイダーの空き待ちがタイムアウトしました")
+                return None
+            waiting = [p for p in candidates if p not in failed]
+            if waiting:
+                wait = min(p.bucket.time_until_available() for p in waiting)
+                time.sleep(min(max(wait, 0.05), 1.0))
+
+    def stats(self) -> Dict:
+        """ルーターと各プロバイダーの統計"""
+        return {
+            'failovers': self.failovers,
+            'providers': {p.name: p.stats() for p in self.providers}
+        }
+
+def build_router(config: Dict) -> Optional[LLMRouter]:
+    """
+    設定からルーターを作成
+
+    config/api_keys.json の openai_api_key / anthropic_api_key と、
+    llm_router.providers 以下のプロバイダー別設定を使用する。
+    llm_router.token_latency_target（出力1トークンあたりの秒数）・latency_target（1リクエストの秒数）は
+    プロバイダー別の設定が無い場合の既定値で、応答がこれより遅いと同時実行数を絞る（未設定ならレイテンシは見ない）。
+
+    Args:
+        config: 設定辞書
+
+    Returns:
+        LLMRouter or None（無効またはプロバイダーが無い場合）
+    """
+    router_config = config.get('llm_router', {})
+    if not router_config.get('enabled', False):
+        return None
+
+    provider_configs = router_config.get('providers', {})
+    providers: List[LLMProvider] = []
+
+    for name, options in provider_configs.items():
+        options = dict(options)
+        if not options.pop('enabled', True):
+            continue
+        for key in ('latency_target', 'token_latency_target'):
+            options.setdefault(key, router_config.get(key))
+        try:
+            if name == 'openai' and config.get('openai_api_key'):
+                providers.append(OpenAIProvider(api_key=config['openai_api_key'], **options))
+            elif name == 'anthropic' and config.get('anthropic_api_key'):
+                providers.append(AnthropicProvider(api_key=config['anthropic_api_key'], **options))
+            elif name == 'ollama':
+                providers.append(OllamaProvider(**options))
+        except Exception as e:
+            logger.warning(f"LLMプロバイダー初期化エラー {name}: {e}")
+
+    if not providers:
+        logger.warning("有効なLLMプロバイダーがありません")
+        return None
+
+    logger.info(f"LLMルーター: {', '.join(p.name for p in providers)}")
+    return LLMRouter(providers, acquire_timeout=router_config.get('acquire_timeout', 120.0))
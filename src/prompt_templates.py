@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+プロンプトテンプレートモジュール
+記事生成プロンプトを「設定ごとに固定のプレフィックス」と「キーワードごとの短いサフィックス」に分け、
+プレフィックスは設定の組み合わせごとに1度だけ組み立てて使い回す
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# アウトライン生成モードのセクション種別ごとの執筆指示
+SECTION_GUIDANCE = {
+    "intro": "記事の導入部です。読者の関心を引き、記事で学べることを明示してください。",
+    "body": "実用的な情報と具体例、データや事例を含め、読者の疑問に答えてください。",
+    "faq": "よくある質問を3-5個、「### Q. 質問」に続けて回答を書く形式でまとめてください。",
+    "summary": "記事全体の重要ポイントを整理し、読者へのアクションアイテムを示してください。"
+}
+
+TONE_DESCRIPTIONS = {
+    "friendly": "親しみやすく、読みやすい文体",
+    "professional": "専門的で信頼性のある文体",
+    "casual": "カジュアルで親近感のある文体"
+}
+
+class ArticlePrompt(str):
+    """プレフィックスとサフィックスを保持したプロンプト文字列
+
+    strとしてそのまま使えるため、キャッシュキーやルーターには従来どおり渡せる。
+    プレフィックスキャッシュに対応したAPIでは prefix / suffix を分けて送る。
+    """
+
+    prefix: str
+    suffix: str
+
+    def __new__(cls, prefix: str, suffix: str):
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        prompt.suffix = suffix
+        return prompt
+
+def anthropic_content(prompt: str) -> object:
+    """
+    Anthropic Messages APIのuserコンテンツを作成
+
+    ArticlePromptの場合はプレフィックスにcache_controlを付けたブロックに分ける。
+
+    Args:
+        prompt: プロンプト
+
+    Returns:
+        content に渡す値（文字列 or ブロックのリスト）
+    """
+    if isinstance(prompt, ArticlePrompt) and prompt.prefix:
+        return [
+            {"type": "text", "text": prompt.prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt.suffix}
+        ]
+    return str(prompt)
+
+class PromptTemplateCache:
+    """記事生成プロンプトのプレフィックスを設定ごとにキャッシュする"""
+
+    def __init__(self):
+        """初期化"""
+        self._prefixes: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+        self.prefix_hits = 0
+        self.prefix_misses = 0
+
+    @staticmethod
+    def _template_key(config, seo_settings, has_outline: bool) -> Tuple:
+        """プレフィックスに影響する設定値のタプル"""
+        return (
+            config.min_length,
+            config.max_length,
+            config.target_keyword_density,
+            config.tone,
+            config.include_faq,
+            seo_settings.min_headings,
+            seo_settings.max_headings,
+            has_outline
+        )
+
+    def _compile_prefix(self, config, seo_settings, has_outline: bool) -> str:
+        """キーワードに依存しない固定部分を組み立てる"""
+        tone = TONE_DESCRIPTIONS.get(config.tone, "親しみやすい文体")
+
+        prefix = f"""
+あなたはSEOに精通したプロのライターです。末尾の「今回の記事」で指定するメインキーワードについて、以下の条件で記事を作成してください：
+
+## 記事要件
+1. **文字数**: {config.min_length}〜{config.max_length}文字
+2. **言語**: 日本語
+3. **トーン**: {tone}
+4. **対象読者**: 初心者から中級者
+
+## SEO要件
+1. **メインキーワード**: 自然に含める（密度約{config.target_keyword_density*100:.1f}%）
+2. **関連キーワード**: 「今回の記事」に記載したものを適宜含める
+3. **見出し**: H2, H3タグを{seo_settings.min_headings}〜{seo_settings.max_headings}個使用
+4. **構造**: 導入→本文→まとめの流れ
+
+## 記事構成
+"""
+
+        if has_outline:
+            prefix += "\n「今回の記事」に記載した見出し構成に従って記事を作成してください。\n"
+        else:
+            prefix += """
+1. **導入部** (200-300文字)
+   - 読者の関心を引く
+   - 記事で学べることを明示
+
+2. **本文** (複数のH2見出しで構成)
+   - 実用的な情報と具体例
+   - 読者の疑問に答える内容
+   - データや事例を含める
+
+3. **まとめ** (150-200文字)
+   - 重要ポイントの整理
+   - 読者へのアクションアイテム
+"""
+
+        if config.include_faq:
+            prefix += "\n4. **FAQ**: よくある質問3-5個を含めてください\n"
+
+        prefix += """
+## 出力形式
+以下の形式で出力してください：
+
+# [記事タイトル]
+
+[導入文]
+
+## [見出し1]
+[内容]
+
+## [見出し2]
+[内容]
+
+## まとめ
+[まとめ文]
+
+---
+META_DESCRIPTION: [120-160文字のメタディスクリプション]
+"""
+        return prefix
+
+    def get_prefix(self, config, seo_settings, has_outline: bool = False) -> str:
+        """
+        設定に対応するプレフィックスを取得（初回のみ組み立てる）
+
+        Args:
+            config: ArticleConfig
+            seo_settings: SEOSettings
+            has_outline: カスタム見出し構成を使うか
+
+        Returns:
+            プレフィックス文字列
+        """
+        key = ('article',) + self._template_key(config, seo_settings, has_outline)
+        return self._get_or_compile(key, lambda: self._compile_prefix(config, seo_settings, has_outline))
+
+    def _get_or_compile(self, key: Tuple, compile_prefix: Callable[[], str]) -> str:
+        """キャッシュ済みのプレフィックスを返し、無ければ組み立てて登録する"""
+        with self._lock:
+            prefix = self._prefixes.get(key)
+            if prefix is not None:
+                self.prefix_hits += 1
+                return prefix
+
+            prefix = compile_prefix()
+            self._prefixes[key] = prefix
+            self.prefix_misses += 1
+            return prefix
+
+    def build(self,
+              config,
+              seo_settings,
+              main_keyword: str,
+              related_keywords: List[str],
+              additional_context: str = "",
+              custom_outline: Optional[List[str]] = None) -> ArticlePrompt:
+        """
+        記事生成プロンプトを作成
+
+        Args:
+            config: ArticleConfig
+            seo_settings: SEOSettings
+            main_keyword: メインキーワード
+            related_keywords: 関連キーワード
+            additional_context: 追加コンテキスト
+            custom_outline: カスタム見出し
+
+        Returns:
+            ArticlePrompt
+        """
+        prefix = self.get_prefix(config, seo_settings, bool(custom_outline))
+
+        suffix = self._keyword_suffix(main_keyword, related_keywords, custom_outline, additional_context)
+        suffix += f"\n以上の条件で「{main_keyword}」についての記事を作成してください。\n"
+
+        return ArticlePrompt(prefix, suffix)
+
+    def _compile_outline_prefix(self, seo_settings, has_outline: bool) -> str:
+        """アウトライン生成用の固定部分"""
+        prefix = f"""
+あなたはSEOに精通したプロのライターです。末尾の「今回の記事」で指定するメインキーワードについて、記事の構成案を作成してください：
+
+## 構成要件
+1. **タイトル**: メインキーワードを含む{seo_settings.title_max_length}文字以内
+2. **見出し**: H2見出しを{seo_settings.min_headings}〜{seo_settings.max_headings}個（導入部・まとめ・FAQは含めない）
+3. **流れ**: 初心者から中級者が順に読んで理解できる順序
+4. **関連キーワード**: 「今回の記事」に記載したものを見出しに適宜含める
+"""
+        if has_outline:
+            prefix += "\n「今回の記事」に記載した見出し構成をそのままH2見出しとして使用してください。\n"
+
+        prefix += """
+## 出力形式
+本文は書かず、以下の形式のみで出力してください：
+
+# [記事タイトル]
+
+## [見出し1]
+## [見出し2]
+## [見出し3]
+
+---
+META_DESCRIPTION: [120-160文字のメタディスクリプション]
+"""
+        return prefix
+
+    def _compile_section_prefix(self, config) -> str:
+        """セクション本文生成用の固定部分"""
+        tone = TONE_DESCRIPTIONS.get(config.tone, "親しみやすい文体")
+        return f"""
+あなたはSEOに精通したプロのライターです。末尾の「今回の記事」で指定する記事のうち、1つのセクションの本文だけを執筆してください：
+
+## 執筆要件
+1. **言語**: 日本語
+2. **トーン**: {tone}
+3. **対象読者**: 初心者から中級者
+4. **メインキーワード**: 自然に含める（密度約{config.target_keyword_density*100:.1f}%）
+5. **範囲**: 指定したセクションの内容のみを書き、見出し構成にある他のセクションと内容を重複させない
+6. **構成**: 必要に応じてH3見出し（###）や箇条書きを使用してよい
+
+## 出力形式
+- セクションの本文のみを出力してください
+- 記事タイトル、H2見出し、メタディスクリプションは出力しないでください
+"""
+
+    def build_outline(self,
+                      config,
+                      seo_settings,
+                      main_keyword: str,
+                      related_keywords: List[str],
+                      additional_context: str = "",
+                      custom_outline: Optional[List[str]] = None) -> ArticlePrompt:
+        """
+        アウトライン（タイトル・H2見出し・メタディスクリプション）生成プロンプトを作成
+
+        Args:
+            config: ArticleConfig
+            seo_settings: SEOSettings
+            main_keyword: メインキーワード
+            related_keywords: 関連キーワード
+            additional_context: 追加コンテキスト
+            custom_outline: カスタム見出し
+
+        Returns:
+            ArticlePrompt
+        """
+        has_outline = bool(custom_outline)
+        key = ('outline', seo_settings.title_max_length, seo_settings.min_headings,
+               seo_settings.max_headings, has_outline)
+        prefix = self._get_or_compile(key, lambda: self._compile_outline_prefix(seo_settings, has_outline))
+
+        suffix = self._keyword_suffix(main_keyword, related_keywords, custom_outline, additional_context)
+        suffix += f"\n以上の条件で「{main_keyword}」についての記事の構成案を作成してください。\n"
+
+        return ArticlePrompt(prefix, suffix)
+
+    def build_section(self,
+                      config,
+                      main_keyword: str,
+                      related_keywords: List[str],
+                      title: str,
+                      outline: List[str],
+                      heading: str,
+                      kind: str,
+                      target_chars: int,
+                      additional_context: str = "") -> ArticlePrompt:
+        """
+        1セクション分の本文生成プロンプトを作成
+
+        Args:
+            config: ArticleConfig
+            main_keyword: メインキーワード
+            related_keywords: 関連キーワード
+            title: 記事タイトル
+            outline: 記事全体の見出し構成
+            heading: 執筆するセクションの見出し
+            kind: セクション種別（intro, body, faq, summary）
+            target_chars: 目安の文字数
+            additional_context: 追加コンテキスト
+
+        Returns:
+            ArticlePrompt
+        """
+        key = ('section', config.tone, config.target_keyword_density)
+        prefix = self._get_or_compile(key, lambda: self._compile_section_prefix(config))
+
+        suffix = self._keyword_suffix(main_keyword, related_keywords, outline, additional_context, title)
+        suffix += f"""
+### 執筆するセクション
+「{heading}」（約{target_chars}文字）
+{SECTION_GUIDANCE.get(kind, SECTION_GUIDANCE['body'])}
+"""
+
+        return ArticlePrompt(prefix, suffix)
+
+    @staticmethod
+    def build_continuation(prompt: str, partial: str) -> ArticlePrompt:
+        """
+        出力上限で途中終了した生成の続きを求めるプロンプトを作成
+
+        元のプロンプト全体をプレフィックスとするため、続きの呼び出しでもプレフィックスキャッシュが効く。
+
+        Args:
+            prompt: 元のプロンプト
+            partial: これまでの出力
+
+        Returns:
+            ArticlePrompt
+        """
+        suffix = f"""
+## ここまでの出力
+以下はこの依頼に対するここまでの出力です。出力上限で途中で終わっています。
+
+<<<
+{partial}
+>>>
+
+最後の文の続きから残りだけを出力してください。既に出力した部分は繰り返さないでください。
+"""
+        return ArticlePrompt(str(prompt), suffix)
+
+    @staticmethod
+    def _keyword_suffix(main_keyword: str,
+                        related_keywords: List[str],
+                        outline: Optional[List[str]],
+                        additional_context: str,
+                        title: str = "") -> str:
+        """キーワード・見出し構成・追加情報を並べたサフィックス"""
+        related_str = ", ".join(related_keywords[:5]) if related_keywords else ""
+        suffix = f"""
+## 今回の記事
+- **メインキーワード**: 「{main_keyword}」
+- **関連キーワード**: {related_str}
+"""
+        if title:
+            suffix += f"- **記事タイトル**: {title}\n"
+
+        if outline:
+            suffix += "\n### 見出し構成\n"
+            for i, heading in enumerate(outline, 1):
+                suffix += f"{i}. {heading}\n"
+
+        if additional_context:
+            suffix += f"\n### 追加情報\n{additional_context}\n"
+
+        return suffix
+
+    def stats(self) -> Dict:
+        """
+        プレフィックスの再利用状況
+
+        Returns:
+            テンプレート数・ヒット数・ミス数・ヒット率
+        """
+        with self._lock:
+            total = self.prefix_hits + self.prefix_misses
+            return {
+                'templates': len(self._prefixes),
+                'prefix_hits': self.prefix_hits,
+                'prefix_misses': self.prefix_misses,
+                'hit_rate': self.prefix_hits / total if total else 0.0
+            }
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+レート制御モジュール
+トークンバケットによるリクエストレート制限と、AIMD方式の同時実行数制御、
+スロットリングに応じたレート調整とサーキットブレーカーを提供する
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """トークンバケット方式のレートリミッター"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        初期化
+
+        Args:
+            rate: 1秒あたりに補充するトークン数
+            capacity: バケット容量（バースト上限）。Noneの場合はmax(1, rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """経過時間分のトークンを補充（ロック取得済みで呼ぶ）"""
+        elapsed = now - self._updated_at
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """
+        トークンを取得（待機しない）
+
+        Args:
+            tokens: 消費するトークン数
+
+        Returns:
+            取得できたか
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def time_until_available(self, tokens: float = 1.0) -> float:
+        """
+        トークンが利用可能になるまでの秒数
+
+        Args:
+            tokens: 必要なトークン数
+
+        Returns:
+            待機秒数（すでに利用可能なら0）
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            missing = tokens - self._tokens
+            if missing <= 0:
+                return 0.0
+            if self.rate <= 0:
+                return float('inf')
+            return missing / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        トークンを取得（利用可能になるまで待機）
+
+        Args:
+            tokens: 消費するトークン数
+            timeout: 最大待機秒数（Noneで無制限）
+
+        Returns:
+            取得できたか
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self.try_acquire(tokens):
+                return True
+
+            wait = self.time_until_available(tokens)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(max(wait, 0.001))
+
+    def set_rate(self, rate: float):
+        """補充レートを変更"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+class AIMDConcurrencyLimiter:
+    """AIMD（加算増加・乗算減少）方式の同時実行数リミッター
+
+    成功するたびに上限を少しずつ増やし、429やレイテンシ超過を検知したら
+    上限を一定割合で減らす。
+    """
+
+    def __init__(self,
+                 initial_limit: float = 4,
+                 min_limit: float = 1,
+                 max_limit: float = 32,
+                 decrease_factor: float = 0.5,
+                 latency_target: Optional[float] = None):
+        """
+        初期化
+
+        Args:
+            initial_limit: 初期同時実行数
+            min_limit: 同時実行数の下限
+            max_limit: 同時実行数の上限
+            decrease_factor: 減少時の乗数
+            latency_target: この秒数を超えたら混雑とみなす（Noneでレイテンシは見ない）
+        """
+        self.limit = float(initial_limit)
+        self.min_limit = float(min_limit)
+        self.max_limit = float(max_limit)
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def headroom(self) -> float:
+        """追加で実行できる数"""
+        with self._lock:
+            return self.limit - self.in_flight
+
+    @property
+    def saturated(self) -> bool:
+        """上限まで実行中か"""
+        return self.headroom < 1
+
+    def try_acquire(self) -> bool:
+        """
+        実行枠を取得（待機しない）
+
+        Returns:
+            取得できたか
+        """
+        with self._lock:
+            if self.in_flight + 1 <= self.limit:
+                self.in_flight += 1
+                return True
+            return False
+
+    def release(self,
+                latency: Optional[float] = None,
+                throttled: bool = False,
+                failed: bool = False):
+        """
+        実行枠を返却し、結果に応じて上限を調整
+
+        Args:
+            latency: 今回の処理時間（秒）
+            throttled: 429などのスロットリングを受けたか
+            failed: スロットリング以外のエラーで失敗したか（上限は変えない）
+        """
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+            congested = throttled or (
+                self.latency_target is not None
+                and latency is not None
+                and latency > self.latency_target
+            )
+            if congested:
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            elif not failed:
+                # 上限1つ分の成功でおよそ+1
+                self.limit = min(self.max_limit, self.limit + 1.0 / max(self.limit, 1.0))
+
+class AdaptiveRateLimiter:
+    """スロットリングに応じてレートを調整するトークンバケット
+
+    成功するたびにレートを少しずつ上げ、429やタイムアウトを受けたらレートを一定割合で下げて
+    しばらく送信を止める（Retry-Afterがあればそれに従う）。
+    """
+
+    def __init__(self,
+                 rate: float = 0.5,
+                 min_rate: float = 0.05,
+                 max_rate: float = 1.0,
+                 increase_step: float = 0.02,
+                 decrease_factor: float = 0.5,
+                 burst: float = 1.0):
+        """
+        初期化
+
+        Args:
+            rate: 初期レート（1秒あたりのリクエスト数）
+            min_rate: レートの下限
+            max_rate: レートの上限
+            increase_step: 成功1回あたりのレート増加量
+            decrease_factor: スロットリング時のレートの乗数
+            burst: 連続して送れるリクエスト数
+        """
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.bucket = TokenBucket(rate=min(max(rate, min_rate), max_rate), capacity=burst)
+
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.requests = 0
+        self.successes = 0
+        self.throttles = 0
+        self.wait_seconds = 0.0
+
+    @property
+    def rate(self) -> float:
+        """現在のレート"""
+        return self.bucket.rate
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        送信枠を取得（送信停止中・トークン不足の間は待機）
+
+        Args:
+            timeout: 最大待機秒数（Noneで無制限）
+
+        Returns:
+            取得できたか
+        """
+        start = time.monotonic()
+        with self._lock:
+            pause = self._paused_until - start
+        if pause > 0:
+            if timeout is not None and pause > timeout:
+                return False
+            time.sleep(pause)
+
+        remaining = None if timeout is None else max(0.0, timeout - (time.monotonic() - start))
+        acquired = self.bucket.acquire(timeout=remaining)
+        with self._lock:
+            self.wait_seconds += time.monotonic() - start
+            if acquired:
+                self.requests += 1
+        return acquired
+
+    def record_success(self):
+        """成功を記録してレートを上げる"""
+        with self._lock:
+            self.successes += 1
+            self.bucket.set_rate(min(self.max_rate, self.bucket.rate + self.increase_step))
+
+    def record_throttle(self, retry_after: Optional[float] = None):
+        """
+        スロットリング（429・タイムアウト等）を記録してレートを下げる
+
+        Args:
+            retry_after: サーバーが指定した待機秒数（Noneなら新しいレートの1間隔分）
+        """
+        with self._lock:
+            self.throttles += 1
+            rate = max(self.min_rate, self.bucket.rate * self.decrease_factor)
+            self.bucket.set_rate(rate)
+            pause = retry_after if retry_after is not None else 1.0 / rate
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.warning(f"スロットリングを検知: レートを{rate:.3f}/秒に下げ、{pause:.1f}秒待機します")
+
+    def stats(self) -> Dict:
+        """レート制御の統計"""
+        with self._lock:
+            return {
+                'rate': round(self.bucket.rate, 4),
+                'requests': self.requests,
+                'successes': self.successes,
+                'throttles': self.throttles,
+                'wait_seconds': round(self.wait_seconds, 2)
+            }
+
+class CircuitOpenError(Exception):
+    """サーキットブレーカーが開いているため呼び出しを行わなかった"""
+
+class CircuitBreaker:
+    """連続した失敗で呼び出しを一時停止するサーキットブレーカー
+
+    - closed: 通常どおり呼び出す
+    - open: failure_threshold回連続で失敗したら、reset_timeout秒間は呼び出さない
+    - half_open: reset_timeout経過後に1回だけ試し、成功すればclosed、失敗すれば再びopen
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0, name: str = ""):
+        """
+        初期化
+
+        Args:
+            failure_threshold: openにする連続失敗回数
+            reset_timeout: openからhalf_openに移るまでの秒数
+            name: ログ用の名前
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.name = name
+
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._open_since: Optional[float] = None
+        self._trial_in_flight = False
+
+        self.opened = 0
+        self.rejected = 0
+        self.open_seconds = 0.0
+
+    def allow(self) -> bool:
+        """
+        呼び出してよいか（half_openでは同時に1回だけ許可）
+
+        Returns:
+            呼び出してよいか
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def retry_after(self) -> float:
+        """次に試せるまでの秒数"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        """成功を記録（half_open・openならclosedに戻す）"""
+        with self._lock:
+            self.consecutive_failures = 0
+            self._trial_in_flight = False
+            if self.state != self.CLOSED:
+                self.state = self.CLOSED
+                if self._open_since is not None:
+                    self.open_seconds += time.monotonic() - self._open_since
+                    self._open_since = None
+                logger.info(f"サーキットブレーカー{self.name and f'({self.name})'}: 復旧しました")
+
+    def record_failure(self):
+        """失敗を記録（連続失敗が閾値に達するか、half_openでの失敗ならopen）"""
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or \
+                    (self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold):
+                now = time.monotonic()
+                if self._open_since is None:
+                    self._open_since = now
+                self.state = self.OPEN
+                self._opened_at = now
+                self.opened += 1
+                logger.warning(f"サーキットブレーカー{self.name and f'({self.name})'}: "
+                               f"{self.consecutive_failures}回連続で失敗したため{self.reset_timeout:.0f}秒間停止します")
+
+    def stats(self) -> Dict:
+        """サーキットブレーカーの統計"""
+        with self._lock:
+            open_seconds = self.open_seconds
+            if self._open_since is not None:
+                open_seconds += time.monotonic() - self._open_since
+            return {
+                'state': self.state,
+                'opened': self.opened,
+                'rejected': self.rejected,
+                'consecutive_failures': self.consecutive_failures,
+                'open_seconds': round(open_seconds, 2)
+            }
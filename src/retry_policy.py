@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+リトライ・ヘッジングモジュール
+LLM呼び出しの一時的な失敗をジッター付き指数バックオフで再試行し、
+応答が遅い呼び出しには同じリクエストを重ねて送り（ヘッジ）、先に返った方を採用する
+"""
+
+import logging
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Deque, Dict, Hashable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# 再試行すべきHTTPステータス
+RETRYABLE_STATUS = frozenset({408, 409, 425, 429, 500, 502, 503, 504, 529})
+
+# 再試行すべき例外クラス名（openai 0.x / anthropic / requests）
+RETRYABLE_ERROR_NAMES = frozenset({
+    "RateLimitError", "APIConnectionError", "APITimeoutError", "Timeout", "ReadTimeout",
+    "ConnectTimeout", "ConnectionError", "ServiceUnavailableError", "InternalServerError",
+    "OverloadedError", "TryAgain",
+})
+
+class RetryDeadlineExceeded(Exception):
+    """再試行の期限を過ぎた"""
+
+def is_retryable_error(error: Exception) -> bool:
+    """
+    例外が一時的なもの（再試行で回復し得る）か
+
+    Args:
+        error: 発生した例外
+
+    Returns:
+        再試行すべきか
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    status = getattr(error, 'status_code', None) or getattr(error, 'http_status', None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+class RetryPolicy:
+    """ジッター付き指数バックオフによる再試行"""
+
+    def __init__(self,
+                 max_attempts: int = 4,
+                 base_delay: float = 1.0,
+                 max_delay: float = 30.0,
+                 multiplier: float = 2.0,
+                 deadline: Optional[float] = 300.0,
+                 request_timeout: Optional[float] = 120.0):
+        """
+        初期化
+
+        Args:
+            max_attempts: 最大試行回数（初回を含む）
+            base_delay: 1回目の再試行までの待機秒数の上限
+            max_delay: 待機秒数の上限
+            multiplier: 再試行ごとの待機上限の倍率
+            deadline: 1回の呼び出し全体（再試行を含む）の期限秒数（Noneで無制限）
+            request_timeout: 1回のAPIリクエストのタイムアウト秒数（APIクライアントに渡す）
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.deadline = deadline
+        self.request_timeout = request_timeout
+
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.gave_up = 0
+
+    def backoff(self, attempt: int) -> float:
+        """
+        attempt回目の失敗後の待機秒数（フルジッター）
+
+        Args:
+            attempt: 失敗した試行の番号（1始まり）
+
+        Returns:
+            待機秒数
+        """
+        cap = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, cap)
+
+    def call(self,
+             func: Callable[[Optional[float]], T],
+             retryable: Callable[[Exception], bool] = is_retryable_error,
+             description: str = "") -> T:
+        """
+        funcを実行し、一時的なエラーなら待機して再試行する
+
+        funcには今回の試行のタイムアウト秒数（request_timeoutと期限までの残り時間の短い方）を渡す。
+
+        Args:
+            func: 実行する関数（引数はタイムアウト秒数、Noneで無制限）
+            retryable: 例外が再試行対象か判定する関数
+            description: ログ用の説明
+
+        Returns:
+            funcの戻り値
+
+        Raises:
+            Exception: 再試行対象外のエラー、または試行回数・期限を使い切った場合の最後のエラー
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            timeout = self.request_timeout
+            if self.deadline is not None:
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    with self._lock:
+                        self.gave_up += 1
+                    raise RetryDeadlineExceeded(
+                        f"{description or 'LLM呼び出し'}: 期限{self.deadline:.0f}秒内に完了しませんでした"
+                    )
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            try:
+                return func(timeout)
+            except Exception as e:
+                if not retryable(e) or attempt >= self.max_attempts:
+                    if attempt > 1:
+                        with self._lock:
+                            self.gave_up += 1
+                    raise
+
+                delay = self.backoff(attempt)
+                if self.deadline is not None and time.monotonic() - started + delay > self.deadline:
+                    with self._lock:
+                        self.gave_up += 1
+                    raise RetryDeadlineExceeded(
+                        f"{description or 'LLM呼び出し'}: 期限{self.deadline:.0f}秒内に完了しませんでした ({e})"
+                    ) from e
+
+                with self._lock:
+                    self.retries += 1
+                logger.warning(f"{description or 'LLM呼び出し'} 一時エラーのため再試行 "
+                               f"({attempt}/{self.max_attempts - 1}, {delay:.1f}秒後): {e}")
+                time.sleep(delay)
+
+    def stats(self) -> Dict:
+        """再試行の統計"""
+        with self._lock:
+            return {'retries': self.retries, 'gave_up': self.gave_up}
+
+class LatencyTracker:
+    """直近の応答時間からパーセンタイルを求める（キーごと）"""
+
+    def __init__(self, window: int = 200):
+        """
+        初期化
+
+        Args:
+            window: キーごとに保持する直近のサンプル数
+        """
+        self.window = window
+        self._samples: Dict[Hashable, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: Hashable, latency: float):
+        """応答時間を記録"""
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def count(self, key: Hashable) -> int:
+        """サンプル数"""
+        with self._lock:
+            return len(self._samples.get(key, ()))
+
+    def percentile(self, key: Hashable, q: float) -> Optional[float]:
+        """
+        パーセンタイル値
+
+        Args:
+            key: キー
+            q: 0〜1（0.95でp95）
+
+        Returns:
+            秒数（サンプルが無ければNone）
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(q * len(samples)) - 1))
+        return samples[index]
+
+class HedgedCaller:
+    """一定時間内に応答が無い呼び出しに、同じリクエストを重ねて送る
+
+    重ねる時間はキー（モデル・出力サイズなど）ごとの直近応答時間のパーセンタイルで、
+    投入時ではなく最初の呼び出しが実際に動き始めた時から測る（スレッドの空き待ちでヘッジしない）。
+    先に成功した方の結果を返し、まだ始まっていない方は取り消す（実行中のAPI呼び出しは中断できない）。
+    """
+
+    def __init__(self,
+                 percentile: float = 0.95,
+                 min_samples: int = 20,
+                 min_delay: float = 2.0,
+                 max_workers: int = 64,
+                 window: int = 200):
+        """
+        初期化
+
+        Args:
+            percentile: ヘッジを送る応答時間のパーセンタイル
+            min_samples: この数のサンプルが集まるまではヘッジしない
+            min_delay: ヘッジを送るまでの最短秒数
+            max_workers: 呼び出しを実行するスレッド数の上限（同時に呼び出すスレッド数の2倍程度）
+            window: パーセンタイル計算に使う直近のサンプル数
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.latency = LatencyTracker(window)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self, key: Hashable) -> Optional[float]:
+        """ヘッジを送るまでの秒数（サンプル不足ならNone）"""
+        if self.latency.count(key) < self.min_samples:
+            return None
+        threshold = self.latency.percentile(key, self.percentile)
+        return max(self.min_delay, threshold) if threshold is not None else None
+
+    def _timed(self, key: Hashable, func: Callable[[], T]) -> T:
+        """実行して成功時の応答時間を記録"""
+        start = time.monotonic()
+        result = func()
+        self.latency.record(key, time.monotonic() - start)
+        return result
+
+    def call(self, key: Hashable, func: Callable[[], T]) -> T:
+        """
+        funcを実行し、閾値を過ぎても終わらなければ同じfuncをもう1つ実行する
+
+        Args:
+            key: 応答時間を集計するキー
+            func: 実行する関数
+
+        Returns:
+            先に成功した方の戻り値
+
+        Raises:
+            Exception: 両方とも失敗した場合は最初の呼び出しのエラー
+        """
+        with self._lock:
+            self.calls += 1
+
+        delay = self.hedge_delay(key)
+        if delay is None:
+            return self._timed(key, func)
+
+        started = threading.Event()
+        
+        def run_primary() -> T:
+            started.set()
+            return self._timed(key, func)
+        
+        primary = self._executor.submit(run_primary)
+        started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        with self._lock:
+            self.hedges += 1
+        logger.info(f"応答が{delay:.1f}秒を超えたためヘッジリクエストを送信")
+        hedge = self._executor.submit(self._timed, key, func)
+
+        pending = {primary, hedge}
+        first_error: Optional[Exception] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    if future is hedge:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                if future is primary or first_error is None:
+                    first_error = error
+        raise first_error
+
+    def stats(self) -> Dict:
+        """ヘッジの統計"""
+        with self._lock:
+            return {'calls': self.calls, 'hedges': self.hedges, 'hedge_wins': self.hedge_wins}
@@ -5,15 +5,19 @@ SEO最適化モジュール
 """
 
 import re
+import os
 import json
+import heapq
 import logging
-from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+from dataclasses import asdict, dataclass
 from datetime import datetime
 import requests
 from bs4 import BeautifulSoup
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
+from article_parser import ParsedArticle, parse_article
+from text_stats import TextStats
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +59,109 @@ class StructuredData:
     keywords: List[str]
     image_url: str
 
+class SEOAuditReport:
+    """多数の記事のSEO分析結果を逐次集計するレポート
+
+    結果を保持せずに件数・平均・分布・頻出する警告・スコアの低い記事だけを集計するため、
+    数万記事でもメモリを使わない。jsonl_pathを指定すると記事ごとの結果も1行ずつ書き出す。
+    """
+
+    SCORE_FIELDS = (
+        'title_score', 'meta_description_score', 'heading_structure_score', 'keyword_density_score',
+        'readability_score', 'internal_links_score', 'image_optimization_score', 'overall_seo_score'
+    )
+
+    def __init__(self, jsonl_path: Optional[str] = None, worst_count: int = 20):
+        """
+        初期化
+
+        Args:
+            jsonl_path: 記事ごとの結果を書き出すJSON Linesファイル（Noneで書き出さない）
+            worst_count: レポートに残す総合スコアの低い記事の数
+        """
+        self.count = 0
+        self.errors = 0
+        self.totals = {field: 0.0 for field in self.SCORE_FIELDS}
+        self.distribution = Counter()
+        self.warnings = Counter()
+        self.worst_count = worst_count
+        self._worst: List[Tuple[float, int, str]] = []
+
+        self._jsonl = None
+        if jsonl_path:
+            directory = os.path.dirname(jsonl_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._jsonl = open(jsonl_path, 'w', encoding='utf-8')
+
+    def add(self, article_id: str, analysis: SEOAnalysis):
+        """
+        分析結果を集計に加える
+
+        Args:
+            article_id: 記事の識別子（ファイルパス・URL・タイトルなど）
+            analysis: SEO分析結果
+        """
+        self.count += 1
+        if any(warning.startswith("分析エラー") for warning in analysis.warnings):
+            self.errors += 1
+        for field in self.SCORE_FIELDS:
+            self.totals[field] += getattr(analysis, field)
+
+        score = analysis.overall_seo_score
+        self.distribution[min(int(score // 10) * 10, 90)] += 1
+        # 文字数などの数値を除いて同じ種類の警告をまとめる
+        self.warnings.update({re.sub(r'\d+(\.\d+)?', 'N', warning) for warning in analysis.warnings})
+
+        entry = (-score, self.count, article_id)
+        if len(self._worst) < self.worst_count:
+            heapq.heappush(self._worst, entry)
+        else:
+            heapq.heappushpop(self._worst, entry)
+
+        if self._jsonl:
+            self._jsonl.write(json.dumps({'id': article_id, **asdict(analysis)}, ensure_ascii=False) + "\n")
+
+    def to_dict(self) -> Dict:
+        """集計結果"""
+        return {
+            'analysis_date': datetime.now().isoformat(),
+            'article_count': self.count,
+            'error_count': self.errors,
+            'average_scores': {
+                field: total / self.count if self.count else 0.0 for field, total in self.totals.items()
+            },
+            'overall_score_distribution': {
+                f"{bucket}-{bucket + 9}": self.distribution[bucket] for bucket in range(0, 100, 10)
+            },
+            'common_warnings': self.warnings.most_common(20),
+            'lowest_scoring_articles': [
+                {'id': article_id, 'overall_seo_score': -score}
+                for score, _, article_id in sorted(self._worst, reverse=True)
+            ]
+        }
+
+    def save(self, filename: str):
+        """
+        集計結果をJSONで保存し、記事ごとの出力を閉じる
+
+        Args:
+            filename: 保存ファイル名
+        """
+        self.close()
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        logger.info(f"SEO監査レポート保存完了: {filename} ({self.count}記事)")
+
+    def close(self):
+        """記事ごとの出力を閉じる"""
+        if self._jsonl:
+            self._jsonl.close()
+            self._jsonl = None
+
 class SEOOptimizer:
     """SEO最適化クラス"""
     
@@ -65,19 +172,15 @@ class SEOOptimizer:
         self.optimal_keyword_density_range = (1.0, 3.0)  # パーセント
         self.min_word_count = 300
         self.recommended_word_count = 1500
-        
-        # NLTK データのダウンロード（初回のみ）
-        try:
-            nltk.data.find('tokenizers/punkt')
-        except LookupError:
-            nltk.download('punkt', quiet=True)
     
     def analyze_article(self, 
                        title: str, 
                        content: str, 
                        meta_description: str = "",
                        target_keyword: str = "",
-                       target_keywords: List[str] = []) -> SEOAnalysis:
+                       target_keywords: List[str] = [],
+                       parsed: Optional[ParsedArticle] = None,
+                       stats: Optional[TextStats] = None) -> SEOAnalysis:
         """
         記事のSEO分析を実行
         
@@ -87,6 +190,8 @@ class SEOOptimizer:
             meta_description: メタディスクリプション
             target_keyword: メインキーワード
             target_keywords: ターゲットキーワードリスト
+            parsed: contentの解析結果（Noneの場合はここで解析する）
+            stats: contentのテキスト統計（生成段階で計算済みのものを再利用する）
             
         Returns:
             SEOAnalysis結果
@@ -97,6 +202,13 @@ class SEOOptimizer:
             recommendations = []
             warnings = []
             
+            # 文字数・キーワード数・段落などは記事ごとに1度だけ計算
+            stats = TextStats.of(content, stats)
+            
+            # 見出し・リンク・画像は1回の走査でまとめて取得
+            if parsed is None:
+                parsed = stats.parsed
+            
             # タイトル分析
             title_score = self._analyze_title(title, target_keyword, recommendations, warnings)
             
@@ -104,19 +216,19 @@ class SEOOptimizer:
             meta_score = self._analyze_meta_description(meta_description, target_keyword, recommendations, warnings)
             
             # 見出し構造分析
-            heading_score = self._analyze_heading_structure(content, target_keyword, recommendations, warnings)
+            heading_score = self._analyze_heading_structure(content, target_keyword, recommendations, warnings, parsed)
             
             # キーワード密度分析
-            keyword_score = self._analyze_keyword_density(content, target_keyword, target_keywords, recommendations, warnings)
+            keyword_score = self._analyze_keyword_density(content, target_keyword, target_keywords, recommendations, warnings, stats)
             
             # 読みやすさ分析
-            readability_score = self._analyze_readability(content, recommendations, warnings)
+            readability_score = self._analyze_readability(content, recommendations, warnings, stats)
             
             # 内部リンク分析
-            internal_links_score = self._analyze_internal_links(content, recommendations, warnings)
+            internal_links_score = self._analyze_internal_links(content, recommendations, warnings, parsed, stats)
             
             # 画像最適化分析
-            image_score = self._analyze_image_optimization(content, recommendations, warnings)
+            image_score = self._analyze_image_optimization(content, recommendations, warnings, parsed)
             
             # 総合SEOスコア計算
             overall_score = self._calculate_overall_score(
@@ -143,6 +255,85 @@ class SEOOptimizer:
             logger.error(f"SEO分析エラー: {e}")
             return SEOAnalysis(0, 0, 0, 0, 0, 0, 0, 0, [], [f"分析エラー: {e}"])
     
+    def analyze_articles(self,
+                         articles: Iterable[Any],
+                         workers: Optional[int] = None,
+                         chunksize: int = 32,
+                         ordered: bool = True,
+                         report: Optional[SEOAuditReport] = None) -> Iterator[Tuple[str, SEOAnalysis]]:
+        """
+        多数の記事をプロセスプールで並列にSEO分析
+        
+        記事はchunksize件ずつまとめてワーカープロセスに送り、同時に送るのはワーカー数の2倍のチャンクまでに
+        抑える（articlesはジェネレータでもよく、全件をメモリに載せない）。
+        
+        Args:
+            articles: 記事のイテラブル。次のいずれか:
+                - save_article が出力したJSONファイルのパス（ワーカー側で読み込む）
+                - title・content・meta_description・keywords（先頭がメインキーワード）を持つdict
+                - 同名の属性を持つオブジェクト（GeneratedArticleなど）
+            workers: ワーカープロセス数（Noneで全CPU、1以下でこのプロセス内で逐次実行）
+            chunksize: 1回の送信にまとめる記事数
+            ordered: Trueで入力順、Falseで完了順に返す
+            report: 結果を逐次集計するレポート
+            
+        Returns:
+            (記事の識別子, SEOAnalysis) のイテレータ
+        """
+        workers = workers or os.cpu_count() or 1
+        chunks = _chunked((_article_job(index, article) for index, article in enumerate(articles)), chunksize)
+        
+        if workers <= 1:
+            results = (_analyze_chunk(chunk, self) for chunk in chunks)
+            for chunk_results in results:
+                for _, article_id, analysis in chunk_results:
+                    if report:
+                        report.add(article_id, analysis)
+                    yield article_id, analysis
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self,)) as executor:
+            in_flight = {}
+            pending: Dict[int, Tuple[str, SEOAnalysis]] = {}
+            next_index = 0
+            
+            def submit_next() -> bool:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return False
+                in_flight[executor.submit(_analyze_chunk, chunk)] = chunk
+                return True
+            
+            while len(in_flight) < workers * 2 and submit_next():
+                pass
+            
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = in_flight.pop(future)
+                    try:
+                        chunk_results = future.result()
+                    except Exception as e:
+                        # ワーカープロセス自体が落ちた場合もチャンク内の記事はエラーとして返す
+                        logger.error(f"SEO並列分析エラー: {e}")
+                        chunk_results = [
+                            (index, article_id, SEOAnalysis(0, 0, 0, 0, 0, 0, 0, 0, [], [f"分析エラー: {e}"]))
+                            for index, article_id, _ in chunk
+                        ]
+                    submit_next()
+                    
+                    for index, article_id, analysis in chunk_results:
+                        if report:
+                            report.add(article_id, analysis)
+                        if ordered:
+                            pending[index] = (article_id, analysis)
+                        else:
+                            yield article_id, analysis
+                    
+                    while next_index in pending:
+                        yield pending.pop(next_index)
+                        next_index += 1
+    
     def _analyze_title(self, title: str, target_keyword: str, recommendations: List[str], warnings: List[str]) -> float:
         """タイトル分析"""
         score = 0.0
@@ -215,14 +406,17 @@ class SEOOptimizer:
         
         return min(100.0, score)
     
-    def _analyze_heading_structure(self, content: str, target_keyword: str, recommendations: List[str], warnings: List[str]) -> float:
+    def _analyze_heading_structure(self, content: str, target_keyword: str, recommendations: List[str], warnings: List[str],
+                                   parsed: Optional[ParsedArticle] = None) -> float:
         """見出し構造分析"""
         score = 0.0
         
         # 見出し抽出
-        h1_headings = re.findall(r'^# (.+)', content, re.MULTILINE)
-        h2_headings = re.findall(r'^## (.+)', content, re.MULTILINE)  
-        h3_headings = re.findall(r'^### (.+)', content, re.MULTILINE)
+        if parsed is None:
+            parsed = parse_article(content)
+        h1_headings = parsed.headings_at(1)
+        h2_headings = parsed.headings_at(2)
+        h3_headings = parsed.headings_at(3)
         
         total_headings = len(h1_headings) + len(h2_headings) + len(h3_headings)
         
@@ -273,7 +467,8 @@ class SEOOptimizer:
         
         return min(100.0, score)
     
-    def _analyze_keyword_density(self, content: str, target_keyword: str, target_keywords: List[str], recommendations: List[str], warnings: List[str]) -> float:
+    def _analyze_keyword_density(self, content: str, target_keyword: str, target_keywords: List[str], recommendations: List[str], warnings: List[str],
+                                 stats: Optional[TextStats] = None) -> float:
         """キーワード密度分析"""
         score = 0.0
         
@@ -282,15 +477,19 @@ class SEOOptimizer:
             return 0.0
         
         # 文字数と単語数を計算
-        word_count = len(content.replace(' ', ''))
+        stats = TextStats.of(content, stats)
+        word_count = stats.char_count
         
         if word_count == 0:
             warnings.append("コンテンツが空です。")
             return 0.0
         
+        # メインキーワードと関連キーワードの出現位置をまとめて求める
+        related_keywords = target_keywords[:5]  # 上位5つのみ
+        placement = stats.keyword_placement([target_keyword] + related_keywords)
+        
         # メインキーワード密度
-        keyword_count = content.lower().count(target_keyword.lower())
-        keyword_density = (keyword_count / word_count) * 100
+        keyword_density = stats.keyword_density(target_keyword)
         
         min_density, max_density = self.optimal_keyword_density_range
         
@@ -304,13 +503,14 @@ class SEOOptimizer:
             warnings.append(f"キーワード密度が高すぎます（{keyword_density:.2f}%）。{max_density}%以下にすることを推奨します。")
             score += 20
         
+        # メインキーワードの配置
+        main_placement = placement[target_keyword]
+        if main_placement.count and not main_placement.in_first_paragraph:
+            recommendations.append("導入部（最初の段落）にメインキーワードを含めることを推奨します。")
+        
         # 関連キーワード分析
         if target_keywords:
-            related_keyword_score = 0
-            for keyword in target_keywords[:5]:  # 上位5つのみ
-                related_count = content.lower().count(keyword.lower())
-                if related_count > 0:
-                    related_keyword_score += 1
+            related_keyword_score = sum(1 for keyword in related_keywords if placement[keyword].count > 0)
             
             related_ratio = related_keyword_score / min(5, len(target_keywords))
             score += related_ratio * 40
@@ -319,15 +519,17 @@ class SEOOptimizer:
         
         return min(100.0, score)
     
-    def _analyze_readability(self, content: str, recommendations: List[str], warnings: List[str]) -> float:
+    def _analyze_readability(self, content: str, recommendations: List[str], warnings: List[str],
+                             stats: Optional[TextStats] = None) -> float:
         """読みやすさ分析"""
         score = 0.0
         
         try:
+            stats = TextStats.of(content, stats)
+            
             # 文と文字数の計算
-            sentences = sent_tokenize(content)
-            sentence_count = len(sentences)
-            word_count = len(content.replace(' ', ''))
+            sentence_count = stats.sentence_count
+            word_count = stats.char_count
             
             if sentence_count == 0:
                 warnings.append("文が検出されませんでした。")
@@ -348,8 +550,7 @@ class SEOOptimizer:
                 score += 10
             
             # 段落数評価
-            paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
-            paragraph_count = len(paragraphs)
+            paragraph_count = len(stats.paragraphs)
             
             if paragraph_count >= 3:
                 score += 20
@@ -383,16 +584,21 @@ class SEOOptimizer:
         
         return min(100.0, score)
     
-    def _analyze_internal_links(self, content: str, recommendations: List[str], warnings: List[str]) -> float:
+    def _analyze_internal_links(self, content: str, recommendations: List[str], warnings: List[str],
+                                parsed: Optional[ParsedArticle] = None,
+                                stats: Optional[TextStats] = None) -> float:
         """内部リンク分析"""
         score = 0.0
+        stats = TextStats.of(content, stats)
         
         # 内部リンクを検出（簡易的な実装）
-        internal_links = re.findall(r'\[([^\]]+)\]\(([^)]+)\)', content)
+        if parsed is None:
+            parsed = stats.parsed
+        internal_links = parsed.links
         internal_link_count = len(internal_links)
         
         # 適切な内部リンク数（1000文字につき1-2個が目安）
-        word_count = len(content.replace(' ', ''))
+        word_count = stats.char_count
         recommended_links = max(1, word_count // 1000)
         
         if internal_link_count == 0:
@@ -414,12 +620,15 @@ class SEOOptimizer:
         
         return min(100.0, score)
     
-    def _analyze_image_optimization(self, content: str, recommendations: List[str], warnings: List[str]) -> float:
+    def _analyze_image_optimization(self, content: str, recommendations: List[str], warnings: List[str],
+                                    parsed: Optional[ParsedArticle] = None) -> float:
         """画像最適化分析"""
         score = 0.0
         
         # 画像の検出
-        images = re.findall(r'!\[([^\]]*)\]\(([^)]+)\)', content)
+        if parsed is None:
+            parsed = parse_article(content)
+        images = parsed.images
         image_count = len(images)
         
         if image_count == 0:
@@ -430,7 +639,7 @@ class SEOOptimizer:
             recommendations.append(f"{image_count}個の画像が設定されています。")
             
             # alt属性の確認
-            images_with_alt = [img for alt_text, _ in images if alt_text.strip()]
+            images_with_alt = [alt_text for alt_text, _ in images if alt_text.strip()]
             if len(images_with_alt) == image_count:
                 score += 60
                 recommendations.append("すべての画像にalt属性が設定されています。")
@@ -453,7 +662,8 @@ class SEOOptimizer:
                         content: str, 
                         meta_description: str,
                         target_keyword: str,
-                        target_keywords: List[str] = []) -> Dict[str, str]:
+                        target_keywords: List[str] = [],
+                        stats: Optional[TextStats] = None) -> Dict[str, str]:
         """
         記事のSEO最適化を実行
         
@@ -463,6 +673,7 @@ class SEOOptimizer:
             meta_description: 元のメタディスクリプション
             target_keyword: メインキーワード
             target_keywords: 関連キーワード
+            stats: contentのテキスト統計（計算済みのものを再利用する）
             
         Returns:
             最適化された記事要素
@@ -471,11 +682,13 @@ class SEOOptimizer:
             logger.info("記事最適化開始")
             
             # 現在の分析
-            analysis = self.analyze_article(title, content, meta_description, target_keyword, target_keywords)
+            stats = TextStats.of(content, stats)
+            parsed = stats.parsed
+            analysis = self.analyze_article(title, content, meta_description, target_keyword, target_keywords, parsed, stats)
             
             optimized = {
                 'title': self._optimize_title(title, target_keyword, analysis),
-                'content': self._optimize_content(content, target_keyword, target_keywords, analysis),
+                'content': self._optimize_content(content, target_keyword, target_keywords, analysis, parsed),
                 'meta_description': self._optimize_meta_description(meta_description, target_keyword, content)
             }
             
@@ -505,7 +718,8 @@ class SEOOptimizer:
         
         return optimized_title
     
-    def _optimize_content(self, content: str, target_keyword: str, target_keywords: List[str], analysis: SEOAnalysis) -> str:
+    def _optimize_content(self, content: str, target_keyword: str, target_keywords: List[str], analysis: SEOAnalysis,
+                          parsed: Optional[ParsedArticle] = None) -> str:
         """コンテンツ最適化"""
         optimized_content = content
         
@@ -518,7 +732,9 @@ class SEOOptimizer:
         # 見出し構造の改善
         if analysis.heading_structure_score < 70:
             # H2見出しが少ない場合の対応
-            if len(re.findall(r'^## (.+)', content, re.MULTILINE)) < 3:
+            if parsed is None:
+                parsed = parse_article(content)
+            if len(parsed.headings_at(2)) < 3:
                 # 適切な位置に見出しを提案（実装は簡略化）
                 pass
         
@@ -693,6 +909,64 @@ class SEOOptimizer:
         except Exception as e:
             logger.error(f"レポート保存エラー: {e}")
 
+# analyze_articles のワーカープロセスで使うインスタンス
+_worker_optimizer: Optional[SEOOptimizer] = None
+
+def _init_worker(optimizer: SEOOptimizer):
+    """ワーカープロセスの初期化（呼び出し元と同じ閾値を使い、記事ごとのINFOログは出さない）"""
+    global _worker_optimizer
+    logger.setLevel(logging.WARNING)
+    _worker_optimizer = optimizer
+
+def _chunked(items: Iterator, size: int) -> Iterator[List]:
+    """size件ずつのリストに分ける"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _article_job(index: int, article: Any) -> Tuple[int, str, Any]:
+    """
+    記事をワーカーに送れる形にする
+    
+    Returns:
+        (入力順, 識別子, JSONファイルのパス or 分析の引数のタプル)
+    """
+    if isinstance(article, str):
+        return index, article, article
+    
+    get = article.get if isinstance(article, dict) else lambda key, default=None: getattr(article, key, default)
+    keywords = list(get('keywords') or [])
+    target_keyword = get('target_keyword') or (keywords[0] if keywords else "")
+    article_id = get('id') or get('url') or get('title') or str(index)
+    return index, str(article_id), (
+        get('title') or "",
+        get('content') or "",
+        get('meta_description') or "",
+        target_keyword,
+        keywords[1:]
+    )
+
+def _analyze_chunk(chunk: List[Tuple[int, str, Any]],
+                   optimizer: Optional[SEOOptimizer] = None) -> List[Tuple[int, str, SEOAnalysis]]:
+    """チャンク内の記事を分析（ワーカープロセスで実行）"""
+    optimizer = optimizer or _worker_optimizer or SEOOptimizer()
+    results = []
+    for index, article_id, job in chunk:
+        try:
+            if isinstance(job, str):
+                with open(job, 'r', encoding='utf-8') as f:
+                    job = _article_job(index, json.load(f))[2]
+            analysis = optimizer.analyze_article(*job)
+        except Exception as e:
+            analysis = SEOAnalysis(0, 0, 0, 0, 0, 0, 0, 0, [], [f"分析エラー: {e}"])
+        results.append((index, article_id, analysis))
+    return results
+
 def main():
     """メイン実行関数"""
     logging.basicConfig(level=logging.INFO)
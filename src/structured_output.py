@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+構造化出力モジュール
+記事をJSONで生成させるためのスキーマとプロバイダーごとの指定（OpenAI response_format・
+Anthropic tool・Ollama format）、途中で切れた・少し崩れたJSONを復元するストリーミング解析器を提供する
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 記事のJSONスキーマ（OpenAIのstrictモードに合わせ、全項目必須・追加項目なし）
+ARTICLE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string", "description": "記事タイトル（50文字以内）"},
+        "summary": {"type": "string", "description": "記事の概要（120文字程度）"},
+        "content": {"type": "string", "description": "Markdown形式の本文"},
+        "tags": {"type": "array", "items": {"type": "string"}, "description": "タグ（3〜5個）"},
+        "category": {"type": "string", "description": "カテゴリ名"}
+    },
+    "required": ["title", "summary", "content", "tags", "category"],
+    "additionalProperties": False
+}
+
+ARTICLE_TOOL_NAME = "write_article"
+
+# response_format: json_schema に対応するOpenAIモデル（前方一致）
+OPENAI_JSON_SCHEMA_MODELS = ("gpt-4o", "gpt-4.1", "o1", "o3", "o4")
+# response_format: json_object のみ対応するモデル
+OPENAI_JSON_OBJECT_MODELS = ("gpt-4-turbo", "gpt-4-1106", "gpt-4-0125", "gpt-3.5-turbo")
+
+# 本文がこの文字数未満なら記事として使わない
+MIN_CONTENT_CHARS = 200
+
+def openai_response_format(model: str, schema: Dict = ARTICLE_SCHEMA,
+                           name: str = "article") -> Optional[Dict]:
+    """
+    OpenAI Chat Completionsの response_format
+
+    Args:
+        model: モデル名
+        schema: JSONスキーマ
+        name: スキーマ名
+
+    Returns:
+        response_format（対応していないモデルはNone）
+    """
+    if model.startswith(OPENAI_JSON_SCHEMA_MODELS):
+        return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+    if model.startswith(OPENAI_JSON_OBJECT_MODELS):
+        return {"type": "json_object"}
+    return None
+
+def anthropic_tool_params(schema: Dict = ARTICLE_SCHEMA, name: str = ARTICLE_TOOL_NAME) -> Dict:
+    """
+    Anthropic Messages APIでツール呼び出しとしてJSONを返させる引数（tools・tool_choice）
+
+    Args:
+        schema: JSONスキーマ
+        name: ツール名
+
+    Returns:
+        messages.create() に渡すキーワード引数
+    """
+    return {
+        "tools": [{"name": name, "description": "生成した記事を登録する", "input_schema": schema}],
+        "tool_choice": {"type": "tool", "name": name}
+    }
+
+def feed_anthropic_stream(events: Iterable[Any], tool_parser: "JSONRepairParser",
+                          text_parser: Optional["JSONRepairParser"] = None,
+                          name: str = ARTICLE_TOOL_NAME) -> Optional[str]:
+    """
+    Anthropicのストリーミング応答（stream=True）を解析器に流し込む
+
+    ツール呼び出しの入力は input_json_delta の断片としてしか届かず、max_tokensで途切れると
+    完成した入力は得られないため、断片をそのまま tool_parser に渡して途中までを復元できるようにする。
+
+    Args:
+        events: messages.create(stream=True) のイベント
+        tool_parser: ツール（name）の入力の断片を受け取る解析器
+        text_parser: 本文の断片を受け取る解析器（ツールを使わずにJSONを返した場合用、Noneで捨てる）
+        name: ツール名
+
+    Returns:
+        stop_reason（受信できなかった場合はNone）
+    """
+    tool_blocks = set()
+    stop_reason = None
+    for event in events:
+        event_type = getattr(event, 'type', None)
+        if event_type == "content_block_start":
+            block = event.content_block
+            if getattr(block, 'type', None) == "tool_use" and getattr(block, 'name', None) == name:
+                tool_blocks.add(event.index)
+        elif event_type == "content_block_delta":
+            delta = event.delta
+            if delta.type == "input_json_delta" and event.index in tool_blocks:
+                tool_parser.feed(delta.partial_json)
+            elif delta.type == "text_delta" and text_parser is not None:
+                text_parser.feed(delta.text)
+        elif event_type == "message_delta":
+            stop_reason = getattr(event.delta, 'stop_reason', None) or stop_reason
+    return stop_reason
+
+def ollama_format(schema: Dict = ARTICLE_SCHEMA) -> Dict:
+    """Ollama /api/generate の format（JSONスキーマによる構造化出力）"""
+    return schema
+
+class JSONRepairParser:
+    """途中で切れた・少し崩れたJSONを復元するストリーミング解析器
+
+    feed()で受け取った文字を1回だけ走査し、value()で「ここまでの入力を閉じたJSON」を返す。
+    次の崩れに対応する:
+    - 前後の説明文・コードフェンス（最初の { または [ から、対応する閉じ括弧まで）
+    - 文字列中の生の改行・タブ
+    - 末尾のカンマ
+    - Pythonのリテラル（True / False / None）、引用符の無い値（空白を含んでよい。カンマ・閉じ括弧・改行まで）
+    - 途中で切れた入力（値の途中の文字列は閉じて残し、キーの途中などは直前の区切りまで戻す）
+    """
+
+    _CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+    _LITERALS = {"True": "true", "False": "false", "None": "null"}
+    _NUMBER_RE = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?$")
+
+    def __init__(self):
+        self._out: List[str] = []
+        self._stack: List[List] = []  # [括弧, 状態]（状態: key, colon, value, comma）
+        self._started = False
+        self._done = False
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._scalar: List[str] = []
+        self._safe = 0  # ここまでの出力なら閉じ括弧を足すだけで有効なJSONになる
+        self.received = 0
+
+    @property
+    def complete(self) -> bool:
+        """最上位の値が閉じたか"""
+        return self._done
+
+    def feed(self, chunk: str):
+        """入力を追加"""
+        self.received += len(chunk)
+        for char in chunk:
+            if self._done:
+                return
+            if not self._started:
+                if char in "{[":
+                    self._started = True
+                    self._open(char)
+                continue
+            if self._in_string:
+                self._string_char(char)
+            elif self._scalar and char not in ",}]\r\n":
+                self._scalar.append(char)
+            else:
+                if self._scalar:
+                    self._end_scalar()
+                self._structural(char)
+
+    def _open(self, char: str):
+        self._out.append(char)
+        self._stack.append([char, "key" if char == "{" else "value"])
+        self._safe = len(self._out)
+
+    def _value_done(self):
+        if self._stack:
+            self._stack[-1][1] = "comma"
+            self._safe = len(self._out)
+        else:
+            self._done = True
+
+    def _string_char(self, char: str):
+        if self._escape:
+            self._out.append(char)
+            self._escape = False
+        elif char == "\\":
+            self._out.append(char)
+            self._escape = True
+        elif char == '"':
+            self._out.append(char)
+            self._in_string = False
+            if self._string_is_key:
+                self._stack[-1][1] = "colon"
+            else:
+                self._value_done()
+        else:
+            self._out.append(self._CONTROL_ESCAPES.get(char, char))
+
+    def _structural(self, char: str):
+        top = self._stack[-1]
+        if char in " \t\r\n":
+            self._out.append(char)
+        elif char in "{[":
+            self._open(char)
+        elif char in "}]":
+            self._strip_trailing_comma()
+            self._out.append("}" if top[0] == "{" else "]")
+            self._stack.pop()
+            self._value_done()
+        elif char == '"':
+            self._out.append(char)
+            self._in_string = True
+            self._string_is_key = top[0] == "{" and top[1] == "key"
+        elif char == ":":
+            self._out.append(char)
+            top[1] = "value"
+        elif char == ",":
+            self._strip_trailing_comma()
+            self._out.append(char)
+            top[1] = "key" if top[0] == "{" else "value"
+            self._safe = len(self._out)
+        else:
+            self._scalar.append(char)
+
+    def _end_scalar(self):
+        token = "".join(self._scalar).rstrip()
+        self._scalar = []
+        token = self._LITERALS.get(token, token)
+        if token not in ("true", "false", "null") and not self._NUMBER_RE.match(token):
+            # 引用符の無い値は文字列として扱う
+            token = json.dumps(token, ensure_ascii=False)
+        self._out.append(token)
+        self._value_done()
+
+    def _strip_trailing_comma(self):
+        index = len(self._out) - 1
+        while index >= 0 and self._out[index] in (" ", "\t", "\r", "\n"):
+            index -= 1
+        if index >= 0 and self._out[index] == ",":
+            del self._out[index]
+
+    def value(self) -> Optional[Any]:
+        """
+        ここまでの入力から復元した値
+
+        Returns:
+            dict / list（まだ何も復元できなければNone）
+        """
+        if not self._started:
+            return None
+
+        out = list(self._out)
+        stack = [entry[0] for entry in self._stack]
+        if not self._done:
+            if self._in_string and not self._string_is_key:
+                # 値の文字列は切れた所までを残す（途中のエスケープは捨てる）
+                if self._escape:
+                    out.pop()
+                text = "".join(out)
+                text = re.sub(r"\\u[0-9a-fA-F]{0,3}$", "", text)
+                out = [text, '"']
+            elif self._scalar:
+                token = "".join(self._scalar).rstrip()
+                token = self._LITERALS.get(token, token)
+                if token in ("true", "false", "null") or self._NUMBER_RE.match(token):
+                    out.append(token)
+                else:
+                    out = out[:self._safe]
+            elif self._in_string or (self._stack[-1][0] == "{" and self._stack[-1][1] in ("colon", "value")):
+                out = out[:self._safe]
+
+        text = "".join(out).rstrip()
+        if text.endswith(","):
+            text = text[:-1]
+        if not self._done:
+            text += "".join("}" if bracket == "{" else "]" for bracket in reversed(stack))
+
+        try:
+            return json.loads(text)
+        except ValueError as e:
+            logger.debug(f"JSON復元に失敗: {e}")
+            return None
+
+def parse_json_tolerant(text: str) -> Optional[Any]:
+    """
+    JSONを解析（失敗した場合は崩れを補正して復元）
+
+    Args:
+        text: モデルの出力
+
+    Returns:
+        解析結果（復元できなければNone）
+    """
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+
+    parser = JSONRepairParser()
+    parser.feed(text)
+    return parser.value()
+
+def normalize_article(data: Any, topic: str = "") -> Tuple[Optional[Dict], List[str]]:
+    """
+    復元したJSONを記事データとして整える
+
+    本文が使える長さであれば、欠けた項目（タイトル・概要・タグ・カテゴリ）は本文やトピックから補う。
+
+    Args:
+        data: 解析結果
+        topic: 記事のトピック（補完に使用）
+
+    Returns:
+        (記事データ or None, 補完した項目のリスト)
+    """
+    if not isinstance(data, dict):
+        return None, []
+
+    content = data.get("content")
+    if not isinstance(content, str) or len(content.strip()) < MIN_CONTENT_CHARS:
+        return None, []
+
+    article = dict(data)
+    article["content"] = content.strip()
+    filled = []
+
+    title = article.get("title")
+    if not isinstance(title, str) or not title.strip():
+        match = re.search(r"^#\s+(.+)$", content, re.MULTILINE)
+        article["title"] = match.group(1).strip() if match else f"{topic}について徹底解説"
+        filled.append("title")
+    else:
+        article["title"] = title.strip()
+
+    summary = article.get("summary")
+    if not isinstance(summary, str) or not summary.strip():
+        paragraphs = [p.strip() for p in content.split("\n\n") if p.strip() and not p.lstrip().startswith("#")]
+        article["summary"] = paragraphs[0][:120] if paragraphs else article["title"]
+        filled.append("summary")
+
+    tags = article.get("tags")
+    if isinstance(tags, str):
+        tags = [tag.strip() for tag in re.split(r"[,、]", tags) if tag.strip()]
+    if not isinstance(tags, list) or not tags:
+        tags = [topic] if topic else []
+        filled.append("tags")
+    article["tags"] = [str(tag) for tag in tags]
+
+    category = article.get("category")
+    if not isinstance(category, str) or not category.strip():
+        article["category"] = topic
+        filled.append("category")
+
+    return article, filled
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+テキスト分割モジュール
+日本語・英語混在の記事本文を、外部ライブラリ（NLTKのpunkt等）を使わずに文・単語へ分割する
+"""
+
+import re
+from typing import List
+
+# 文末記号（連続する記号と直後の閉じ括弧・引用符は同じ文に含める）
+_SENTENCE_END_RE = re.compile(r'[。！？!?．…]+[」』）)\]"\'”’]*|\.+[」』）)\]"\'”’]*|\n')
+
+# ピリオドの後に文が続かない略語（小文字で比較）
+ABBREVIATIONS = frozenset({
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "inc", "ltd", "co", "corp", "no", "vol", "fig", "approx", "jan", "feb", "mar",
+    "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+})
+
+# 単語: 英数字（内部の ' - . を含む）、漢字、ひらがな、カタカナ（長音含む）、半角カナの連続
+_WORD_RE = re.compile(
+    r"[A-Za-z0-9Ａ-Ｚａ-ｚ０-９]+(?:['’\-.][A-Za-z0-9Ａ-Ｚａ-ｚ０-９]+)*"
+    r"|[一-鿿㐀-䶿々〆ヵヶ]+"
+    r"|[ぁ-ゖゝゞ]+"
+    r"|[ァ-ヺー・ヽヾ]+"
+    r"|[ｦ-ﾟ]+"
+)
+
+_ABBREVIATION_RE = re.compile(r"([A-Za-z][A-Za-z.]*)$")
+
+# 閉じ括弧の直後にこれらが続く場合は引用の途中（「はい。」と言った）
+_QUOTATIVE_PARTICLES = ("と", "って")
+
+def split_sentences(text: str) -> List[str]:
+    """
+    文に分割
+
+    文末記号（。！？!?．…）と改行で区切り、英語のピリオドは次の場合には区切らない:
+    - 直後が空白・改行・文末以外（小数 3.14、URL、ドメイン名など）
+    - 略語（Mr. / e.g. など）や1文字のイニシャルの後
+
+    「〜。」と のように、閉じ括弧の直後に引用の助詞が続く場合も区切らない。
+    見出しや箇条書きは行ごとに1文として扱う。
+
+    Args:
+        text: 本文
+
+    Returns:
+        前後の空白を除いた文のリスト（空の文は含まない）
+    """
+    sentences = []
+    start = 0
+    length = len(text)
+    for match in _SENTENCE_END_RE.finditer(text):
+        end = match.end()
+        if text[match.start()] == "." and not _is_period_boundary(text, match.start(), end, length):
+            continue
+        if text[end - 1] in "」』" and text.startswith(_QUOTATIVE_PARTICLES, end):
+            continue
+        sentence = text[start:end].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = end
+
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+def _is_period_boundary(text: str, period: int, end: int, length: int) -> bool:
+    """英語のピリオドが文末か"""
+    if end < length and not text[end].isspace():
+        return False
+    word = _ABBREVIATION_RE.search(text, max(0, period - 12), period)
+    if word:
+        token = word.group(1).lower()
+        if token in ABBREVIATIONS or (len(token) == 1 and token.isalpha()):
+            return False
+    return True
+
+def tokenize_words(text: str) -> List[str]:
+    """
+    単語に分割
+
+    英数字はまとまり（GPT-4o、3.5、don't）ごと、日本語は文字種（漢字・ひらがな・カタカナ）が
+    変わる位置で区切る。記号・空白は含まない。
+
+    Args:
+        text: 本文
+
+    Returns:
+        単語のリスト
+    """
+    return _WORD_RE.findall(text)
+
+def count_words(text: str) -> int:
+    """単語数（tokenize_words の件数）"""
+    return sum(1 for _ in _WORD_RE.finditer(text))
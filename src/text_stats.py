@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+テキスト統計モジュール
+文字数・小文字化テキスト・キーワード出現数・文/段落分割などを記事ごとに1度だけ計算して共有する
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from article_parser import META_PREFIX, ParsedArticle, parse_article
+from keyword_matcher import get_matcher
+from text_segmenter import split_sentences, tokenize_words
+
+@dataclass
+class KeywordPlacement:
+    """キーワードの出現位置の分析"""
+    count: int
+    first_position: int  # 最初の出現位置（出現しなければ-1）
+    in_first_paragraph: bool
+    heading_count: int  # キーワードを含む見出し行の数
+
+class TextStats:
+    """記事本文の統計（各値は初回アクセス時に計算してキャッシュする）
+
+    生成→SEO最適化→SEO分析の各段で同じインスタンスを受け渡し、
+    同じ本文を何度も走査しないようにする。
+    """
+
+    def __init__(self, text: str):
+        """
+        初期化
+
+        Args:
+            text: 記事本文
+        """
+        self.text = text
+        self._keyword_positions: Dict[str, List[int]] = {}
+
+    @classmethod
+    def of(cls, text: str, stats: Optional['TextStats'] = None) -> 'TextStats':
+        """
+        既存の統計が同じ本文のものなら再利用し、そうでなければ新しく作る
+
+        Args:
+            text: 記事本文
+            stats: 受け渡された統計（None可）
+
+        Returns:
+            TextStats
+        """
+        if stats is not None and (stats.text is text or stats.text == text):
+            return stats
+        return cls(text)
+
+    @cached_property
+    def lower(self) -> str:
+        """小文字化した本文"""
+        return self.text.lower()
+
+    @cached_property
+    def length(self) -> int:
+        """文字数（空白込み）"""
+        return len(self.text)
+
+    @cached_property
+    def char_count(self) -> int:
+        """空白を除いた文字数"""
+        return len(self.text) - self.text.count(' ')
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        """文のリスト（日本語・英語の文末記号と改行で分割）"""
+        return split_sentences(self.text)
+
+    @cached_property
+    def sentence_count(self) -> int:
+        """文の数"""
+        return len(self.sentences)
+
+    @cached_property
+    def words(self) -> List[str]:
+        """単語のリスト（英数字のまとまり・日本語の文字種ごと）"""
+        return tokenize_words(self.text)
+
+    @cached_property
+    def paragraphs(self) -> List[str]:
+        """段落のリスト（空行区切り）"""
+        return [p.strip() for p in self.text.split('\n\n') if p.strip()]
+
+    @cached_property
+    def parsed(self) -> ParsedArticle:
+        """見出し・リンク・画像などの構造"""
+        return parse_article(self.text)
+
+    @cached_property
+    def _layout(self) -> Tuple[List[int], List[int], Tuple[int, int]]:
+        """見出し行の開始・終了位置と、最初の段落（見出し・メタ情報以外）の範囲"""
+        heading_starts: List[int] = []
+        heading_ends: List[int] = []
+        first_paragraph = None
+        paragraph_end = None
+        meta_prefix = META_PREFIX.lower()
+        offset = 0
+        for line in self.lower.split('\n'):
+            end = offset + len(line)
+            stripped = line.strip()
+            if line.startswith('#'):
+                heading_starts.append(offset)
+                heading_ends.append(end)
+                if first_paragraph is not None and paragraph_end is None:
+                    paragraph_end = offset
+            elif not stripped:
+                if first_paragraph is not None and paragraph_end is None:
+                    paragraph_end = offset
+            elif first_paragraph is None and not stripped.startswith(meta_prefix):
+                first_paragraph = offset
+            offset = end + 1
+
+        if first_paragraph is None:
+            return heading_starts, heading_ends, (0, 0)
+        return heading_starts, heading_ends, (first_paragraph, paragraph_end or len(self.lower))
+
+    def keyword_positions(self, keywords: Iterable[str]) -> Dict[str, List[int]]:
+        """
+        複数キーワードの出現位置（まだ求めていないキーワードだけを本文の1回の走査でまとめて求める）
+
+        Args:
+            keywords: キーワード（大文字小文字を区別しない）
+
+        Returns:
+            {キーワード: 小文字化した本文（lower）での開始位置のリスト}
+        """
+        keywords = list(keywords)
+        missing = [k for k in keywords if k and k.lower() not in self._keyword_positions]
+        if missing:
+            self._keyword_positions.update(get_matcher(missing).find_all(self.lower))
+        return {keyword: self._keyword_positions.get(keyword.lower(), []) for keyword in keywords}
+
+    def keyword_counts(self, keywords: Iterable[str]) -> Dict[str, int]:
+        """
+        複数キーワードの出現回数
+
+        Args:
+            keywords: キーワード（大文字小文字を区別しない）
+
+        Returns:
+            {キーワード: 出現回数}
+        """
+        return {keyword: len(hits) for keyword, hits in self.keyword_positions(keywords).items()}
+
+    def keyword_count(self, keyword: str) -> int:
+        """
+        キーワードの出現回数（大文字小文字を区別しない）
+
+        Args:
+            keyword: キーワード
+
+        Returns:
+            出現回数
+        """
+        return len(self.keyword_positions([keyword])[keyword])
+
+    def keyword_placement(self, keywords: Iterable[str]) -> Dict[str, KeywordPlacement]:
+        """
+        キーワードの配置（最初の段落・見出しに含まれるか）
+
+        Args:
+            keywords: キーワード
+
+        Returns:
+            {キーワード: KeywordPlacement}
+        """
+        heading_starts, heading_ends, (paragraph_start, paragraph_end) = self._layout
+        placements = {}
+        for keyword, hits in self.keyword_positions(keywords).items():
+            headings = set()
+            for start in hits:
+                line = bisect_right(heading_starts, start) - 1
+                if line >= 0 and start + len(keyword) <= heading_ends[line]:
+                    headings.add(line)
+            placements[keyword] = KeywordPlacement(
+                count=len(hits),
+                first_position=hits[0] if hits else -1,
+                in_first_paragraph=any(paragraph_start <= start < paragraph_end for start in hits),
+                heading_count=len(headings)
+            )
+        return placements
+
+    def keyword_density(self, keyword: str) -> float:
+        """
+        キーワード密度（%）
+
+        Args:
+            keyword: キーワード
+
+        Returns:
+            出現回数 / 空白を除いた文字数 * 100
+        """
+        return self.keyword_count(keyword) / max(self.char_count, 1) * 100
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+トークン予算モジュール
+モデルごとの「1トークンあたりの文字数」を実際の生成結果から学習し、
+目標文字数に見合ったmax_tokensをリクエストごとに決める
+"""
+
+import json
+import logging
+import math
+import os
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 日本語の記事本文はおおむね1文字≒1トークン
+DEFAULT_CHARS_PER_TOKEN = 1.0
+
+# モデルごとの出力トークン上限（前方一致、長いものを優先）
+MODEL_OUTPUT_LIMITS = {
+    "gpt-4o": 16384,
+    "gpt-4-turbo": 4096,
+    "gpt-4": 4096,
+    "gpt-3.5-turbo": 4096,
+    "claude-3-5": 8192,
+    "claude-3-7": 8192,
+    "claude-3": 4096,
+}
+DEFAULT_OUTPUT_LIMIT = 4096
+
+def model_output_limit(model: str) -> int:
+    """モデルの出力トークン上限"""
+    for prefix in sorted(MODEL_OUTPUT_LIMITS, key=len, reverse=True):
+        if model.startswith(prefix):
+            return MODEL_OUTPUT_LIMITS[prefix]
+    return DEFAULT_OUTPUT_LIMIT
+
+def join_continuation(text: str, addition: str, max_overlap: int = 200) -> str:
+    """
+    途中で切れた出力に続きを結合（続きの先頭で繰り返された部分は除く）
+
+    Args:
+        text: これまでの出力
+        addition: 続きの出力
+        max_overlap: 重複を探す最大文字数
+
+    Returns:
+        結合したテキスト
+    """
+    if not addition:
+        return text
+
+    limit = min(max_overlap, len(text), len(addition))
+    for size in range(limit, 0, -1):
+        if text.endswith(addition[:size]):
+            return text + addition[size:]
+    return text + addition
+
+class TokenBudgetEstimator:
+    """モデルごとの文字数/トークン比を学習してmax_tokensを見積もる"""
+
+    def __init__(self,
+                 state_path: Optional[str] = None,
+                 smoothing: float = 0.2,
+                 headroom: float = 1.3,
+                 min_tokens: int = 256):
+        """
+        初期化
+
+        Args:
+            state_path: 学習結果を保存するJSONファイル（Noneで保存しない）
+            smoothing: 指数移動平均の重み（新しい観測値の比率）
+            headroom: 見積もりに掛ける余裕率
+            min_tokens: max_tokensの下限
+        """
+        self.state_path = state_path
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.min_tokens = min_tokens
+
+        self._ratios: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.truncations = 0
+        self.continuations = 0
+
+        if state_path:
+            self._load()
+
+    def chars_per_token(self, model: str) -> float:
+        """学習済みの文字数/トークン比（未学習ならデフォルト値）"""
+        with self._lock:
+            return self._ratios.get(model, DEFAULT_CHARS_PER_TOKEN)
+
+    def record(self, model: str, chars: int, output_tokens: Optional[int]):
+        """
+        生成結果を記録して比率を更新
+
+        Args:
+            model: モデル名
+            chars: 生成された文字数
+            output_tokens: 出力トークン数（APIが返さない場合はNone）
+        """
+        if not output_tokens or chars <= 0:
+            return
+
+        ratio = chars / output_tokens
+        with self._lock:
+            current = self._ratios.get(model)
+            if current is None:
+                self._ratios[model] = ratio
+            else:
+                self._ratios[model] = current + self.smoothing * (ratio - current)
+            self._samples[model] = self._samples.get(model, 0) + 1
+
+        if self.state_path:
+            self._save()
+
+    def record_truncation(self):
+        """出力上限で途切れた生成を記録"""
+        with self._lock:
+            self.truncations += 1
+
+    def record_continuation(self):
+        """続きの生成を記録"""
+        with self._lock:
+            self.continuations += 1
+
+    def budget(self, model: str, target_chars: int, ceiling: Optional[int] = None) -> int:
+        """
+        目標文字数に必要なmax_tokensを見積もる
+
+        Args:
+            model: モデル名
+            target_chars: 生成させたい最大文字数
+            ceiling: 上限（Noneでモデルの出力上限）
+
+        Returns:
+            max_tokens
+        """
+        ceiling = ceiling or model_output_limit(model)
+        tokens = math.ceil(target_chars / self.chars_per_token(model) * self.headroom)
+        return max(min(self.min_tokens, ceiling), min(tokens, ceiling))
+
+    def stats(self) -> Dict:
+        """モデルごとの学習状況"""
+        with self._lock:
+            return {
+                'models': {
+                    model: {'chars_per_token': round(ratio, 3), 'samples': self._samples.get(model, 0)}
+                    for model, ratio in self._ratios.items()
+                },
+                'truncations': self.truncations,
+                'continuations': self.continuations
+            }
+
+    def _load(self):
+        """保存済みの学習結果を読み込む"""
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            for model, entry in state.get('models', {}).items():
+                self._ratios[model] = float(entry['chars_per_token'])
+                self._samples[model] = int(entry.get('samples', 0))
+        except Exception as e:
+            logger.warning(f"トークン予算の読み込みエラー: {e}")
+
+    def _save(self):
+        """学習結果を保存（一時ファイルに書いてから置き換える）"""
+        with self._lock:
+            state = {
+                'models': {
+                    model: {'chars_per_token': ratio, 'samples': self._samples.get(model, 0)}
+                    for model, ratio in self._ratios.items()
+                }
+            }
+            try:
+                directory = os.path.dirname(self.state_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.state_path}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.state_path)
+            except Exception as e:
+                logger.warning(f"トークン予算の保存エラー: {e}")
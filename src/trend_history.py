@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+トレンド履歴モジュール
+Google Trendsの検索推移（interest_over_time）とKeywordDataのスナップショットを
+日付でパーティション分割したParquetに蓄積し、古いデータは日次・週次に間引く
+"""
+
+import glob
+import logging
+import os
+import re
+import time
+import uuid
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from keyword_scoring import interest_matrix, score_keywords
+
+logger = logging.getLogger(__name__)
+
+INTEREST_TABLE = "interest"
+SNAPSHOT_TABLE = "snapshots"
+
+# Google Trendsの期間指定に対応する日数
+TIMEFRAME_DAYS = {
+    'now 1-H': 1 / 24,
+    'now 4-H': 4 / 24,
+    'now 1-d': 1,
+    'now 7-d': 7,
+    'today 1-m': 30,
+    'today 3-m': 90,
+    'today 12-m': 365,
+    'today 5-y': 5 * 365,
+}
+
+# 時点の日付のパーティション（間引き済み）と、取得日のパーティション（未整理の取得結果）
+DATE_PARTITION = "date"
+FETCH_PARTITION = "fetch"
+
+_PARTITION_RE = re.compile(r"(date|fetch)=(\d{4}-\d{2}-\d{2})$")
+
+class TrendHistoryStore:
+    """日付パーティションのParquetによるトレンド履歴
+
+    検索推移は (timestamp, keyword, value, timeframe, geo, resolution, fetched_at) の縦持ちで、
+    取得ごとに1ファイルを data/trend_history/interest/fetch=取得日/part-*.parquet に書く
+    （1回の取得は最大数年分の時点を含むため、時点の日付で分けると取得のたびに数十〜数百ファイルになる）。
+    取得日からdaily_after_days日を過ぎたものは、downsampleで時点の日付のパーティション
+    interest/date=YYYY-MM-DD/ に移して日次平均に、weekly_after_days日より古い時点は週次平均に間引く。
+    値はGoogle Trendsが返した換算前の値（同じペイロードのキーワード間で比較できる）で、
+    トレンドの計算時にキーワードごとに換算する。同じ時点を複数回取得した場合は新しい取得を優先する。
+    """
+
+    def __init__(self,
+                 root: str = "data/trend_history",
+                 daily_after_days: int = 14,
+                 weekly_after_days: int = 180):
+        """
+        初期化
+
+        Args:
+            root: 保存先ディレクトリ
+            daily_after_days: 日次に間引くまでの日数
+            weekly_after_days: 週次に間引くまでの日数
+        """
+        self.root = root
+        self.daily_after_days = daily_after_days
+        self.weekly_after_days = weekly_after_days
+        os.makedirs(root, exist_ok=True)
+
+    def append_interest(self, interest_over_time: pd.DataFrame, timeframe: str, geo: str,
+                        fetched_at: Optional[datetime] = None) -> int:
+        """
+        検索推移を追加
+
+        Args:
+            interest_over_time: pytrendsのinterest_over_time（行: 日時、列: キーワード）
+            timeframe: 取得時の期間指定
+            geo: 地域
+            fetched_at: 取得日時（Noneで現在）
+
+        Returns:
+            追加した行数
+        """
+        if interest_over_time is None or interest_over_time.empty:
+            return 0
+
+        # 検索ボリュームの判定に使うため、ペイロード内の換算前の値のまま保存する
+        wide = interest_matrix(interest_over_time, normalize=False)
+        index = pd.to_datetime(wide.index)
+        wide.index = index.tz_localize(None) if index.tz is not None else index
+        frame = (wide.rename_axis("timestamp").reset_index()
+                 .melt(id_vars="timestamp", var_name="keyword", value_name="value")
+                 .dropna(subset=["value"]))
+        frame["timeframe"] = timeframe
+        frame["geo"] = geo
+        frame["resolution"] = "raw"
+        fetched_at = pd.Timestamp(fetched_at or datetime.now())
+        frame["fetched_at"] = fetched_at
+
+        self._write_file(self._partition_dir(INTEREST_TABLE, fetched_at.date(), FETCH_PARTITION), frame)
+        return len(frame)
+
+    def append_snapshots(self, keyword_data_list: Iterable, snapshot_at: Optional[datetime] = None) -> int:
+        """
+        スコアリング済みのKeywordDataを保存
+
+        Args:
+            keyword_data_list: KeywordDataのイテラブル
+            snapshot_at: 保存日時（Noneで現在）
+
+        Returns:
+            保存した件数
+        """
+        rows = [asdict(keyword_data) for keyword_data in keyword_data_list]
+        if not rows:
+            return 0
+
+        frame = pd.DataFrame(rows)
+        snapshot_at = pd.Timestamp(snapshot_at or datetime.now())
+        frame["snapshot_at"] = snapshot_at
+        self._write_file(self._partition_dir(SNAPSHOT_TABLE, snapshot_at.date()), frame)
+        return len(frame)
+
+    def interest(self,
+                 keywords: Optional[List[str]] = None,
+                 start: Optional[datetime] = None,
+                 end: Optional[datetime] = None,
+                 geo: Optional[str] = None,
+                 timeframe: Optional[str] = None) -> pd.DataFrame:
+        """
+        検索推移の履歴（横持ち）
+
+        Args:
+            keywords: キーワード（Noneで全て）
+            start: 開始日時
+            end: 終了日時
+            geo: 地域（Noneで全て）
+            timeframe: 取得時の期間指定（Noneで全て）
+
+        Returns:
+            行: 日時、列: キーワードのDataFrame
+        """
+        frame = self._latest_points(keywords, start, end, geo, timeframe)
+        if frame.empty:
+            return pd.DataFrame()
+        return frame.pivot(index="timestamp", columns="keyword", values="value").sort_index()
+
+    def latest_fetch(self, keywords: List[str], since: Optional[datetime] = None,
+                     timeframe: Optional[str] = None) -> pd.Series:
+        """
+        キーワードごとの最終取得日時
+
+        Args:
+            keywords: キーワード
+            since: この日時以降の時点を持つデータだけを見る
+            timeframe: この期間指定で取得したデータだけを見る（Noneで全て）
+
+        Returns:
+            {キーワード: 最終取得日時} のSeries（履歴が無いキーワードは含まない）
+        """
+        frame = self._read(INTEREST_TABLE, keywords, start=since, columns=["keyword", "fetched_at", "timeframe"])
+        if timeframe is not None and not frame.empty:
+            frame = frame[frame["timeframe"] == timeframe]
+        if frame.empty:
+            return pd.Series(dtype="datetime64[ns]")
+        return frame.groupby("keyword")["fetched_at"].max()
+
+    def score(self,
+              keywords: Optional[List[str]] = None,
+              volume_days: float = 90,
+              trend_days: float = 7,
+              geo: Optional[str] = None,
+              now: Optional[datetime] = None,
+              volume_timeframe: Optional[str] = None,
+              trend_timeframe: Optional[str] = None) -> pd.DataFrame:
+        """
+        履歴からキーワードをスコアリング（Google Trendsには問い合わせない）
+
+        Google Trendsの値は取得ごとに期間内の最大値を100として換算されるため、期間指定の異なる
+        取得結果は混ぜずに、検索ボリュームとトレンドをそれぞれの期間指定の取得結果から計算する。
+
+        Args:
+            keywords: キーワード（Noneで全て）
+            volume_days: 検索ボリュームの算出に使う日数
+            trend_days: トレンドスコアの算出に使う日数
+            geo: 地域
+            now: 基準日時（Noneで現在）
+            volume_timeframe: 検索ボリュームに使う取得時の期間指定（Noneで全ての取得結果）
+            trend_timeframe: トレンドに使う取得時の期間指定（Noneで検索ボリュームと同じデータの直近分）
+
+        Returns:
+            keyword_scoring.score_keywords の結果
+        """
+        now = now or datetime.now()
+        volume = self.interest(keywords, start=now - timedelta(days=volume_days), end=now, geo=geo,
+                               timeframe=volume_timeframe)
+        if volume.empty:
+            return score_keywords(pd.DataFrame())
+        if trend_timeframe is None:
+            trend = volume[volume.index >= pd.Timestamp(now - timedelta(days=trend_days))]
+        else:
+            trend = self.interest(keywords, start=now - timedelta(days=trend_days), end=now, geo=geo,
+                                  timeframe=trend_timeframe).reindex(columns=volume.columns)
+        # 時間単位の直近データが検索ボリュームの平均を偏らせないよう日次平均にそろえる
+        return score_keywords(volume.resample("D").mean(), trend)
+
+    def snapshots(self,
+                  keywords: Optional[List[str]] = None,
+                  start: Optional[datetime] = None,
+                  end: Optional[datetime] = None) -> pd.DataFrame:
+        """
+        KeywordDataのスナップショット
+
+        Args:
+            keywords: キーワード（Noneで全て）
+            start: 開始日時
+            end: 終了日時
+
+        Returns:
+            KeywordDataの項目と snapshot_at を列に持つDataFrame
+        """
+        return self._read(SNAPSHOT_TABLE, keywords, start, end, key_column="main_keyword",
+                          time_column="snapshot_at")
+
+    def downsample(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        古い検索推移を日次・週次の平均に間引き、パーティション内のファイルを1つにまとめる
+
+        取得日がdaily_after_days日より前の取得結果を時点の日付のパーティションに移し
+        （その時点は全て日次に間引く範囲に入る）、続けて日次・週次に間引く。
+        間引いたパーティションは part-daily / part-weekly の1ファイルになるため、
+        再実行しても変化の無いパーティションは読み込まない。
+
+        Args:
+            now: 基準日時（Noneで現在）
+
+        Returns:
+            {'fetches': 移した取得日のパーティション数, 'partitions': 書き換えたパーティション数,
+             'rows_before': 行数, 'rows_after': 行数}
+        """
+        today = (now or datetime.now()).date()
+        daily_cutoff = today - timedelta(days=self.daily_after_days)
+        weekly_cutoff = today - timedelta(days=self.weekly_after_days)
+
+        fetches = self._partitions(INTEREST_TABLE, end=daily_cutoff - timedelta(days=1), kind=FETCH_PARTITION)
+        for _, directory in fetches:
+            files = self._files(directory)
+            frame = pd.concat([pd.read_parquet(path) for path in files], ignore_index=True)
+            for day, part in frame.groupby(frame["timestamp"].dt.date):
+                self._write_file(self._partition_dir(INTEREST_TABLE, day), part)
+            for path in files:
+                os.remove(path)
+            os.rmdir(directory)
+
+        # 間引き先ごとにパーティションをまとめる（週次は週の初日のパーティションに集約）
+        buckets: Dict[Tuple[date, str], List[str]] = {}
+        for day, directory in self._partitions(INTEREST_TABLE, end=daily_cutoff - timedelta(days=1)):
+            if day < weekly_cutoff:
+                key = (day - timedelta(days=day.weekday()), "weekly")
+            else:
+                key = (day, "daily")
+            buckets.setdefault(key, []).append(directory)
+
+        result = {'fetches': len(fetches), 'partitions': 0, 'rows_before': 0, 'rows_after': 0}
+        for (bucket_day, resolution), directories in sorted(buckets.items()):
+            files = [path for directory in directories for path in self._files(directory)]
+            target = os.path.join(self._partition_dir(INTEREST_TABLE, bucket_day), f"part-{resolution}.parquet")
+            if files == [target]:
+                continue
+
+            frame = pd.concat([pd.read_parquet(path) for path in files], ignore_index=True)
+            coarse = self._coarsen(frame, resolution)
+
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temp = f"{target}.{uuid.uuid4().hex[:8]}.tmp"
+            coarse.to_parquet(temp, index=False)
+            for path in files:
+                os.remove(path)
+            os.replace(temp, target)
+            for directory in directories:
+                if not os.listdir(directory):
+                    os.rmdir(directory)
+
+            result['partitions'] += 1
+            result['rows_before'] += len(frame)
+            result['rows_after'] += len(coarse)
+
+        if result['fetches'] or result['partitions']:
+            logger.info(f"トレンド履歴を間引きました: {result}")
+        return result
+
+    def _coarsen(self, frame: pd.DataFrame, resolution: str) -> pd.DataFrame:
+        """同じ時点の重複を除いてから、日次・週次の平均にまとめる"""
+        # 期間指定ごとに換算が異なるため、期間指定をまたいで平均しない
+        frame = (frame.sort_values("fetched_at")
+                 .drop_duplicates(["keyword", "geo", "timeframe", "timestamp"], keep="last"))
+        if resolution == "weekly":
+            bucket = frame["timestamp"].dt.to_period("W-SUN").dt.start_time
+        else:
+            bucket = frame["timestamp"].dt.floor("D")
+        coarse = (frame.assign(timestamp=bucket)
+                  .groupby(["keyword", "geo", "timeframe", "timestamp"], as_index=False)
+                  .agg(value=("value", "mean"), fetched_at=("fetched_at", "max")))
+        coarse["resolution"] = resolution
+        return coarse[["timestamp", "keyword", "value", "timeframe", "geo", "resolution", "fetched_at"]]
+
+    def _latest_points(self, keywords: Optional[List[str]], start: Optional[datetime],
+                       end: Optional[datetime], geo: Optional[str],
+                       timeframe: Optional[str] = None) -> pd.DataFrame:
+        frame = self._read(INTEREST_TABLE, keywords, start, end)
+        if frame.empty:
+            return frame
+        if geo is not None:
+            frame = frame[frame["geo"] == geo]
+        if timeframe is not None:
+            frame = frame[frame["timeframe"] == timeframe]
+        # 同じ時点は新しい取得を優先
+        return (frame.sort_values("fetched_at")
+                .drop_duplicates(["keyword", "timestamp"], keep="last"))
+
+    def _read(self, table: str, keywords: Optional[List[str]] = None,
+              start: Optional[datetime] = None, end: Optional[datetime] = None,
+              columns: Optional[List[str]] = None,
+              key_column: str = "keyword", time_column: str = "timestamp") -> pd.DataFrame:
+        """期間に該当するパーティションだけを読み、キーワード・期間で絞り込む"""
+        filters = []
+        if keywords is not None:
+            filters.append((key_column, "in", list(keywords)))
+        if start is not None:
+            filters.append((time_column, ">=", pd.Timestamp(start)))
+        if end is not None:
+            filters.append((time_column, "<=", pd.Timestamp(end)))
+        read_columns = None if columns is None else list(dict.fromkeys(columns + [key_column, time_column]))
+
+        partitions = self._partitions(table, start=start.date() if start else None, end=end.date() if end else None)
+        if table == INTEREST_TABLE:
+            # 取得日のパーティションは取得日以前の時点しか含まないため、開始日だけで絞り込める
+            partitions += self._partitions(table, start=start.date() if start else None, kind=FETCH_PARTITION)
+
+        frames = []
+        for _, directory in partitions:
+            for path in self._files(directory):
+                frame = pd.read_parquet(path, columns=read_columns, filters=filters or None)
+                if not frame.empty:
+                    frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=columns or [])
+        frame = pd.concat(frames, ignore_index=True)
+        return frame[columns] if columns else frame
+
+    @staticmethod
+    def _write_file(directory: str, frame: pd.DataFrame):
+        """パーティションに新しいファイルとして書き込む"""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet")
+        frame.to_parquet(path, index=False)
+
+    def _partition_dir(self, table: str, day: date, kind: str = DATE_PARTITION) -> str:
+        return os.path.join(self.root, table, f"{kind}={day.isoformat()}")
+
+    def _partitions(self, table: str, start: Optional[date] = None,
+                    end: Optional[date] = None, kind: str = DATE_PARTITION) -> List[Tuple[date, str]]:
+        """[start, end] に含まれるパーティション（日付順）"""
+        partitions = []
+        for directory in glob.glob(os.path.join(self.root, table, f"{kind}=*")):
+            match = _PARTITION_RE.search(directory)
+            if not match:
+                continue
+            day = date.fromisoformat(match.group(2))
+            if (start is None or day >= start) and (end is None or day <= end):
+                partitions.append((day, directory))
+        return sorted(partitions)
+
+    @staticmethod
+    def _files(directory: str) -> List[str]:
+        return sorted(glob.glob(os.path.join(directory, "part-*.parquet")))
@@ -5,8 +5,9 @@ AI記事生成システム - Web UI (FastAPI)
 """
 
 from fastapi import FastAPI, HTTPException, Depends, Request, Form
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import Optional, List
@@ -141,6 +142,7 @@ class ArticleRequest(BaseModel):
     length: int = 1500
     tone: str = "friendly"
     include_faq: bool = True
+    generation_mode: str = "single"  # single, outline
 
 class APIKeyRequest(BaseModel):
     api_key: str
@@ -153,7 +155,9 @@ def init_system():
         
         article_generator = ArticleGenerator(
             openai_api_key=config.get('openai_api_key'),
-            anthropic_api_key=config.get('anthropic_api_key')
+            anthropic_api_key=config.get('anthropic_api_key'),
+            openai_base_url=config.get('openai_base_url'),
+            anthropic_base_url=config.get('anthropic_base_url')
         )
         
         keyword_researcher = KeywordResearcher()
@@ -241,13 +245,16 @@ async def generate_article_api(
             tone=request.tone,
             include_faq=request.include_faq,
             temperature=0.7,
-            model="gpt-4"
+            model="gpt-4",
+            generation_mode=request.generation_mode
         )
         
-        generator.config = article_config
-        
-        # 記事生成
-        article = generator.generate_article(request.keyword)
+        # 記事生成（設定は呼び出しごとに渡し、イベントループを塞がないようスレッドで実行）
+        article = await run_in_threadpool(
+            generator.generate_article,
+            request.keyword,
+            config=article_config
+        )
         
         if not article:
             raise HTTPException(status_code=500, detail="記事生成に失敗しました")
@@ -280,6 +287,63 @@ async def generate_article_api(
         logger.error(f"記事生成エラー: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/generate-article/stream")
+async def generate_article_stream_api(
+    request: ArticleRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """記事生成（NDJSONでタイトル・セクションを逐次返す）"""
+    # 利用制限チェック
+    if not User.can_generate_article(current_user["email"]):
+        raise HTTPException(
+            status_code=403, 
+            detail=f"月間利用制限に達しました。プランを{PLANS[current_user['plan']]['name']}でご利用ください。"
+        )
+    
+    if not generator:
+        raise HTTPException(status_code=500, detail="システムが初期化されていません")
+    
+    # 記事生成設定
+    article_config = ArticleConfig(
+        min_length=request.length,
+        max_length=request.length + 500,
+        tone=request.tone,
+        include_faq=request.include_faq,
+        temperature=0.7,
+        model="gpt-4"
+    )
+    
+    def event_stream():
+        # 想定の3倍を超える出力は暴走とみなして打ち切る
+        events = generator.generate_article_stream(
+            request.keyword,
+            max_chars=article_config.max_length * 3,
+            config=article_config
+        )
+        for event in events:
+            if event['type'] == 'article':
+                article = event['article']
+                if not article:
+                    event = {'type': 'error', 'message': '記事生成に失敗しました'}
+                else:
+                    User.increment_usage(current_user["email"])
+                    generator.save_article(article)
+                    event = {
+                        'type': 'article',
+                        'article': {
+                            "title": article.title,
+                            "content": article.content,
+                            "meta_description": article.meta_description,
+                            "word_count": article.word_count,
+                            "keyword_density": article.keyword_density,
+                            "seo_score": article.seo_score,
+                            "generated_at": article.generated_at
+                        }
+                    }
+            yield json.dumps(event, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
 @app.post("/api/research-keywords")
 async def research_keywords_api(
     limit: int = Form(10),
@@ -312,6 +376,39 @@ async def research_keywords_api(
         logger.error(f"キーワードリサーチエラー: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/research-keywords/stream")
+async def research_keywords_stream_api(
+    limit: int = Form(10),
+    category: str = Form(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """キーワードリサーチ（NDJSONで分析できたキーワードから逐次返す）"""
+    if not researcher:
+        raise HTTPException(status_code=500, detail="システムが初期化されていません")
+    
+    async def event_stream():
+        count = 0
+        try:
+            async for kw in researcher.aiter_trending_keywords(limit=limit, category=category):
+                count += 1
+                event = {
+                    'type': 'keyword',
+                    'keyword': {
+                        "keyword": kw.main_keyword,
+                        "trend_score": kw.trend_score,
+                        "related_keywords": kw.related_keywords[:3],
+                        "search_volume": kw.search_volume
+                    }
+                }
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"キーワードリサーチエラー: {e}")
+            yield json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False) + "\n"
+            return
+        yield json.dumps({'type': 'done', 'count': count}, ensure_ascii=False) + "\n"
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
 @app.get("/api/user/status")
 async def user_status(current_user: dict = Depends(get_current_user)):
     plan_info = PLANS[current_user["plan"]]
@@ -7,6 +7,7 @@ AI記事生成システム - アフィリエイト収益モデル版
 from fastapi import FastAPI, HTTPException, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
+from fastapi.concurrency import run_in_threadpool
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import Optional, List
@@ -160,7 +161,9 @@ def init_system():
         
         article_generator = ArticleGenerator(
             openai_api_key=config.get('openai_api_key'),
-            anthropic_api_key=config.get('anthropic_api_key')
+            anthropic_api_key=config.get('anthropic_api_key'),
+            openai_base_url=config.get('openai_base_url'),
+            anthropic_base_url=config.get('anthropic_base_url')
         )
         
         keyword_researcher = KeywordResearcher()
@@ -267,10 +270,12 @@ async def generate_article_api(
             model="gpt-4"
         )
         
-        generator.config = article_config
-        
-        # 記事生成
-        article = generator.generate_article(keyword)
+        # 記事生成（設定は呼び出しごとに渡し、イベントループを塞がないようスレッドで実行）
+        article = await run_in_threadpool(
+            generator.generate_article,
+            keyword,
+            config=article_config
+        )
         
         if not article:
             raise HTTPException(status_code=500, detail="記事生成に失敗しました")